@@ -0,0 +1,18 @@
+import os
+from contextlib import contextmanager
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.project.project.settings")
+django.setup()
+
+from django.db import connection
+
+
+@contextmanager
+def test_database():
+    old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,148 @@
+"""
+Measure the send and receipt pipelines end to end against a fake Expo server.
+
+Usage:
+
+    uv run python -m benchmarks.pipelines --sizes 1000 10000 100000
+
+For each size, the benchmark creates a throwaway test database based on the
+example project's settings, seeds it with active devices using the test
+factories and runs each pipeline against a local fake Expo server. It reports
+the number of database queries, the wall time, the peak memory allocated by
+Python and the throughput of each pipeline. Note that tracing memory
+allocations slows down the pipelines, so compare timings between runs of this
+benchmark only.
+"""
+
+import argparse
+import time
+import tracemalloc
+from contextlib import contextmanager
+from unittest import mock
+
+import factory
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from exponent_server_sdk import PushClient
+
+from benchmarks.database import test_database
+from expo_notifications.conf import settings
+from expo_notifications.models import Device, Message, Ticket
+from expo_notifications.tasks import check_receipts, send_messages
+from expo_notifications.utils import chunked
+from tests.factories import ActiveDeviceFactory, MessageFactory, UserFactory
+from tests.fake_expo_server import FakeExpoServer
+
+BATCH_SIZE = 10_000
+
+CHANGELISTS = ["device", "message", "ticket", "receipt", "campaign"]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def measure(label: str, rows: int):
+    counter = QueryCounter()
+    tracemalloc.start()
+
+    with connection.execute_wrapper(counter):
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{label:<32} {rows:>9} {counter.count:>9} {counter.count / rows:>11.4f} "
+        f"{elapsed:>9.3f} {peak / 2**20:>10.1f} {rows / elapsed:>11.0f}"
+    )
+
+
+def seed(size: int) -> None:
+    users = UserFactory.create_batch(max(size // 100, 1))
+    devices = ActiveDeviceFactory.build_batch(size, user=factory.Iterator(users))
+    Device.objects.bulk_create(devices, batch_size=BATCH_SIZE)
+
+
+def build_messages(size: int) -> list[Message]:
+    devices = Device.objects.order_by("pk")[:size]
+    return MessageFactory.build_batch(
+        size, device=factory.Iterator(devices), expiration=None
+    )
+
+
+def run(size: int) -> None:
+    seed(size)
+    messages = build_messages(size)
+
+    with (
+        mock.patch.object(send_messages, "delay_on_commit"),
+        measure("Message.objects.bulk_send", size),
+    ):
+        Message.objects.bulk_send(messages)
+
+    message_pks = list(Message.objects.values_list("pk", flat=True))
+
+    with (
+        mock.patch.object(check_receipts, "apply_async"),
+        measure("send_messages", size),
+    ):
+        for shard in chunked(message_pks, settings.sending_task_shard_size):
+            send_messages(shard)
+
+    ticket_pks = list(Ticket.objects.values_list("pk", flat=True))
+
+    with measure("check_receipts", size):
+        for shard in chunked(ticket_pks, settings.checking_task_shard_size):
+            check_receipts(shard)
+
+    client = Client()
+    client.force_login(UserFactory(is_staff=True, is_superuser=True))
+
+    for model_name in CHANGELISTS:
+        url = reverse(f"admin:expo_notifications_{model_name}_changelist")
+        with measure(f"admin {model_name} changelist", size):
+            response = client.get(url)
+        assert response.status_code == 200
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--delay", type=float, default=0)
+    args = parser.parse_args()
+
+    setup_test_environment()
+
+    server = FakeExpoServer(delay=args.delay)
+    server.start()
+
+    try:
+        with (
+            mock.patch.object(PushClient, "DEFAULT_HOST", server.url),
+            override_settings(EXPO_NOTIFICATIONS_SEND_CONCURRENCY=args.concurrency),
+        ):
+            print(
+                f"{'pipeline':<32} {'rows':>9} {'queries':>9} {'queries/row':>11} "
+                f"{'seconds':>9} {'peak MiB':>10} {'rows/s':>11}"
+            )
+            for size in args.sizes:
+                with test_database():
+                    run(size)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Show the query plans of the hot query paths with and without the app's indexes.
+
+Usage:
+
+    uv run python -m benchmarks.query_plans --rows 2000000
+
+The benchmark creates a throwaway test database based on the example project's
+settings, seeds it with the given number of messages and tickets, and prints the
+plan and timing of each query twice: once after dropping the indexes declared by
+the app's models and once after recreating them.
+"""
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+from benchmarks.database import test_database
+from expo_notifications.models import Device, Message, Receipt, Ticket
+
+MODELS = [Device, Message, Ticket, Receipt]
+
+BATCH_SIZE = 10_000
+
+
+def seed(rows: int) -> None:
+    now = timezone.now()
+    rng = random.Random(0)
+
+    def random_date():
+        return now - timedelta(seconds=rng.randrange(30 * 24 * 60 * 60))
+
+    def bulk_create(model, objects):
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) == BATCH_SIZE:
+                model.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch)
+        print(f"Seeded {model.objects.count()} {model.__name__} rows", file=sys.stderr)
+
+    user_count = max(rows // 100, 1)
+    device_count = max(rows // 10, 1)
+
+    bulk_create(
+        get_user_model(),
+        (get_user_model()(username=f"user{i}") for i in range(user_count)),
+    )
+    user_pks = list(get_user_model().objects.values_list("pk", flat=True))
+
+    bulk_create(
+        Device,
+        (
+            Device(
+                user_id=user_pks[i % user_count],
+                push_token=f"ExponentPushToken[{i}]",
+                is_active=rng.random() < 0.9,
+            )
+            for i in range(device_count)
+        ),
+    )
+    device_pks = list(Device.objects.values_list("pk", flat=True))
+
+    bulk_create(
+        Message,
+        (
+            Message(
+                device_id=rng.choice(device_pks),
+                title="Hello, World!",
+                date_created=random_date(),
+            )
+            for _ in range(rows)
+        ),
+    )
+    first_message_pk = Message.objects.order_by("pk").values_list("pk", flat=True)[0]
+
+    bulk_create(
+        Ticket,
+        (
+            Ticket(
+                message_id=first_message_pk + i,
+                is_success=rng.random() < 0.9,
+                external_id=str(uuid.UUID(int=rng.getrandbits(128))),
+                date_received=random_date(),
+            )
+            for i in range(rows)
+        ),
+    )
+    first_ticket_pk = Ticket.objects.order_by("pk").values_list("pk", flat=True)[0]
+
+    bulk_create(
+        Receipt,
+        (
+            Receipt(
+                ticket_id=first_ticket_pk + i,
+                is_success=rng.random() < 0.95,
+                date_checked=random_date(),
+            )
+            for i in range(rows // 2)
+        ),
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def hot_queries():
+    now = timezone.now()
+    message_pks = list(Message.objects.order_by("?").values_list("pk", flat=True)[:100])
+    external_id = Ticket.objects.order_by("?").values_list("external_id", flat=True)[0]
+
+    return [
+        (
+            "send_messages: messages of active devices",
+            Message.objects.filter(
+                pk__in=message_pks, device__is_active=True
+            ).select_related("device"),
+        ),
+        (
+            "active devices (admin changelist)",
+            Device.objects.active.order_by("-id")[:100],
+        ),
+        (
+            "ticket by external id",
+            Ticket.objects.filter(external_id=external_id),
+        ),
+        (
+            "successful tickets of the last hour (admin list filter)",
+            Ticket.objects.filter(
+                is_success=True, date_received__gte=now - timedelta(hours=1)
+            ),
+        ),
+        (
+            "receipts of the last hour (admin list filter)",
+            Receipt.objects.filter(date_checked__gte=now - timedelta(hours=1)),
+        ),
+    ]
+
+
+def report(title: str, queries) -> None:
+    print(f"\n===== {title} =====")
+    for label, queryset in queries:
+        start = time.perf_counter()
+        for _ in range(5):
+            list(queryset.all())
+        elapsed = (time.perf_counter() - start) / 5
+
+        print(f"\n--- {label} ({elapsed * 1000:.2f} ms)")
+        print(queryset.explain())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    with test_database():
+        seed(args.rows)
+        queries = hot_queries()
+
+        with connection.schema_editor() as schema_editor:
+            for model in MODELS:
+                for index in model._meta.indexes:
+                    schema_editor.remove_index(model, index)
+
+        report("Without indexes", queries)
+
+        with connection.schema_editor() as schema_editor:
+            for model in MODELS:
+                for index in model._meta.indexes:
+                    schema_editor.add_index(model, index)
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        report("With indexes", queries)
+
+
+if __name__ == "__main__":
+    main()
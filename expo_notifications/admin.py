@@ -2,7 +2,42 @@ from admin_anchors import admin_anchor
 from django.contrib import admin
 from django.utils.translation import ngettext
 
-from expo_notifications.models import Device, Message, Receipt, Ticket
+from expo_notifications.models import (
+    Campaign,
+    Device,
+    Message,
+    PushError,
+    Receipt,
+    Ticket,
+    UnifiedReceipt,
+)
+
+
+class CampaignAdmin(admin.ModelAdmin):
+    list_display = [
+        "__str__",
+        "title",
+        "body",
+        "date_created",
+        "messages_link",
+    ]
+    list_filter = [
+        "date_created",
+        "expiration",
+        "priority",
+        "channel_id",
+        "category_id",
+        "mutable_content",
+    ]
+    search_fields = ["title", "body", "subtitle"]
+
+    def get_ordering(self, request):
+        return ["-id"]
+
+    @admin.display(description="Messages")
+    @admin_anchor("messages")
+    def messages_link(self, instance):
+        return str(instance.messages.count())
 
 
 class DeviceAdmin(admin.ModelAdmin):
@@ -38,11 +73,14 @@ class MessageAdmin(admin.ModelAdmin):
         "title",
         "body",
         "date_created",
+        "status",
         "device_link",
         "tickets_link",
     ]
     list_filter = [
+        "status",
         "date_created",
+        "send_at",
         "expiration",
         "priority",
         "channel_id",
@@ -50,7 +88,7 @@ class MessageAdmin(admin.ModelAdmin):
         "mutable_content",
     ]
     search_fields = ["title", "body", "subtitle"]
-    autocomplete_fields = ["device"]
+    autocomplete_fields = ["device", "campaign"]
     actions = ["send_messages"]
 
     def get_ordering(self, request):
@@ -81,9 +119,23 @@ class MessageAdmin(admin.ModelAdmin):
         )
 
 
+class PushErrorAdmin(admin.ModelAdmin):
+    list_display = ["__str__", "message"]
+    search_fields = ["message"]
+
+    def get_ordering(self, request):
+        return ["-id"]
+
+
 class ReceiptAdmin(admin.ModelAdmin):
-    list_display = ["__str__", "is_success", "date_checked", "ticket_link"]
-    list_filter = ["is_success", "date_checked"]
+    list_display = [
+        "__str__",
+        "is_success",
+        "error_code",
+        "date_checked",
+        "ticket_link",
+    ]
+    list_filter = ["is_success", "error_code", "date_checked"]
     autocomplete_fields = ["ticket"]
 
     def get_ordering(self, request):
@@ -99,12 +151,22 @@ class TicketAdmin(admin.ModelAdmin):
     list_display = [
         "__str__",
         "is_success",
+        "error_code",
         "date_received",
+        "date_checked",
+        "receipt_is_success",
         "external_id",
         "message_link",
         "receipts_link",
     ]
-    list_filter = ["is_success", "date_received"]
+    list_filter = [
+        "is_success",
+        "error_code",
+        "date_received",
+        "date_checked",
+        "receipt_is_success",
+        "receipt_error_code",
+    ]
     search_fields = ["external_id"]
     autocomplete_fields = ["message"]
     actions = ["check_tickets"]
@@ -118,9 +180,9 @@ class TicketAdmin(admin.ModelAdmin):
         return str(instance.message)
 
     @admin.display(description="Receipts")
-    @admin_anchor("receipts")
+    @admin_anchor("unified_receipts")
     def receipts_link(self, instance):
-        return str(instance.receipts.count())
+        return str(instance.unified_receipts.count())
 
     @admin.action(description="Check selected tickets")
     def check_tickets(modeladmin, request, queryset):
@@ -137,7 +199,39 @@ class TicketAdmin(admin.ModelAdmin):
         )
 
 
+class UnifiedReceiptAdmin(admin.ModelAdmin):
+    list_display = [
+        "__str__",
+        "is_success",
+        "error_code",
+        "date_checked",
+        "ticket_link",
+    ]
+    list_filter = ["is_success", "error_code", "date_checked"]
+    list_select_related = ["ticket"]
+
+    def get_ordering(self, request):
+        return ["-date_checked"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Ticket")
+    @admin_anchor("ticket")
+    def ticket_link(self, instance):
+        return str(instance.ticket)
+
+
+admin.site.register(Campaign, CampaignAdmin)
 admin.site.register(Device, DeviceAdmin)
 admin.site.register(Message, MessageAdmin)
+admin.site.register(PushError, PushErrorAdmin)
 admin.site.register(Receipt, ReceiptAdmin)
 admin.site.register(Ticket, TicketAdmin)
+admin.site.register(UnifiedReceipt, UnifiedReceiptAdmin)
@@ -0,0 +1,59 @@
+import atexit
+import threading
+from collections.abc import Iterable
+
+from expo_notifications.conf import settings
+from expo_notifications.utils import chunked
+
+
+class MessageBatcher:
+    # Buffers the pks of messages sent by this process and enqueues a single
+    # sending task for them once the batch is full or the window has passed.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.message_pks: list[int] = []
+        self.timer: threading.Timer | None = None
+
+    def add(self, message_pks: Iterable[int]) -> None:
+        with self.lock:
+            self.message_pks.extend(message_pks)
+
+            if len(self.message_pks) < settings.send_batch_size:
+                if self.timer is None and self.message_pks:
+                    self.timer = threading.Timer(
+                        settings.send_batch_window.total_seconds(), self.flush
+                    )
+                    self.timer.daemon = True
+                    self.timer.start()
+                return
+
+            message_pks = self.take()
+
+        enqueue(message_pks)
+
+    def flush(self) -> None:
+        with self.lock:
+            message_pks = self.take()
+
+        if message_pks:
+            enqueue(message_pks)
+
+    def take(self) -> list[int]:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        message_pks, self.message_pks = self.message_pks, []
+        return message_pks
+
+
+def enqueue(message_pks: list[int]) -> None:
+    from expo_notifications.tasks import send_messages
+
+    for shard in chunked(message_pks, settings.sending_task_shard_size):
+        send_messages.delay(shard)
+
+
+batcher = MessageBatcher()
+atexit.register(batcher.flush)
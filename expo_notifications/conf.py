@@ -36,6 +36,102 @@ class Settings:
             timedelta(seconds=30),
         )
 
+    @property
+    def sending_task_shard_size(self) -> int:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_SENDING_TASK_SHARD_SIZE",
+            1000,
+        )
+
+    @property
+    def claim_timeout(self) -> timedelta:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_CLAIM_TIMEOUT",
+            timedelta(minutes=10),
+        )
+
+    @property
+    def delivery_mode(self) -> str:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_DELIVERY_MODE",
+            "task",
+        )
+
+    @property
+    def send_batch_window(self) -> timedelta | None:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_SEND_BATCH_WINDOW",
+            None,
+        )
+
+    @property
+    def send_batch_size(self) -> int:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_SEND_BATCH_SIZE",
+            100,
+        )
+
+    @property
+    def priority_lanes(self) -> dict[str, dict]:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_PRIORITY_LANES",
+            {},
+        )
+
+    @property
+    def send_concurrency(self) -> int:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_SEND_CONCURRENCY",
+            1,
+        )
+
+    @property
+    def send_rate_limit(self) -> int | None:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_SEND_RATE_LIMIT",
+            None,
+        )
+
+    @property
+    def sending_engine(self) -> str:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_SENDING_ENGINE",
+            "sync",
+        )
+
+    @property
+    def coalesce_push_messages(self) -> bool:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_COALESCE_PUSH_MESSAGES",
+            False,
+        )
+
+    @property
+    def receipt_check_mode(self) -> str:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_RECEIPT_CHECK_MODE",
+            "task",
+        )
+
+    @property
+    def receipt_storage(self) -> str:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_RECEIPT_STORAGE",
+            "table",
+        )
+
     @property
     def checking_task_max_retries(self) -> int:
         return getattr(
@@ -52,5 +148,45 @@ class Settings:
             timedelta(minutes=1),
         )
 
+    @property
+    def checking_task_shard_size(self) -> int:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_CHECKING_TASK_SHARD_SIZE",
+            1000,
+        )
+
+    @property
+    def message_retention(self) -> timedelta | None:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_MESSAGE_RETENTION",
+            None,
+        )
+
+    @property
+    def ticket_retention(self) -> timedelta | None:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_TICKET_RETENTION",
+            None,
+        )
+
+    @property
+    def receipt_retention(self) -> timedelta | None:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_RECEIPT_RETENTION",
+            None,
+        )
+
+    @property
+    def pruning_batch_size(self) -> int:
+        return getattr(
+            django_settings,
+            "EXPO_NOTIFICATIONS_PRUNING_BATCH_SIZE",
+            1000,
+        )
+
 
 settings = Settings()
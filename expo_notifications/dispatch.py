@@ -0,0 +1,38 @@
+from collections.abc import Iterable
+from functools import partial
+
+from django.db import transaction
+
+from expo_notifications.batching import batcher
+from expo_notifications.conf import settings
+from expo_notifications.utils import chunked
+
+
+def enqueue_messages(message_pks: Iterable[int], priority: str | None = None) -> None:
+    from expo_notifications.tasks import send_messages
+
+    if settings.delivery_mode == "outbox":
+        # Queued messages are picked up by the dispatch_messages task
+        return
+
+    if priority in settings.priority_lanes:
+        lane = settings.priority_lanes[priority]
+        shard_size = lane.get("shard_size", settings.sending_task_shard_size)
+        options = {"queue": lane["queue"]} if "queue" in lane else {}
+
+        for shard in chunked(message_pks, shard_size):
+            send_messages.apply_async_on_commit(args=(shard, priority), **options)
+        return
+
+    for shard in chunked(message_pks, settings.sending_task_shard_size):
+        if settings.send_batch_window is not None:
+            transaction.on_commit(partial(batcher.add, shard))
+        else:
+            send_messages.delay_on_commit(shard)
+
+
+def enqueue_tickets(ticket_pks: Iterable[int]) -> None:
+    from expo_notifications.tasks import check_receipts
+
+    for shard in chunked(ticket_pks, settings.checking_task_shard_size):
+        check_receipts.delay_on_commit(shard)
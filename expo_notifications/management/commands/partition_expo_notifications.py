@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from expo_notifications.partitioning import partition_tables
+
+
+class Command(BaseCommand):
+    help = "Partition the ticket and receipt tables by day on PostgreSQL."
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning requires PostgreSQL.")
+
+        partitioned = partition_tables()
+
+        if not partitioned:
+            self.stdout.write("All tables are already partitioned.")
+
+        for table in partitioned:
+            self.stdout.write(f"Partitioned {table}")
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from expo_notifications.pruning import prune
+
+
+class Command(BaseCommand):
+    help = "Delete messages, tickets and receipts older than their retention."
+
+    def handle(self, *args, **options):
+        self.stdout.write(str(prune()))
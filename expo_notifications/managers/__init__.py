@@ -1,9 +1,13 @@
+from .campaign_manager import CampaignManager
 from .device_manager import DeviceManager
 from .message_manager import MessageManager
+from .push_error_manager import PushErrorManager
 from .ticket_manager import TicketManager
 
 __all__ = [
+    "CampaignManager",
     "DeviceManager",
     "MessageManager",
+    "PushErrorManager",
     "TicketManager",
 ]
@@ -0,0 +1,41 @@
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from django.db import models, transaction
+
+from expo_notifications.conf import settings
+from expo_notifications.dispatch import enqueue_messages
+from expo_notifications.utils import chunked
+
+if TYPE_CHECKING:
+    from expo_notifications.models import Campaign, Device  # pragma: no cover
+
+
+class CampaignManager(models.Manager):
+    @transaction.atomic
+    def send(self, devices: Iterable["Device"], **kwargs) -> "Campaign":
+        from expo_notifications.models import Message
+
+        campaign = self.create(**kwargs)
+
+        if isinstance(devices, models.QuerySet):
+            device_pks = devices.values_list("pk", flat=True).iterator(
+                chunk_size=settings.sending_task_shard_size
+            )
+        else:
+            device_pks = (device.pk for device in devices)
+
+        # Messages are created queued, so each row is written only once
+        for shard in chunked(device_pks, settings.sending_task_shard_size):
+            Message.objects.bulk_create(
+                Message(
+                    device_id=device_pk,
+                    campaign=campaign,
+                    status=Message.STATUS_QUEUED,
+                )
+                for device_pk in shard
+            )
+
+        enqueue_messages(campaign.messages.all().stream_pks(), campaign.priority)
+
+        return campaign
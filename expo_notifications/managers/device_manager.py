@@ -6,6 +6,9 @@ class DeviceQueryset(models.QuerySet):
     def active(self) -> "DeviceQueryset":
         return self.filter(is_active=True)
 
+    def deactivate(self) -> int:
+        return self.update(is_active=False)
+
 
 class DeviceManager(models.Manager):
     def get_queryset(self) -> "DeviceQueryset":
@@ -1,19 +1,174 @@
+from collections.abc import Iterable, Iterator
 from typing import TYPE_CHECKING
 
 from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from expo_notifications.conf import settings
+from expo_notifications.dispatch import enqueue_messages
 
 if TYPE_CHECKING:
     from expo_notifications.models import Message  # pragma: no cover
 
 
-class MessageQueryset(models.QuerySet):
-    def send(self) -> None:
-        from expo_notifications.tasks import send_messages
+def is_expired() -> Q:
+    # Messages of a campaign expire with the campaign's payload
+    now = timezone.now()
+    return Q(campaign__isnull=True, expiration__lte=now) | Q(
+        campaign__expiration__lte=now
+    )
 
-        message_pks = list(self.values_list("pk", flat=True))
 
-        if message_pks:
-            send_messages.delay_on_commit(message_pks)
+class MessageQueryset(models.QuerySet):
+    def send(self) -> None:
+        self.unclaimed().update(
+            status=self.model.STATUS_QUEUED,
+            claimed_at=None,
+            attempts=0,
+            next_attempt_at=None,
+        )
+
+        # Scheduled messages are sent by the send_scheduled_messages task
+        queryset = self.due()
+        priorities = list(settings.priority_lanes)
+
+        if priorities:
+            queryset = queryset.annotate(
+                effective_priority=Coalesce("campaign__priority", "priority")
+            )
+            for priority in priorities:
+                lane_queryset = queryset.filter(effective_priority=priority)
+                enqueue_messages(lane_queryset.stream_pks(), priority)
+
+            queryset = queryset.filter(
+                Q(effective_priority__isnull=True)
+                | ~Q(effective_priority__in=priorities)
+            )
+
+        enqueue_messages(queryset.stream_pks())
+
+    def due(self) -> "MessageQueryset":
+        return self.filter(Q(send_at__isnull=True) | Q(send_at__lte=timezone.now()))
+
+    def expired(self) -> "MessageQueryset":
+        return self.filter(is_expired())
+
+    def unexpired(self) -> "MessageQueryset":
+        return self.exclude(is_expired())
+
+    def ready(self) -> "MessageQueryset":
+        # Messages which failed to send are backed off from until their next
+        # attempt, so an outage of Expo does not use up their attempts at once
+        return self.filter(
+            Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=timezone.now())
+        )
+
+    def unclaimed(self) -> "MessageQueryset":
+        # Claims expire, so messages of tasks which crashed while sending them
+        # are sent again
+        return self.exclude(
+            status=self.model.STATUS_SENDING,
+            claimed_at__gt=timezone.now() - settings.claim_timeout,
+        )
+
+    def expire(self) -> int:
+        # Expired messages would be dropped by Expo, so they are skipped
+        return (
+            self.filter(status=self.model.STATUS_QUEUED)
+            .expired()
+            .update(status=self.model.STATUS_EXPIRED)
+        )
+
+    def fail_inactive(self) -> int:
+        # Messages to inactive devices are never sent, so they are given up on
+        return self.filter(
+            status=self.model.STATUS_QUEUED, device__is_active=False
+        ).update(status=self.model.STATUS_FAILED)
+
+    def stream_pks(self) -> Iterator[int]:
+        return self.values_list("pk", flat=True).iterator(
+            chunk_size=settings.sending_task_shard_size
+        )
+
+    def claim(self, limit: int | None = None) -> list[int]:
+        # Locked rows are being claimed by another task and are skipped, so
+        # concurrent or redelivered tasks never send the same message twice.
+        # Expired claims of tasks which crashed while sending are released first.
+        self.filter(status=self.model.STATUS_SENDING).unclaimed().release()
+
+        queryset = (
+            self.filter(status=self.model.STATUS_QUEUED)
+            .unexpired()
+            .select_for_update(skip_locked=True, of=("self",))
+            .values_list("pk", flat=True)
+        )
+
+        if limit is not None:
+            if not queryset.ordered:
+                queryset = queryset.order_by("pk")
+            queryset = queryset[:limit]
+
+        with transaction.atomic():
+            message_pks = list(queryset)
+            self.model.objects.filter(pk__in=message_pks).update(
+                status=self.model.STATUS_SENDING,
+                claimed_at=timezone.now(),
+                attempts=F("attempts") + 1,
+            )
+
+        return message_pks
+
+    def lease(self, limit: int) -> list[tuple[int, str | None]]:
+        # Hands queued messages off to sending tasks by postponing their next
+        # attempt until the claim timeout, so periodic tasks do not hand them
+        # off again unless their sending task was lost. Returns the primary keys
+        # and effective priorities of the leased messages.
+        queryset = (
+            self.filter(status=self.model.STATUS_QUEUED)
+            .ready()
+            .select_for_update(skip_locked=True, of=("self",))
+            .annotate(effective_priority=Coalesce("campaign__priority", "priority"))
+            .values_list("pk", "effective_priority")
+        )
+
+        if not queryset.ordered:
+            queryset = queryset.order_by("pk")
+
+        with transaction.atomic():
+            leased = list(queryset[:limit])
+            self.model.objects.filter(pk__in=[pk for pk, _ in leased]).update(
+                next_attempt_at=timezone.now() + settings.claim_timeout
+            )
+
+        return leased
+
+    def release(self) -> int:
+        # Claimed messages which were not sent are queued again, unless sending
+        # them failed too often, so a message Expo keeps refusing is given up on.
+        # Their next attempt is delayed exponentially with each attempt.
+        claimed = self.filter(status=self.model.STATUS_SENDING)
+        max_retries = settings.sending_task_max_retries
+        claimed.filter(attempts__gt=max_retries).update(
+            status=self.model.STATUS_FAILED, claimed_at=None
+        )
+
+        now = timezone.now()
+        delay = settings.sending_task_retry_delay
+        next_attempt_at = Case(
+            *(
+                When(attempts=attempt, then=Value(now + delay * 2 ** (attempt - 1)))
+                for attempt in range(1, max_retries + 1)
+            ),
+            default=Value(now + delay),
+        )
+
+        return claimed.update(
+            status=self.model.STATUS_QUEUED,
+            claimed_at=None,
+            next_attempt_at=next_attempt_at,
+        )
 
 
 class MessageManager(models.Manager):
@@ -22,23 +177,37 @@ class MessageManager(models.Manager):
 
     @transaction.atomic
     def send(self, **kwargs) -> "Message":
-        from expo_notifications.tasks import send_messages
-
-        message = self.create(**kwargs)
-        message_pks = [message.pk]
+        message = self.create(**{**kwargs, "status": self.model.STATUS_QUEUED})
 
-        send_messages.delay_on_commit(message_pks)
+        if message.is_due:
+            enqueue_messages([message.pk], message.effective_priority)
 
         return message
 
     @transaction.atomic
-    def bulk_send(self, *args, **kwargs) -> list["Message"]:
-        from expo_notifications.tasks import send_messages
-
-        messages = self.bulk_create(*args, **kwargs)
-        message_pks = [message.pk for message in messages]
-
-        if message_pks:
-            send_messages.delay_on_commit(message_pks)
+    def bulk_send(self, objs: Iterable["Message"], *args, **kwargs) -> list["Message"]:
+        objs = list(objs)
+        for message in objs:
+            message.status = self.model.STATUS_QUEUED
+
+        messages = self.bulk_create(objs, *args, **kwargs)
+        due_messages = [message for message in messages if message.is_due]
+        priorities = settings.priority_lanes
+
+        for priority in priorities:
+            enqueue_messages(
+                (
+                    message.pk
+                    for message in due_messages
+                    if message.effective_priority == priority
+                ),
+                priority,
+            )
+
+        enqueue_messages(
+            message.pk
+            for message in due_messages
+            if message.effective_priority not in priorities
+        )
 
         return messages
@@ -0,0 +1,19 @@
+from typing import TYPE_CHECKING
+
+from django.db import models
+
+if TYPE_CHECKING:
+    from expo_notifications.models import PushError  # pragma: no cover
+
+
+class PushErrorManager(models.Manager):
+    def bulk_get_or_create(self, push_errors: list["PushError"]) -> list["PushError"]:
+        # Returns the stored push error for each of the given ones, which are
+        # created unless an error with the same digest was stored before.
+        self.bulk_create(push_errors, ignore_conflicts=True)
+
+        stored_push_errors = self.in_bulk(
+            {push_error.digest for push_error in push_errors}, field_name="digest"
+        )
+
+        return [stored_push_errors[push_error.digest] for push_error in push_errors]
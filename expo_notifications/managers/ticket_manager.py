@@ -1,12 +1,54 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from expo_notifications.conf import settings
+from expo_notifications.dispatch import enqueue_tickets
+
+# Expo keeps push receipts for a day after sending the notification
+RECEIPT_LIFETIME = timedelta(days=1)
 
 
 class TicketQueryset(models.QuerySet):
     def check_receipts(self) -> None:
-        from expo_notifications.tasks import check_receipts
+        ticket_pks = self.values_list("pk", flat=True).iterator(
+            chunk_size=settings.checking_task_shard_size
+        )
+        enqueue_tickets(ticket_pks)
+
+    def receipt_pending(self) -> "TicketQueryset":
+        # Receipts are ready to be checked once the receipt check delay passed
+        now = timezone.now()
+        return self.filter(
+            is_success=True,
+            date_received__gt=now - RECEIPT_LIFETIME,
+            date_received__lte=now - settings.receipt_check_delay,
+            date_checked__isnull=True,
+        ).exclude(external_id="")
+
+    def claim_receipts(self, limit: int) -> list[int]:
+        # Marks pending receipts as checked before they are checked. Locked rows
+        # are being claimed by another collector and are skipped, so overlapping
+        # runs never check the same receipts twice.
+        queryset = (
+            self.receipt_pending()
+            .select_for_update(skip_locked=True)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:limit]
+        )
+
+        with transaction.atomic():
+            ticket_pks = list(queryset)
+            self.model.objects.filter(pk__in=ticket_pks).update(
+                date_checked=timezone.now()
+            )
+
+        return ticket_pks
 
-        ticket_pks = list(self.values_list("pk", flat=True))
-        check_receipts.delay_on_commit(ticket_pks)
+    def release_receipts(self) -> int:
+        # Claimed receipts which were not checked are pending again
+        return self.update(date_checked=None)
 
 
 class TicketManager(models.Manager):
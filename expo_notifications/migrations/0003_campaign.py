@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:34
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expo_notifications", "0002_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Campaign",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data", models.JSONField(blank=True, null=True)),
+                ("title", models.CharField(blank=True, max_length=64)),
+                ("body", models.CharField(blank=True, max_length=256)),
+                ("ttl", models.DurationField(blank=True, null=True)),
+                ("expiration", models.DateTimeField(blank=True, null=True)),
+                (
+                    "priority",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("default", "Default"),
+                            ("normal", "Normal"),
+                            ("high", "High"),
+                        ],
+                        max_length=7,
+                        null=True,
+                    ),
+                ),
+                ("subtitle", models.CharField(blank=True, max_length=64)),
+                ("sound", models.CharField(blank=True, max_length=64)),
+                ("badge", models.PositiveSmallIntegerField(blank=True, null=True)),
+                ("channel_id", models.CharField(blank=True, max_length=32)),
+                ("category_id", models.CharField(blank=True, max_length=64)),
+                ("mutable_content", models.BooleanField(default=False)),
+                (
+                    "date_created",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.AddField(
+            model_name="message",
+            name="campaign",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="messages",
+                to="expo_notifications.campaign",
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:49
+
+from django.db import migrations, models
+
+
+def set_status_of_sent_messages(apps, schema_editor):
+    Message = apps.get_model("expo_notifications", "Message")
+    Ticket = apps.get_model("expo_notifications", "Ticket")
+
+    tickets = Ticket.objects.filter(message=models.OuterRef("pk"))
+
+    Message.objects.filter(
+        models.Exists(tickets.filter(is_success=True)),
+    ).update(status="sent")
+
+    # Messages without a successful ticket are not queued, since they were
+    # either never sent or given up on, and must not be sent again unasked
+    Message.objects.filter(
+        ~models.Exists(tickets.filter(is_success=True)),
+    ).update(status="failed")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expo_notifications", "0003_campaign"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="message",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("queued", "Queued"),
+                    ("sending", "Sending"),
+                    ("sent", "Sent"),
+                    ("failed", "Failed"),
+                ],
+                db_index=True,
+                default="queued",
+                max_length=7,
+            ),
+        ),
+        migrations.RunPython(
+            set_status_of_sent_messages,
+            migrations.RunPython.noop,
+        ),
+    ]
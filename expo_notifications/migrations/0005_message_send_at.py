@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expo_notifications", "0004_message_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="message",
+            name="send_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["status", "send_at"], name="expo_notif_message_due_idx"
+            ),
+        ),
+    ]
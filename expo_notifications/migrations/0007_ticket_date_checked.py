@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:09
+
+from django.db import migrations, models
+
+
+def set_date_checked_of_checked_tickets(apps, schema_editor):
+    Ticket = apps.get_model("expo_notifications", "Ticket")
+    Receipt = apps.get_model("expo_notifications", "Receipt")
+
+    receipts = Receipt.objects.filter(ticket=models.OuterRef("pk")).order_by(
+        "-date_checked"
+    )
+
+    Ticket.objects.filter(models.Exists(receipts)).update(
+        date_checked=models.Subquery(receipts.values("date_checked")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expo_notifications", "0006_message_status_expired"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="date_checked",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(
+            set_date_checked_of_checked_tickets,
+            migrations.RunPython.noop,
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                condition=models.Q(
+                    ("date_checked__isnull", True), ("is_success", True)
+                ),
+                fields=["date_received"],
+                name="expo_notif_ticket_pending_idx",
+            ),
+        ),
+    ]
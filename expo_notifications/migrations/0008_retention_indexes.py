@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expo_notifications", "0007_ticket_date_checked"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["date_created"], name="expo_notif_message_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["date_received"], name="expo_notif_ticket_received_idx"
+            ),
+        ),
+    ]
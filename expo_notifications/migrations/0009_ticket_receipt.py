@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expo_notifications", "0008_retention_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="receipt_error_message",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="receipt_is_success",
+            field=models.BooleanField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,147 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expo_notifications", "0009_ticket_receipt"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PushError",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("message", models.TextField(blank=True)),
+                ("details", models.JSONField(blank=True, null=True)),
+                ("digest", models.CharField(max_length=64, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="receipt",
+            name="error_code",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                choices=[
+                    (0, "Unknown"),
+                    (1, "DeviceNotRegistered"),
+                    (2, "MessageTooBig"),
+                    (3, "MessageRateExceeded"),
+                    (4, "MismatchSenderId"),
+                    (5, "InvalidCredentials"),
+                    (6, "InvalidProviderToken"),
+                    (7, "DeveloperError"),
+                    (8, "ExpoError"),
+                    (9, "ProviderError"),
+                ],
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="error_code",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                choices=[
+                    (0, "Unknown"),
+                    (1, "DeviceNotRegistered"),
+                    (2, "MessageTooBig"),
+                    (3, "MessageRateExceeded"),
+                    (4, "MismatchSenderId"),
+                    (5, "InvalidCredentials"),
+                    (6, "InvalidProviderToken"),
+                    (7, "DeveloperError"),
+                    (8, "ExpoError"),
+                    (9, "ProviderError"),
+                ],
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="receipt_error_code",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                choices=[
+                    (0, "Unknown"),
+                    (1, "DeviceNotRegistered"),
+                    (2, "MessageTooBig"),
+                    (3, "MessageRateExceeded"),
+                    (4, "MismatchSenderId"),
+                    (5, "InvalidCredentials"),
+                    (6, "InvalidProviderToken"),
+                    (7, "DeveloperError"),
+                    (8, "ExpoError"),
+                    (9, "ProviderError"),
+                ],
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="receipt",
+            name="error",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="expo_notifications.pusherror",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="error",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="expo_notifications.pusherror",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="receipt_error",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="expo_notifications.pusherror",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="receipt",
+            index=models.Index(
+                fields=["error_code", "date_checked"],
+                name="expo_notif_receipt_error_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["error_code", "date_received"],
+                name="expo_notif_ticket_error_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["receipt_error_code", "date_checked"],
+                name="expo_notif_ticket_rcpt_err_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expo_notifications", "0011_message_claimed_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="message",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="message",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("draft", "Draft"),
+                    ("queued", "Queued"),
+                    ("sending", "Sending"),
+                    ("sent", "Sent"),
+                    ("failed", "Failed"),
+                    ("expired", "Expired"),
+                ],
+                db_index=True,
+                default="draft",
+                max_length=7,
+            ),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:15
+
+from django.db import migrations, models
+
+VIEW_SQL = """
+    CREATE VIEW expo_notifications_unifiedreceipt AS
+    SELECT
+        {receipt_id} AS id,
+        ticket_id,
+        is_success,
+        error_message,
+        error_code,
+        error_id,
+        date_checked
+    FROM expo_notifications_receipt
+    UNION ALL
+    SELECT
+        {ticket_id},
+        id,
+        receipt_is_success,
+        receipt_error_message,
+        receipt_error_code,
+        receipt_error_id,
+        date_checked
+    FROM expo_notifications_ticket
+    WHERE receipt_is_success IS NOT NULL
+"""
+
+
+def create_view(apps, schema_editor):
+    # MySQL and MariaDB treat || as a logical OR, so ids are concatenated with
+    # CONCAT there, which SQLite only supports in recent versions
+    if schema_editor.connection.vendor == "mysql":
+        receipt_id, ticket_id = "CONCAT('receipt-', id)", "CONCAT('ticket-', id)"
+    else:
+        receipt_id, ticket_id = "'receipt-' || id", "'ticket-' || id"
+
+    schema_editor.execute(VIEW_SQL.format(receipt_id=receipt_id, ticket_id=ticket_id))
+
+
+def drop_view(apps, schema_editor):
+    schema_editor.execute("DROP VIEW expo_notifications_unifiedreceipt")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("expo_notifications", "0012_message_draft_attempts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UnifiedReceipt",
+            fields=[
+                (
+                    "id",
+                    models.CharField(max_length=32, primary_key=True, serialize=False),
+                ),
+                ("is_success", models.BooleanField()),
+                ("error_message", models.TextField(blank=True)),
+                (
+                    "error_code",
+                    models.PositiveSmallIntegerField(
+                        blank=True,
+                        choices=[
+                            (0, "Unknown"),
+                            (1, "DeviceNotRegistered"),
+                            (2, "MessageTooBig"),
+                            (3, "MessageRateExceeded"),
+                            (4, "MismatchSenderId"),
+                            (5, "InvalidCredentials"),
+                            (6, "InvalidProviderToken"),
+                            (7, "DeveloperError"),
+                            (8, "ExpoError"),
+                            (9, "ProviderError"),
+                        ],
+                        null=True,
+                    ),
+                ),
+                ("date_checked", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "receipt of any storage",
+                "verbose_name_plural": "receipts of any storage",
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(create_view, drop_view),
+    ]
@@ -1,11 +1,17 @@
+from .campaign import Campaign
 from .device import Device
 from .message import Message
+from .push_error import PushError
 from .receipt import Receipt
 from .ticket import Ticket
+from .unified_receipt import UnifiedReceipt
 
 __all__ = [
+    "Campaign",
     "Device",
     "Message",
+    "PushError",
     "Receipt",
     "Ticket",
+    "UnifiedReceipt",
 ]
@@ -0,0 +1,16 @@
+from django.db import models
+from django.utils import timezone
+
+from expo_notifications.managers import CampaignManager
+from expo_notifications.models.payload import Payload
+
+
+class Campaign(Payload):
+    objects = CampaignManager()
+
+    date_created = models.DateTimeField(
+        default=timezone.now,
+    )
+
+    def __str__(self) -> str:
+        return f"Campaign #{self.pk}"
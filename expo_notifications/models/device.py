@@ -38,6 +38,13 @@ class Device(models.Model):
             "user",
             "push_token",
         )
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(is_active=True),
+                name="expo_notif_device_active_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Device #{self.pk} of {self.user}"
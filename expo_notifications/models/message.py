@@ -3,9 +3,10 @@ from django.utils import timezone
 from exponent_server_sdk import PushMessage
 
 from expo_notifications.managers import MessageManager
+from expo_notifications.models.payload import Payload
 
 
-class Message(models.Model):
+class Message(Payload):
     objects = MessageManager()
 
     device = models.ForeignKey(
@@ -14,102 +15,91 @@ class Message(models.Model):
         related_name="messages",
     )
 
-    data = models.JSONField(
+    campaign = models.ForeignKey(
+        # Messages of a campaign share its payload instead of storing their own
+        to="expo_notifications.Campaign",
+        on_delete=models.CASCADE,
+        related_name="messages",
         blank=True,
         null=True,
     )
 
-    title = models.CharField(
-        max_length=64,
-        blank=True,
-    )
-
-    body = models.CharField(
-        max_length=256,
-        blank=True,
-    )
-
-    ttl = models.DurationField(
-        blank=True,
-        null=True,
+    date_created = models.DateTimeField(
+        default=timezone.now,
     )
 
-    expiration = models.DateTimeField(
+    send_at = models.DateTimeField(
         blank=True,
         null=True,
     )
 
-    PRIORITY_DEFAULT = "default"
-    PRIORITY_NORMAL = "normal"
-    PRIORITY_HIGH = "high"
-    PRIORITY_CHOICES = (
-        (PRIORITY_DEFAULT, "Default"),
-        (PRIORITY_NORMAL, "Normal"),
-        (PRIORITY_HIGH, "High"),
-    )
-
-    priority = models.CharField(
-        max_length=7,
+    claimed_at = models.DateTimeField(
+        # Set while a task is sending the message
         blank=True,
         null=True,
-        choices=PRIORITY_CHOICES,
     )
 
-    subtitle = models.CharField(
-        max_length=64,
-        blank=True,
-    )
-
-    sound = models.CharField(
-        max_length=64,
-        blank=True,
+    attempts = models.PositiveSmallIntegerField(
+        # Number of times the message was claimed for sending
+        default=0,
     )
 
-    badge = models.PositiveSmallIntegerField(
+    next_attempt_at = models.DateTimeField(
+        # Set when sending failed or the message was handed off to a sending
+        # task, so dispatchers do not pick it up again before then
         blank=True,
         null=True,
     )
 
-    channel_id = models.CharField(
-        max_length=32,
-        blank=True,
-    )
-
-    category_id = models.CharField(
-        max_length=64,
-        blank=True,
+    STATUS_DRAFT = "draft"
+    STATUS_QUEUED = "queued"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_EXPIRED = "expired"
+    STATUS_CHOICES = (
+        (STATUS_DRAFT, "Draft"),
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+        (STATUS_EXPIRED, "Expired"),
     )
 
-    mutable_content = models.BooleanField(
-        default=False,
+    status = models.CharField(
+        max_length=7,
+        choices=STATUS_CHOICES,
+        # Messages are queued once they are sent
+        default=STATUS_DRAFT,
+        db_index=True,
     )
 
-    date_created = models.DateTimeField(
-        default=timezone.now,
-    )
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "send_at"],
+                name="expo_notif_message_due_idx",
+            ),
+            models.Index(
+                fields=["date_created"],
+                name="expo_notif_message_created_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"Message #{self.pk}"
 
+    @property
+    def is_due(self) -> bool:
+        return self.send_at is None or self.send_at <= timezone.now()
+
+    @property
+    def effective_priority(self) -> str | None:
+        return (self.campaign or self).priority
+
     def to_push_message(self) -> PushMessage:
-        return PushMessage(
-            to=self.device.push_token,
-            data=self.data,
-            title=self.title or None,
-            body=self.body or None,
-            sound=self.sound or None,
-            ttl=self.ttl.total_seconds() if self.ttl else None,
-            expiration=self.expiration.timestamp() if self.expiration else None,
-            priority=self.priority or None,
-            badge=self.badge,
-            category=self.category_id or None,
-            display_in_foreground=None,
-            channel_id=self.channel_id or None,
-            subtitle=self.subtitle or None,
-            mutable_content=self.mutable_content,
-        )
+        payload = self.campaign or self
+        return payload.build_push_message(self.device.push_token)
 
     def send(self) -> None:
-        from expo_notifications.tasks import send_messages
-
-        send_messages.delay_on_commit([self.pk])
+        type(self).objects.filter(pk=self.pk).send()
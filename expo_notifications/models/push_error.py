@@ -0,0 +1,74 @@
+import hashlib
+import json
+
+from django.db import models
+
+from expo_notifications.managers import PushErrorManager
+
+
+class PushError(models.Model):
+    # Error messages and details of tickets and receipts, stored once for all
+    # tickets and receipts which failed with the same error.
+
+    objects = PushErrorManager()
+
+    CODE_UNKNOWN = 0
+    CODE_DEVICE_NOT_REGISTERED = 1
+    CODE_MESSAGE_TOO_BIG = 2
+    CODE_MESSAGE_RATE_EXCEEDED = 3
+    CODE_MISMATCH_SENDER_ID = 4
+    CODE_INVALID_CREDENTIALS = 5
+    CODE_INVALID_PROVIDER_TOKEN = 6
+    CODE_DEVELOPER_ERROR = 7
+    CODE_EXPO_ERROR = 8
+    CODE_PROVIDER_ERROR = 9
+    CODE_CHOICES = (
+        (CODE_UNKNOWN, "Unknown"),
+        (CODE_DEVICE_NOT_REGISTERED, "DeviceNotRegistered"),
+        (CODE_MESSAGE_TOO_BIG, "MessageTooBig"),
+        (CODE_MESSAGE_RATE_EXCEEDED, "MessageRateExceeded"),
+        (CODE_MISMATCH_SENDER_ID, "MismatchSenderId"),
+        (CODE_INVALID_CREDENTIALS, "InvalidCredentials"),
+        (CODE_INVALID_PROVIDER_TOKEN, "InvalidProviderToken"),
+        (CODE_DEVELOPER_ERROR, "DeveloperError"),
+        (CODE_EXPO_ERROR, "ExpoError"),
+        (CODE_PROVIDER_ERROR, "ProviderError"),
+    )
+
+    message = models.TextField(
+        blank=True,
+    )
+
+    details = models.JSONField(
+        blank=True,
+        null=True,
+    )
+
+    digest = models.CharField(
+        # Hash of the message and details, which identifies the error
+        max_length=64,
+        unique=True,
+    )
+
+    def __str__(self) -> str:
+        return f"Push error #{self.pk}"
+
+    @classmethod
+    def get_code(cls, details: dict | None) -> int:
+        error = (details or {}).get("error")
+        codes = {label: code for code, label in cls.CODE_CHOICES}
+        return codes.get(error, cls.CODE_UNKNOWN)
+
+    @classmethod
+    def build(cls, message: str, details: dict | None, push_token: str) -> "PushError":
+        # The push token is removed, so an error is shared by all devices
+        message = message.replace(push_token, "<push token>")
+        details = {
+            key: value
+            for key, value in (details or {}).items()
+            if key != "expoPushToken"
+        } or None
+        digest = hashlib.sha256(
+            json.dumps([message, details], sort_keys=True).encode()
+        ).hexdigest()
+        return cls(message=message, details=details, digest=digest)
@@ -1,5 +1,7 @@
 from django.db import models
 
+from expo_notifications.models.push_error import PushError
+
 
 class Receipt(models.Model):
     ticket = models.ForeignKey(
@@ -14,7 +16,39 @@ class Receipt(models.Model):
         blank=True,
     )
 
+    error_code = models.PositiveSmallIntegerField(
+        choices=PushError.CODE_CHOICES,
+        blank=True,
+        null=True,
+    )
+
+    error = models.ForeignKey(
+        to="expo_notifications.PushError",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        blank=True,
+        null=True,
+        # Receipts are not looked up by their error, so no index is maintained
+        db_index=False,
+    )
+
     date_checked = models.DateTimeField()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["date_checked"],
+                name="expo_notif_receipt_checked_idx",
+            ),
+            models.Index(
+                fields=["error_code", "date_checked"],
+                name="expo_notif_receipt_error_idx",
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"Receipt #{self.pk}"
+
+    def get_error_message(self) -> str:
+        # Messages of linked errors are only stored on the error
+        return self.error.message if self.error else self.error_message
@@ -1,7 +1,10 @@
 from django.db import models
 from exponent_server_sdk import PushTicket
 
+from expo_notifications.dispatch import enqueue_tickets
 from expo_notifications.managers import TicketManager
+from expo_notifications.models.push_error import PushError
+from expo_notifications.models.receipt import Receipt
 
 
 class Ticket(models.Model):
@@ -24,8 +27,85 @@ class Ticket(models.Model):
         blank=True,
     )
 
+    error_code = models.PositiveSmallIntegerField(
+        choices=PushError.CODE_CHOICES,
+        blank=True,
+        null=True,
+    )
+
+    error = models.ForeignKey(
+        to="expo_notifications.PushError",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        blank=True,
+        null=True,
+        # Tickets are not looked up by their error, so no index is maintained
+        db_index=False,
+    )
+
     date_received = models.DateTimeField()
 
+    date_checked = models.DateTimeField(
+        # Set once a receipt was stored for the ticket
+        blank=True,
+        null=True,
+    )
+
+    # The receipt is stored on the ticket itself in the "ticket" receipt storage
+    receipt_is_success = models.BooleanField(
+        blank=True,
+        null=True,
+    )
+
+    receipt_error_message = models.TextField(
+        blank=True,
+        default="",
+    )
+
+    receipt_error_code = models.PositiveSmallIntegerField(
+        choices=PushError.CODE_CHOICES,
+        blank=True,
+        null=True,
+    )
+
+    receipt_error = models.ForeignKey(
+        to="expo_notifications.PushError",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        blank=True,
+        null=True,
+        db_index=False,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["external_id"],
+                name="expo_notif_ticket_ext_id_idx",
+            ),
+            models.Index(
+                fields=["is_success", "date_received"],
+                name="expo_notif_ticket_success_idx",
+            ),
+            models.Index(
+                fields=["date_received"],
+                name="expo_notif_ticket_received_idx",
+            ),
+            models.Index(
+                fields=["error_code", "date_received"],
+                name="expo_notif_ticket_error_idx",
+            ),
+            models.Index(
+                fields=["receipt_error_code", "date_checked"],
+                name="expo_notif_ticket_rcpt_err_idx",
+            ),
+            models.Index(
+                fields=["date_received"],
+                condition=models.Q(is_success=True, date_checked__isnull=True),
+                name="expo_notif_ticket_pending_idx",
+            ),
+        ]
+
     def __str__(self) -> str:
         return f"Ticket #{self.pk}"
 
@@ -37,12 +117,33 @@ class Ticket(models.Model):
                 if self.is_success
                 else PushTicket.ERROR_STATUS
             ),
-            message=self.error_message or None,
+            message=self.get_error_message() or None,
             details=None,
             id=self.external_id,
         )
 
-    def check_receipt(self) -> None:
-        from expo_notifications.tasks import check_receipts
+    def get_error_message(self) -> str:
+        # Messages of linked errors are only stored on the error
+        return self.error.message if self.error else self.error_message
+
+    def get_receipt_error_message(self) -> str:
+        if self.receipt_error:
+            return self.receipt_error.message
+        return self.receipt_error_message
 
-        check_receipts.delay_on_commit([self.pk])
+    @property
+    def receipt(self) -> Receipt | None:
+        # The latest receipt, regardless of where receipts are stored
+        if self.receipt_is_success is not None:
+            return Receipt(
+                ticket=self,
+                is_success=self.receipt_is_success,
+                error_message=self.receipt_error_message,
+                error_code=self.receipt_error_code,
+                error=self.receipt_error,
+                date_checked=self.date_checked,
+            )
+        return self.receipts.order_by("-date_checked").first()
+
+    def check_receipt(self) -> None:
+        enqueue_tickets([self.pk])
@@ -0,0 +1,56 @@
+from django.db import models
+
+from expo_notifications.models.push_error import PushError
+
+
+class UnifiedReceipt(models.Model):
+    # Read-only database view of all receipts, whether they are stored in the
+    # receipt table or on their tickets (see EXPO_NOTIFICATIONS_RECEIPT_STORAGE).
+
+    id = models.CharField(
+        # Prefixed with the table the receipt is stored in, e.g. "ticket-1"
+        max_length=32,
+        primary_key=True,
+    )
+
+    ticket = models.ForeignKey(
+        to="expo_notifications.Ticket",
+        on_delete=models.DO_NOTHING,
+        related_name="unified_receipts",
+        db_constraint=False,
+    )
+
+    is_success = models.BooleanField()
+
+    error_message = models.TextField(
+        blank=True,
+    )
+
+    error_code = models.PositiveSmallIntegerField(
+        choices=PushError.CODE_CHOICES,
+        blank=True,
+        null=True,
+    )
+
+    error = models.ForeignKey(
+        to="expo_notifications.PushError",
+        on_delete=models.DO_NOTHING,
+        related_name="+",
+        blank=True,
+        null=True,
+        db_constraint=False,
+    )
+
+    date_checked = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        verbose_name = "receipt of any storage"
+        verbose_name_plural = "receipts of any storage"
+
+    def __str__(self) -> str:
+        return f"Receipt {self.pk}"
+
+    def get_error_message(self) -> str:
+        # Messages of linked errors are only stored on the error
+        return self.error.message if self.error else self.error_message
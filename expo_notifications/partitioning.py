@@ -0,0 +1,246 @@
+from datetime import datetime, timedelta
+
+from django.db import connection, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.utils import timezone
+
+from expo_notifications.conf import settings
+from expo_notifications.models import Receipt, Ticket
+
+# Tickets and receipts are partitioned by day
+PARTITION_INTERVAL = timedelta(days=1)
+
+# Partitions are created a week ahead, in case the maintenance task is delayed
+PREMADE_PARTITIONS = 7
+
+# Matches the upper bound of a range partition, e.g. "... TO ('2026-10-19 ...')"
+UPPER_BOUND_PATTERN = r"TO \('(.*)'\)"
+
+
+def is_partitioned(connection: BaseDatabaseWrapper, table: str) -> bool:
+    if connection.vendor != "postgresql":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT FROM pg_partitioned_table "
+            "WHERE partrelid = %s::regclass)",
+            [table],
+        )
+        [partitioned] = cursor.fetchone()
+
+    return partitioned
+
+
+def get_partitioned_tables() -> list[tuple[str, str, timedelta | None]]:
+    return [
+        (Ticket._meta.db_table, "date_received", settings.ticket_retention),
+        (Receipt._meta.db_table, "date_checked", settings.receipt_retention),
+    ]
+
+
+def start_of_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def partition_tables() -> list[str]:
+    # Partitions the tables which are not partitioned yet and returns them
+    partitioned: list[str] = []
+
+    with transaction.atomic():
+        for table, column, _ in get_partitioned_tables():
+            if not is_partitioned(connection, table):
+                partition_table(connection, table, column)
+                partitioned.append(table)
+
+    return partitioned
+
+
+def partition_table(connection: BaseDatabaseWrapper, table: str, column: str) -> None:
+    # Turns the table into a table partitioned by day on the given column. The
+    # existing table is kept as the partition of all rows up to the end of the
+    # current day, so its rows are neither copied nor rewritten.
+    qn = connection.ops.quote_name
+    legacy_table = f"{table}_legacy"
+    upper_bound = start_of_day(timezone.now()) + PARTITION_INTERVAL
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_indexdef(i.indexrelid) "
+            "FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = %s::regclass AND NOT i.indisprimary",
+            [table],
+        )
+        indexes = cursor.fetchall()
+
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+
+        # Foreign keys can't reference a partitioned table by its id alone
+        cursor.execute(
+            "SELECT c.relname, con.conname "
+            "FROM pg_constraint con JOIN pg_class c ON c.oid = con.conrelid "
+            "WHERE con.confrelid = %s::regclass AND con.contype = 'f'",
+            [table],
+        )
+        for referencing_table, name in cursor.fetchall():
+            cursor.execute(
+                f"ALTER TABLE {qn(referencing_table)} DROP CONSTRAINT {qn(name)}"
+            )
+
+        # Views would keep reading the legacy partition only, so they are
+        # recreated for the partitioned table
+        cursor.execute(
+            "SELECT DISTINCT v.oid::regclass::text, pg_get_viewdef(v.oid) "
+            "FROM pg_depend d JOIN pg_rewrite r ON r.oid = d.objid "
+            "JOIN pg_class v ON v.oid = r.ev_class "
+            "WHERE d.classid = 'pg_rewrite'::regclass "
+            "AND d.refobjid = %s::regclass AND v.oid <> d.refobjid",
+            [table],
+        )
+        views = cursor.fetchall()
+
+        cursor.execute(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'p'",
+            [table],
+        )
+        [primary_key] = cursor.fetchone()
+
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {qn(table)}")
+        [next_id] = cursor.fetchone()
+
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy_table)}")
+        # The primary key of a partition must include the partition key, the
+        # new one is created when the legacy table is attached.
+        cursor.execute(
+            f"ALTER TABLE {qn(legacy_table)} DROP CONSTRAINT {qn(primary_key)}"
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(legacy_table)} ALTER COLUMN id DROP IDENTITY IF EXISTS"
+        )
+
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(legacy_table)}) "
+            f"PARTITION BY RANGE ({qn(column)})"
+        )
+        cursor.execute(f"ALTER TABLE {qn(table)} ADD PRIMARY KEY (id, {qn(column)})")
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ALTER COLUMN id "
+            f"ADD GENERATED BY DEFAULT AS IDENTITY (START WITH {int(next_id)})"
+        )
+
+        # The indexes of the legacy table are renamed and attached to the
+        # indexes of the partitioned table, which are created with the
+        # original names, so later migrations keep finding them.
+        for name, definition in indexes:
+            cursor.execute(
+                f"ALTER INDEX {qn(name)} RENAME TO {qn(f'{name[:56]}_legacy')}"
+            )
+            cursor.execute(definition)
+
+        for name, definition in foreign_keys:
+            cursor.execute(
+                f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}"
+            )
+
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(legacy_table)} "
+            "FOR VALUES FROM (MINVALUE) TO (%s)",
+            [upper_bound],
+        )
+        # Rows of days without a partition, e.g. because the maintenance task
+        # did not run, are stored in the default partition instead of failing
+        cursor.execute(
+            f"CREATE TABLE {qn(f'{table}_default')} PARTITION OF {qn(table)} DEFAULT"
+        )
+
+        create_partitions(cursor, table, column, upper_bound, get_premade_until())
+
+        for view, definition in views:
+            cursor.execute(f"CREATE OR REPLACE VIEW {view} AS {definition}")
+
+
+def get_premade_until() -> datetime:
+    return start_of_day(timezone.now()) + (PREMADE_PARTITIONS + 1) * PARTITION_INTERVAL
+
+
+def get_partitions(cursor, table: str) -> list[tuple[str, datetime]]:
+    cursor.execute(
+        "SELECT c.relname, "
+        "substring(pg_get_expr(c.relpartbound, c.oid) from %s)::timestamptz "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = %s::regclass "
+        "AND pg_get_expr(c.relpartbound, c.oid) <> 'DEFAULT'",
+        [UPPER_BOUND_PATTERN, table],
+    )
+    return cursor.fetchall()
+
+
+def create_partitions(
+    cursor, table: str, column: str, start: datetime, end: datetime
+) -> list[str]:
+    # Partitions are attached after moving their rows out of the default
+    # partition, since a partition can't overlap with rows stored there.
+    qn = cursor.db.ops.quote_name
+    created: list[str] = []
+
+    while start < end:
+        name = f"{table}_p{start:%Y%m%d}"
+        bounds = [start, start + PARTITION_INTERVAL]
+        cursor.execute(f"CREATE TABLE {qn(name)} (LIKE {qn(table)})")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {qn(f'{table}_default')} "
+            f"WHERE {qn(column)} >= %s AND {qn(column)} < %s RETURNING *) "
+            f"INSERT INTO {qn(name)} SELECT * FROM moved",
+            bounds,
+        )
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} "
+            "FOR VALUES FROM (%s) TO (%s)",
+            bounds,
+        )
+        created.append(name)
+        start += PARTITION_INTERVAL
+
+    return created
+
+
+def maintain_partitions() -> tuple[list[str], list[str]]:
+    # Creates the partitions of the upcoming days and drops the partitions
+    # whose rows are all older than the retention of their table.
+    created: list[str] = []
+    dropped: list[str] = []
+
+    qn = connection.ops.quote_name
+    now = timezone.now()
+
+    for table, column, retention in get_partitioned_tables():
+        if not is_partitioned(connection, table):
+            continue
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            partitions = get_partitions(cursor, table)
+            start = max(upper_bound for _, upper_bound in partitions)
+            created += create_partitions(
+                cursor, table, column, start, get_premade_until()
+            )
+
+            if retention is None:
+                continue
+
+            for name, upper_bound in partitions:
+                if upper_bound <= now - retention:
+                    cursor.execute(f"DROP TABLE {qn(name)}")
+                    dropped.append(name)
+
+            cursor.execute(
+                f"DELETE FROM {qn(f'{table}_default')} WHERE {qn(column)} < %s",
+                [now - retention],
+            )
+
+    return created, dropped
@@ -0,0 +1,86 @@
+import time
+from collections import Counter
+from typing import NamedTuple
+
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from expo_notifications.conf import settings
+from expo_notifications.models import Message, Receipt, Ticket
+from expo_notifications.partitioning import is_partitioned
+
+MODELS = (Message, Ticket, Receipt)
+
+
+class PruningResult(NamedTuple):
+    deleted: Counter
+    seconds: float
+
+    def __str__(self) -> str:
+        counts = [
+            f"{self.deleted[model._meta.label]} {model._meta.verbose_name_plural}"
+            for model in MODELS
+        ]
+        total = sum(self.deleted.values())
+        rate = total / self.seconds if self.seconds else 0
+        return (
+            f"Deleted {', '.join(counts[:-1])} and {counts[-1]} "
+            f"in {self.seconds:.2f} seconds ({rate:.0f} rows/s)"
+        )
+
+
+def prune() -> PruningResult:
+    # Receipts and tickets are pruned first, so pruning messages mostly
+    # deletes the messages themselves instead of cascading to many rows.
+    start = time.monotonic()
+    now = timezone.now()
+    deleted = Counter()
+
+    # Partitioned tables are pruned by dropping partitions instead
+    if settings.receipt_retention is not None and not is_partitioned(
+        connection, Receipt._meta.db_table
+    ):
+        receipts = Receipt.objects.filter(
+            date_checked__lt=now - settings.receipt_retention
+        )
+        deleted.update(prune_queryset(receipts.order_by("date_checked")))
+
+    if settings.ticket_retention is not None and not is_partitioned(
+        connection, Ticket._meta.db_table
+    ):
+        tickets = Ticket.objects.filter(
+            date_received__lt=now - settings.ticket_retention
+        )
+        deleted.update(prune_queryset(tickets.order_by("date_received")))
+
+    if settings.message_retention is not None:
+        # Messages which may still be sent are kept
+        messages = Message.objects.filter(
+            date_created__lt=now - settings.message_retention
+        ).exclude(
+            status__in=[
+                Message.STATUS_DRAFT,
+                Message.STATUS_QUEUED,
+                Message.STATUS_SENDING,
+            ]
+        )
+        deleted.update(prune_queryset(messages.order_by("date_created")))
+
+    return PruningResult(deleted, time.monotonic() - start)
+
+
+def prune_queryset(queryset: models.QuerySet) -> Counter:
+    # Deletes in batches, so each transaction only locks a bounded number of rows
+    deleted = Counter()
+    batch_size = settings.pruning_batch_size
+    pk_queryset = queryset.values_list("pk", flat=True)
+
+    while pks := list(pk_queryset[:batch_size]):
+        with transaction.atomic():
+            _, counts = queryset.model.objects.filter(pk__in=pks).delete()
+        deleted.update(counts)
+
+        if len(pks) < batch_size:
+            break
+
+    return deleted
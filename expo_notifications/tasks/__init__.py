@@ -1,7 +1,17 @@
 from .check_receipts_task import check_receipts
+from .collect_receipts_task import collect_receipts
+from .dispatch_messages_task import dispatch_messages
+from .maintain_partitions_task import maintain_partitions
+from .prune_notifications_task import prune_notifications
 from .send_messages_task import send_messages
+from .send_scheduled_messages_task import send_scheduled_messages
 
 __all__ = (
     "check_receipts",
+    "collect_receipts",
+    "dispatch_messages",
+    "maintain_partitions",
+    "prune_notifications",
     "send_messages",
+    "send_scheduled_messages",
 )
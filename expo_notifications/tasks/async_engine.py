@@ -0,0 +1,78 @@
+import asyncio
+
+import httpx
+from asgiref.sync import sync_to_async
+from exponent_server_sdk import PushMessage, PushTicket
+from requests.exceptions import ConnectionError, HTTPError
+
+from expo_notifications.models import Message
+from expo_notifications.tasks.client import PushClient, get_data
+from expo_notifications.tasks.send_messages_task import (
+    PUBLISH_ERRORS,
+    ChunkOutcome,
+    group_messages,
+    reject_invalid_messages,
+    to_push_message,
+)
+from expo_notifications.tasks.session import headers
+from expo_notifications.tasks.throttle import athrottle, handle_throttling
+
+
+async def publish_chunks_async(
+    push_client: PushClient, chunks: list[list[Message]], concurrency: int
+) -> list[ChunkOutcome]:
+    semaphore = asyncio.Semaphore(concurrency)
+    throttling_errors: list[Exception] = []
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(headers=headers, limits=limits) as client:
+
+        async def publish(messages: list[Message]) -> ChunkOutcome:
+            async with semaphore:
+                if throttling_errors:
+                    return ChunkOutcome(messages, [], throttling_errors[0])
+                try:
+                    results = await publish_chunk_async(client, push_client, messages)
+                except PUBLISH_ERRORS as error:
+                    if await sync_to_async(handle_throttling)(error):
+                        throttling_errors.append(error)
+                    return ChunkOutcome(messages, [], error)
+                return ChunkOutcome(messages, results)
+
+        return await asyncio.gather(*(publish(chunk) for chunk in chunks))
+
+
+async def publish_chunk_async(
+    client: httpx.AsyncClient, push_client: PushClient, messages: list[Message]
+) -> list[tuple[Message, PushTicket]]:
+    messages, rejected_results = reject_invalid_messages(messages)
+    groups = group_messages(messages)
+    push_messages = [to_push_message(group) for group in groups]
+    recipients = [message for group in groups for message in group]
+
+    if not push_messages:
+        return rejected_results
+
+    await athrottle(len(recipients))
+
+    push_tickets = await publish_async(client, push_client, push_messages)
+
+    return rejected_results + list(zip(recipients, push_tickets))
+
+
+async def publish_async(
+    client: httpx.AsyncClient, push_client: PushClient, push_messages: list[PushMessage]
+) -> list[PushTicket]:
+    # Errors are raised as the requests exceptions the blocking client raises,
+    # so the sending task retries the same way regardless of the engine.
+    try:
+        response = await client.post(
+            push_client.publish_url(),
+            content=get_data(push_messages),
+            timeout=push_client.timeout,
+        )
+        return push_client.to_push_tickets(push_messages, response)
+    except httpx.HTTPStatusError as error:
+        raise HTTPError(str(error), response=error.response) from error
+    except httpx.TransportError as error:
+        raise ConnectionError(str(error)) from error
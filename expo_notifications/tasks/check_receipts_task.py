@@ -1,4 +1,5 @@
 from celery import shared_task
+from celery.utils.log import get_task_logger
 from django.utils import timezone
 from exponent_server_sdk import (
     DeviceNotRegisteredError,
@@ -10,9 +11,13 @@ from exponent_server_sdk import (
 from requests.exceptions import ConnectionError, HTTPError
 
 from expo_notifications.conf import settings
-from expo_notifications.models import Receipt, Ticket
+from expo_notifications.models import Device, PushError, Receipt, Ticket
 from expo_notifications.tasks.session import session
 
+logger = get_task_logger(__name__)
+
+RECEIPT_ERRORS = (PushServerError, ConnectionError, HTTPError)
+
 
 @shared_task(
     bind=True,
@@ -21,41 +26,96 @@ from expo_notifications.tasks.session import session
     default_retry_delay=settings.checking_task_retry_delay.total_seconds(),
 )
 def check_receipts(self, ticket_pks: list[str]) -> None:
-    tickets = Ticket.objects.filter(pk__in=ticket_pks).exclude(external_id="")
+    try:
+        store_receipts(ticket_pks)
+    except RECEIPT_ERRORS:
+        raise self.retry()
+
+
+def store_receipts(ticket_pks: list[int]) -> list[int]:
+    # Returns the primary keys of the tickets whose receipts were stored, which
+    # leaves out tickets whose receipts Expo has not produced yet.
+    tickets = (
+        Ticket.objects.filter(pk__in=ticket_pks)
+        .exclude(external_id="")
+        .select_related("message__device", "message__campaign")
+    )
+    tickets_by_external_id = {ticket.external_id: ticket for ticket in tickets}
 
     push_tickets = [ticket.to_push_ticket() for ticket in tickets]
 
     push_client = PushClient(session=session)
 
-    try:
-        push_receipts: list[PushReceipt] = push_client.check_receipts_multiple(
-            push_tickets
-        )
-    except PushServerError:
-        raise self.retry()
-    except (ConnectionError, HTTPError):
-        raise self.retry()
+    push_receipts: list[PushReceipt] = push_client.check_receipts_multiple(push_tickets)
 
     receipts: list[Receipt] = []
+    failed_receipts: list[tuple[Receipt, PushError]] = []
+    unregistered_device_pks: set[int] = set()
 
     for push_receipt in push_receipts:
-        ticket = tickets.get(external_id=push_receipt.id)
+        ticket = tickets_by_external_id[push_receipt.id]
 
         try:
             push_receipt.validate_response()
         except DeviceNotRegisteredError:
-            ticket.message.device.is_active = False
-            ticket.message.device.save()
+            unregistered_device_pks.add(ticket.message.device_id)
         except PushTicketError:
             pass
 
-        receipts.append(
-            Receipt(
-                ticket=ticket,
-                is_success=push_receipt.is_success(),
-                error_message=push_receipt.message,
-                date_checked=timezone.now(),
+        receipt = Receipt(
+            ticket=ticket,
+            is_success=push_receipt.is_success(),
+            error_message=push_receipt.message,
+            date_checked=timezone.now(),
+        )
+        receipts.append(receipt)
+
+        if not receipt.is_success:
+            receipt.error_code = PushError.get_code(push_receipt.details)
+            push_error = PushError.build(
+                push_receipt.message,
+                push_receipt.details,
+                ticket.message.device.push_token,
             )
+            failed_receipts.append((receipt, push_error))
+            # The message is read through the error instead
+            receipt.error_message = ""
+
+    push_errors = PushError.objects.bulk_get_or_create(
+        [push_error for _, push_error in failed_receipts]
+    )
+    for (receipt, _), push_error in zip(failed_receipts, push_errors):
+        receipt.error = push_error
+
+    if settings.receipt_storage == "ticket":
+        # Saves inserting a receipt row per ticket
+        for receipt in receipts:
+            receipt.ticket.receipt_is_success = receipt.is_success
+            receipt.ticket.receipt_error_message = receipt.error_message
+            receipt.ticket.receipt_error_code = receipt.error_code
+            receipt.ticket.receipt_error = receipt.error
+            receipt.ticket.date_checked = receipt.date_checked
+
+        Ticket.objects.bulk_update(
+            [receipt.ticket for receipt in receipts],
+            [
+                "receipt_is_success",
+                "receipt_error_message",
+                "receipt_error_code",
+                "receipt_error",
+                "date_checked",
+            ],
         )
+    else:
+        Receipt.objects.bulk_create(receipts)
+        Ticket.objects.filter(
+            pk__in=[receipt.ticket_id for receipt in receipts]
+        ).update(date_checked=timezone.now())
+
+    if unregistered_device_pks:
+        deactivated_count = Device.objects.filter(
+            pk__in=unregistered_device_pks
+        ).deactivate()
+        logger.info("Deactivated %d unregistered devices", deactivated_count)
 
-    Receipt.objects.bulk_create(receipts)
+    return [receipt.ticket_id for receipt in receipts]
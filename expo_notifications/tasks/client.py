@@ -0,0 +1,100 @@
+import json
+from urllib.parse import urlencode, urljoin
+
+import exponent_server_sdk
+from exponent_server_sdk import PushMessage, PushServerError, PushTicket
+
+
+class PushClient(exponent_server_sdk.PushClient):
+    # The SDK neither accepts push messages with multiple recipients nor pairs
+    # the per-recipient tickets of Expo's response with the right push message.
+    # This client sends them as is and returns one ticket per recipient, each
+    # referring to a push message addressed to that recipient only.
+
+    def _publish_internal(self, push_messages: list[PushMessage]) -> list[PushTicket]:
+        response = self.session.post(
+            self.publish_url(),
+            data=get_data(push_messages),
+            timeout=self.timeout,
+        )
+        return self.to_push_tickets(push_messages, response)
+
+    def publish_url(self) -> str:
+        url = urljoin(self.host, self.api_url + "/push/send")
+        if self.force_fcm_v1 is not None:
+            query_params = {"useFcmV1": "true" if self.force_fcm_v1 else "false"}
+            url += "?" + urlencode(query_params)
+        return url
+
+    def to_push_tickets(
+        self, push_messages: list[PushMessage], response
+    ) -> list[PushTicket]:
+        recipients = [
+            push_message._replace(to=to)
+            for push_message in push_messages
+            for to in get_recipients(push_message)
+        ]
+
+        try:
+            response_data = response.json()
+        except ValueError:
+            response.raise_for_status()
+            raise PushServerError("Invalid server response", response)
+
+        if "errors" in response_data:
+            raise PushServerError(
+                "Request failed",
+                response,
+                response_data=response_data,
+                errors=response_data["errors"],
+            )
+
+        if "data" not in response_data:
+            raise PushServerError(
+                "Invalid server response",
+                response,
+                response_data=response_data,
+            )
+
+        response.raise_for_status()
+
+        if len(recipients) != len(response_data["data"]):
+            raise PushServerError(
+                f"Mismatched response length. Expected {len(recipients)} tickets "
+                f"but received {len(response_data['data'])}",
+                response,
+                response_data=response_data,
+            )
+
+        return [
+            PushTicket(
+                push_message=push_message,
+                status=push_ticket.get("status", PushTicket.ERROR_STATUS),
+                message=push_ticket.get("message", ""),
+                details=push_ticket.get("details", None),
+                id=push_ticket.get("id", ""),
+            )
+            for push_message, push_ticket in zip(recipients, response_data["data"])
+        ]
+
+
+def get_recipients(push_message: PushMessage) -> list[str]:
+    if isinstance(push_message.to, list):
+        return push_message.to
+    return [push_message.to]
+
+
+def get_data(push_messages: list[PushMessage]) -> str:
+    return json.dumps([get_payload(push_message) for push_message in push_messages])
+
+
+def get_payload(push_message: PushMessage) -> dict:
+    recipients = get_recipients(push_message)
+
+    for to in recipients:
+        if not PushClient.is_exponent_push_token(to):
+            raise ValueError("Invalid push token")
+
+    payload = push_message._replace(to=recipients[0]).get_payload()
+    payload["to"] = push_message.to
+    return payload
@@ -0,0 +1,37 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+from expo_notifications.conf import settings
+from expo_notifications.models import Ticket
+from expo_notifications.tasks.check_receipts_task import RECEIPT_ERRORS, store_receipts
+from expo_notifications.utils import chunked
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(ignore_result=True)
+def collect_receipts() -> None:
+    shard_size = settings.checking_task_shard_size
+    unchecked_ticket_pks: set[int] = set()
+
+    try:
+        while ticket_pks := Ticket.objects.all().claim_receipts(limit=shard_size):
+            unchecked_ticket_pks.update(ticket_pks)
+
+            try:
+                unchecked_ticket_pks.difference_update(store_receipts(ticket_pks))
+            except RECEIPT_ERRORS:
+                logger.warning(
+                    "Failed to check %d receipts, they will be collected again",
+                    len(ticket_pks),
+                )
+                return
+
+            if len(ticket_pks) < shard_size:
+                return
+    finally:
+        # Claims of receipts which were not checked, e.g. because Expo has not
+        # produced them yet, are released at the end of the run, so the run
+        # does not claim them again
+        for shard in chunked(unchecked_ticket_pks, shard_size):
+            Ticket.objects.filter(pk__in=shard).release_receipts()
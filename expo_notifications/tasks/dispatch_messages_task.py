@@ -0,0 +1,53 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+from expo_notifications.conf import settings
+from expo_notifications.managers.message_manager import MessageQueryset
+from expo_notifications.models import Message
+from expo_notifications.tasks.send_messages_task import deliver_messages
+from expo_notifications.tasks.throttle import get_retry_countdown, is_throttling
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(ignore_result=True)
+def dispatch_messages() -> None:
+    drain_messages(Message.objects.all().due())
+
+
+def drain_messages(messages: MessageQueryset) -> None:
+    # Claims and sends batches of messages until none are left. Messages which
+    # failed to send are left for the next run, which stops draining if Expo
+    # asks to slow down.
+    batch_size = settings.sending_task_shard_size
+    failed_message_pks: list[int] = []
+
+    if inactive_count := messages.fail_inactive():
+        logger.info("Skipped %d messages to inactive devices", inactive_count)
+
+    if expired_count := messages.expire():
+        logger.info("Skipped %d expired messages", expired_count)
+
+    messages = messages.filter(device__is_active=True).ready()
+
+    while message_pks := messages.exclude(pk__in=failed_message_pks).claim(
+        limit=batch_size
+    ):
+        failed_outcomes = deliver_messages(message_pks, settings.send_concurrency)
+
+        for outcome in failed_outcomes:
+            failed_message_pks.extend(message.pk for message in outcome.messages)
+            # Pauses all workers in case Expo asked to slow down
+            get_retry_countdown(outcome.error)
+
+        if any(is_throttling(outcome.error) for outcome in failed_outcomes):
+            break
+
+        if len(message_pks) < batch_size:
+            break
+
+    if failed_message_pks:
+        logger.warning(
+            "Failed to send %d messages, they will be dispatched again",
+            len(failed_message_pks),
+        )
@@ -0,0 +1,12 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+from expo_notifications.partitioning import maintain_partitions as maintain
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(ignore_result=True)
+def maintain_partitions() -> None:
+    created, dropped = maintain()
+    logger.info("Created %d and dropped %d partitions", len(created), len(dropped))
@@ -0,0 +1,11 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+from expo_notifications.pruning import prune
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(ignore_result=True)
+def prune_notifications() -> None:
+    logger.info("%s", prune())
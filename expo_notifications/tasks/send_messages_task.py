@@ -1,8 +1,15 @@
+import asyncio
+import json
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
 from celery import shared_task
+from celery.utils.log import get_task_logger
 from django.utils import timezone
 from exponent_server_sdk import (
     DeviceNotRegisteredError,
-    PushClient,
+    PushMessage,
     PushServerError,
     PushTicket,
     PushTicketError,
@@ -10,9 +17,26 @@ from exponent_server_sdk import (
 from requests.exceptions import ConnectionError, HTTPError
 
 from expo_notifications.conf import settings
-from expo_notifications.models import Message, Ticket
+from expo_notifications.models import Device, Message, PushError, Ticket
 from expo_notifications.tasks import check_receipts
+from expo_notifications.tasks.client import PushClient
 from expo_notifications.tasks.session import session
+from expo_notifications.tasks.throttle import (
+    get_retry_countdown,
+    handle_throttling,
+    throttle,
+)
+from expo_notifications.utils import chunked
+
+logger = get_task_logger(__name__)
+
+PUBLISH_ERRORS = (PushServerError, ConnectionError, HTTPError)
+
+
+class ChunkOutcome(NamedTuple):
+    messages: list[Message]
+    results: list[tuple[Message, PushTicket]]
+    error: Exception | None = None
 
 
 @shared_task(
@@ -21,47 +45,232 @@ from expo_notifications.tasks.session import session
     max_retries=settings.sending_task_max_retries,
     default_retry_delay=settings.sending_task_retry_delay.total_seconds(),
 )
-def send_messages(self, message_pks: list[str]) -> None:
-    messages = Message.objects.filter(pk__in=message_pks, device__is_active=True)
+def send_messages(self, message_pks: list[str], priority: str | None = None) -> None:
+    lane = settings.priority_lanes.get(priority, {})
+    concurrency = lane.get("concurrency", settings.send_concurrency)
 
-    push_messages = [message.to_push_message() for message in messages]
+    messages = Message.objects.filter(pk__in=message_pks)
 
-    push_client = PushClient(session=session)
+    if inactive_count := messages.fail_inactive():
+        logger.info("Skipped %d messages to inactive devices", inactive_count)
+
+    if expired_count := messages.expire():
+        logger.info("Skipped %d expired messages", expired_count)
+
+    claimed_message_pks = messages.filter(device__is_active=True).due().claim()
+
+    failed_outcomes = deliver_messages(claimed_message_pks, concurrency)
+
+    failed_message_pks = [
+        message.pk for outcome in failed_outcomes for message in outcome.messages
+    ]
+    countdowns = [
+        countdown
+        for outcome in failed_outcomes
+        if (countdown := get_retry_countdown(outcome.error)) is not None
+    ]
+
+    # Messages still claimed by another task, e.g. one which crashed before
+    # this task was redelivered, are retried once that claim has expired
+    if busy_message_pks := list(
+        messages.filter(status=Message.STATUS_SENDING).values_list("pk", flat=True)
+    ):
+        failed_message_pks.extend(busy_message_pks)
+        countdowns.append(settings.claim_timeout.total_seconds())
+
+    if failed_message_pks:
+        raise self.retry(
+            args=[failed_message_pks, priority],
+            kwargs={},
+            countdown=max(countdowns, default=None),
+        )
 
+
+def deliver_messages(message_pks: list[int], concurrency: int) -> list[ChunkOutcome]:
+    # Sends claimed messages and stores their tickets. Messages left without a
+    # ticket, e.g. those of chunks which failed to send, are released to be sent
+    # again, even if sending raised. The outcomes of failed chunks are returned.
     try:
-        push_tickets: list[PushTicket] = push_client.publish_multiple(push_messages)
-    except PushServerError:
-        raise self.retry()
-    except (ConnectionError, HTTPError):
-        raise self.retry()
+        return publish_messages(message_pks, concurrency)
+    finally:
+        Message.objects.filter(pk__in=message_pks).release()
+
+
+def publish_messages(message_pks: list[int], concurrency: int) -> list[ChunkOutcome]:
+    messages = (
+        Message.objects.filter(pk__in=message_pks)
+        .select_related("device")
+        .prefetch_related("campaign")
+        .order_by("pk")
+    )
+
+    push_client = PushClient(session=session)
+    chunks = chunked(messages, push_client.max_message_count)
+
+    outcomes = publish_chunks(push_client, chunks, concurrency)
+    results = [result for outcome in outcomes for result in outcome.results]
+    failed_outcomes = [outcome for outcome in outcomes if outcome.error is not None]
 
     tickets: list[Ticket] = []
+    failed_tickets: list[tuple[Ticket, PushError]] = []
+    unregistered_device_pks: set[int] = set()
 
-    for message, push_ticket in zip(messages, push_tickets):
+    for message, push_ticket in results:
         try:
             push_ticket.validate_response()
         except DeviceNotRegisteredError:
-            message.device.is_active = False
-            message.device.save()
+            unregistered_device_pks.add(message.device_id)
         except PushTicketError:
             pass
 
-        tickets.append(
-            Ticket(
-                message=message,
-                is_success=push_ticket.is_success(),
-                external_id=push_ticket.id,
-                error_message=push_ticket.message,
-                date_received=timezone.now(),
-            )
+        ticket = Ticket(
+            message=message,
+            is_success=push_ticket.is_success(),
+            external_id=push_ticket.id,
+            error_message=push_ticket.message,
+            date_received=timezone.now(),
         )
+        tickets.append(ticket)
+
+        if not ticket.is_success:
+            ticket.error_code = PushError.get_code(push_ticket.details)
+            push_error = PushError.build(
+                push_ticket.message, push_ticket.details, message.device.push_token
+            )
+            failed_tickets.append((ticket, push_error))
+            # The message is read through the error instead
+            ticket.error_message = ""
+
+    push_errors = PushError.objects.bulk_get_or_create(
+        [push_error for _, push_error in failed_tickets]
+    )
+    for (ticket, _), push_error in zip(failed_tickets, push_errors):
+        ticket.error = push_error
+
+    if unregistered_device_pks:
+        deactivated_count = Device.objects.filter(
+            pk__in=unregistered_device_pks
+        ).deactivate()
+        logger.info("Deactivated %d unregistered devices", deactivated_count)
 
     pks_of_success_tickets = [
         ticket.pk for ticket in Ticket.objects.bulk_create(tickets) if ticket.is_success
     ]
 
-    if pks_of_success_tickets:
+    Message.objects.filter(
+        pk__in=[ticket.message_id for ticket in tickets if ticket.is_success]
+    ).update(status=Message.STATUS_SENT)
+    Message.objects.filter(
+        pk__in=[ticket.message_id for ticket in tickets if not ticket.is_success]
+    ).update(status=Message.STATUS_FAILED)
+
+    # Otherwise, receipts are checked by the collect_receipts task
+    if pks_of_success_tickets and settings.receipt_check_mode == "task":
         check_receipts.apply_async(
             kwargs={"ticket_pks": pks_of_success_tickets},
             countdown=settings.receipt_check_delay.total_seconds(),
         )
+
+    return failed_outcomes
+
+
+def publish_chunks(
+    push_client: PushClient, chunks: Iterable[list[Message]], concurrency: int
+) -> list[ChunkOutcome]:
+    if settings.sending_engine == "asyncio":
+        from expo_notifications.tasks.async_engine import publish_chunks_async
+
+        return asyncio.run(publish_chunks_async(push_client, list(chunks), concurrency))
+
+    throttling_errors: list[Exception] = []
+
+    def publish(messages: list[Message]) -> ChunkOutcome:
+        # Once Expo asks to slow down, chunks not yet published are left for the
+        # retry instead of being sent into the same throttling
+        if throttling_errors:
+            return ChunkOutcome(messages, [], throttling_errors[0])
+
+        outcome = try_publish_chunk(push_client, messages)
+
+        if handle_throttling(outcome.error):
+            throttling_errors.append(outcome.error)
+
+        return outcome
+
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(publish, chunks))
+
+    return [publish(chunk) for chunk in chunks]
+
+
+def try_publish_chunk(push_client: PushClient, messages: list[Message]) -> ChunkOutcome:
+    try:
+        return ChunkOutcome(messages, publish_chunk(push_client, messages))
+    except PUBLISH_ERRORS as error:
+        return ChunkOutcome(messages, [], error)
+
+
+def publish_chunk(
+    push_client: PushClient, messages: list[Message]
+) -> list[tuple[Message, PushTicket]]:
+    messages, rejected_results = reject_invalid_messages(messages)
+    groups = group_messages(messages)
+    push_messages = [to_push_message(group) for group in groups]
+    recipients = [message for group in groups for message in group]
+
+    if not push_messages:
+        return rejected_results
+
+    throttle(len(recipients))
+
+    results = list(zip(recipients, push_client.publish_multiple(push_messages)))
+    return rejected_results + results
+
+
+def reject_invalid_messages(
+    messages: list[Message],
+) -> tuple[list[Message], list[tuple[Message, PushTicket]]]:
+    # Expo refuses a whole request if a single push token is malformed, so such
+    # messages fail on their own with an error ticket instead of being sent.
+    valid_messages = []
+    rejected_results = []
+
+    for message in messages:
+        if PushClient.is_exponent_push_token(message.device.push_token):
+            valid_messages.append(message)
+        else:
+            push_ticket = PushTicket(
+                push_message=message.to_push_message(),
+                status=PushTicket.ERROR_STATUS,
+                message="Invalid push token",
+                details=None,
+                id="",
+            )
+            rejected_results.append((message, push_ticket))
+
+    return valid_messages, rejected_results
+
+
+def group_messages(messages: list[Message]) -> list[list[Message]]:
+    if not settings.coalesce_push_messages:
+        return [[message] for message in messages]
+
+    groups: dict[str, list[Message]] = {}
+
+    for message in messages:
+        payload = message.to_push_message()._replace(to=None)._asdict()
+        key = json.dumps(payload, sort_keys=True)
+        groups.setdefault(key, []).append(message)
+
+    return list(groups.values())
+
+
+def to_push_message(messages: list[Message]) -> PushMessage:
+    push_message = messages[0].to_push_message()
+
+    if len(messages) > 1:
+        push_tokens = [message.device.push_token for message in messages]
+        return push_message._replace(to=push_tokens)
+
+    return push_message
@@ -0,0 +1,33 @@
+from collections import defaultdict
+
+from celery import shared_task
+from django.utils import timezone
+
+from expo_notifications.conf import settings
+from expo_notifications.dispatch import enqueue_messages
+from expo_notifications.models import Message
+
+
+@shared_task(ignore_result=True)
+def send_scheduled_messages() -> None:
+    if settings.delivery_mode == "outbox":
+        # Due messages are sent by the dispatch_messages task instead
+        return
+
+    batch_size = settings.sending_task_shard_size
+    messages = Message.objects.filter(send_at__lte=timezone.now()).order_by("send_at")
+
+    # Due messages are handed off to sending tasks in batches, so they are sent
+    # by as many tasks and through the same priority lanes as other messages
+    while leased := messages.lease(limit=batch_size):
+        lanes: dict[str | None, list[int]] = defaultdict(list)
+        for message_pk, priority in leased:
+            if priority not in settings.priority_lanes:
+                priority = None
+            lanes[priority].append(message_pk)
+
+        for priority, message_pks in lanes.items():
+            enqueue_messages(message_pks, priority)
+
+        if len(leased) < batch_size:
+            break
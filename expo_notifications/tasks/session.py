@@ -1,15 +1,23 @@
 import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 
 from expo_notifications.conf import settings
 
-session = requests.Session()
-session.headers.update(
-    {
-        "accept": "application/json",
-        "accept-encoding": "gzip, deflate",
-        "content-type": "application/json",
-    }
-)
+headers = {
+    "accept": "application/json",
+    "accept-encoding": "gzip, deflate",
+    "content-type": "application/json",
+}
 
 if settings.token is not None:
-    session.headers.update({"Authorization": f"Bearer {settings.token}"})
+    headers["Authorization"] = f"Bearer {settings.token}"
+
+pool_maxsize = max(
+    DEFAULT_POOLSIZE,
+    settings.send_concurrency,
+    *(lane.get("concurrency", 1) for lane in settings.priority_lanes.values()),
+)
+
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_maxsize=pool_maxsize))
+session.headers.update(headers)
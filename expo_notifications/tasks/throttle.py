@@ -0,0 +1,125 @@
+import asyncio
+import math
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from exponent_server_sdk import PushServerError
+
+from expo_notifications.conf import settings
+
+BLOCKED_UNTIL_KEY = "expo_notifications:throttle:blocked_until"
+WINDOW_KEY = "expo_notifications:throttle:window:{}"
+
+
+def throttle(count: int) -> None:
+    if settings.send_rate_limit is None:
+        return
+
+    while (delay := reserve(count)) > 0:
+        time.sleep(delay)
+
+
+async def athrottle(count: int) -> None:
+    if settings.send_rate_limit is None:
+        return
+
+    while (delay := await sync_to_async(reserve)(count)) > 0:
+        await asyncio.sleep(delay)
+
+
+def reserve(count: int) -> float:
+    # Returns zero if `count` pushes may be sent right away, otherwise the number
+    # of seconds to wait before trying again. Pushes are counted in windows of
+    # one second shared by all workers through the cache.
+    now = time.time()
+
+    blocked_until = cache.get(BLOCKED_UNTIL_KEY, 0)
+    if blocked_until > now:
+        return blocked_until - now
+
+    window = int(now)
+    key = WINDOW_KEY.format(window)
+
+    # A chunk larger than the limit takes up a whole window on its own
+    count = min(count, settings.send_rate_limit)
+
+    if cache.add(key, count, timeout=2):
+        return 0
+
+    if cache.incr(key, count) <= settings.send_rate_limit:
+        return 0
+
+    # Give back what was rejected, so it does not use up the window
+    cache.decr(key, count)
+
+    return window + 1 - now
+
+
+def block(seconds: float) -> None:
+    cache.set(BLOCKED_UNTIL_KEY, time.time() + seconds, timeout=math.ceil(seconds) + 1)
+
+
+def is_throttling(error: Exception | None) -> bool:
+    # Other errors, e.g. invalid responses, only fail the chunk they occurred in
+    response = getattr(error, "response", None)
+    if response is not None and response.status_code == 429:
+        return True
+
+    if not isinstance(error, PushServerError):
+        return False
+
+    return any(
+        isinstance(item, dict) and item.get("code") == "TOO_MANY_REQUESTS"
+        for item in error.errors or []
+    )
+
+
+def handle_throttling(error: Exception | None) -> bool:
+    # Returns whether the error means Expo asks to slow down, in which case all
+    # workers pause sending for the requested time, or the retry delay.
+    if not is_throttling(error):
+        return False
+
+    retry_after = get_retry_after(getattr(error, "response", None))
+
+    if retry_after is None:
+        retry_after = settings.sending_task_retry_delay.total_seconds()
+
+    block(retry_after)
+
+    return True
+
+
+def get_retry_countdown(error: Exception) -> float | None:
+    retry_after = get_retry_after(getattr(error, "response", None))
+
+    if retry_after is None:
+        return None
+
+    if settings.send_rate_limit is not None:
+        block(retry_after)
+
+    return retry_after + random.uniform(0, retry_after)
+
+
+def get_retry_after(response) -> float | None:
+    if response is None or response.status_code != 429:
+        return None
+
+    value = response.headers.get("Retry-After")
+
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
@@ -1,6 +1,19 @@
 from datetime import datetime, timezone
+from os import environ
 
 import pytest
+from django.core.management import call_command
+from exponent_server_sdk import PushClient
+
+from tests.fake_expo_server import FakeExpoServer
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker):
+    # Set POSTGRES_PARTITIONING to run the tests against partitioned tables
+    if "POSTGRES_PARTITIONING" in environ:
+        with django_db_blocker.unblock():
+            call_command("partition_expo_notifications")
 
 
 @pytest.fixture
@@ -21,3 +34,12 @@ def mock_send_messages_delay_on_commit(mocker):
 def mock_check_receipts_delay_on_commit(mocker):
     path = "expo_notifications.tasks.check_receipts_task.check_receipts.delay_on_commit"
     return mocker.patch(path)
+
+
+@pytest.fixture
+def fake_expo_server(mocker):
+    server = FakeExpoServer()
+    server.start()
+    mocker.patch.object(PushClient, "DEFAULT_HOST", server.url)
+    yield server
+    server.stop()
@@ -2,7 +2,14 @@ import factory
 from django.conf import settings
 from django.utils import timezone
 
-from expo_notifications.models import Device, Message, Receipt, Ticket
+from expo_notifications.models import (
+    Campaign,
+    Device,
+    Message,
+    PushError,
+    Receipt,
+    Ticket,
+)
 
 
 class UserFactory(factory.django.DjangoModelFactory):
@@ -27,16 +34,42 @@ class ActiveDeviceFactory(DeviceFactory):
     is_active = True
 
 
+class CampaignFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Campaign
+
+    data = factory.Faker("pydict", value_types=(str,))
+    title = factory.Faker("text", max_nb_chars=64)
+    body = factory.Faker("text", max_nb_chars=256)
+    ttl = factory.Faker("time_delta")
+    expiration = factory.Faker(
+        "future_datetime", tzinfo=timezone.get_current_timezone()
+    )
+    priority = factory.Faker(
+        "random_element", elements=[p for p, _ in Campaign.PRIORITY_CHOICES]
+    )
+    subtitle = factory.Faker("text", max_nb_chars=64)
+    sound = factory.Faker("text", max_nb_chars=64)
+    badge = factory.Faker("random_int", min=0, max=100)
+    channel_id = factory.Faker("word")
+    category_id = factory.Faker("word")
+    mutable_content = factory.Faker("boolean")
+    date_created = factory.Faker("date_time", tzinfo=timezone.get_current_timezone())
+
+
 class MessageFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Message
 
     device = factory.SubFactory(DeviceFactory)
+    status = Message.STATUS_QUEUED
     data = factory.Faker("pydict", value_types=(str,))
     title = factory.Faker("text", max_nb_chars=64)
     body = factory.Faker("text", max_nb_chars=256)
     ttl = factory.Faker("time_delta")
-    expiration = factory.Faker("date_time", tzinfo=timezone.get_current_timezone())
+    expiration = factory.Faker(
+        "future_datetime", tzinfo=timezone.get_current_timezone()
+    )
     priority = factory.Faker(
         "random_element", elements=[p for p, _ in Message.PRIORITY_CHOICES]
     )
@@ -49,6 +82,15 @@ class MessageFactory(factory.django.DjangoModelFactory):
     date_created = factory.Faker("date_time", tzinfo=timezone.get_current_timezone())
 
 
+class PushErrorFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = PushError
+
+    message = factory.Faker("text", max_nb_chars=256)
+    details = factory.Faker("pydict", value_types=(str,))
+    digest = factory.Faker("sha256")
+
+
 class TicketFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Ticket
@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeExpoServer:
+    """
+    A local stand-in for Expo's push API.
+
+    Tickets and receipts are derived from the push tokens, i.e. the ticket id of
+    a message sent to `ExponentPushToken[1]` is `ticket-ExponentPushToken[1]`.
+    Tokens listed in `unregistered_tokens` are answered with DeviceNotRegistered.
+    Requests containing tokens listed in `rate_limited_tokens` are answered with
+    `429 Too Many Requests`.
+    """
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.unregistered_tokens: set[str] = set()
+        self.rate_limited_tokens: set[str] = set()
+        self.retry_after = "1"
+        self.send_requests: list[list[dict]] = []
+        self.receipt_requests: list[list[str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.handler_class())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def tokens(self, push_messages: list[dict]) -> list[str]:
+        return [
+            token
+            for push_message in push_messages
+            for token in (
+                push_message["to"]
+                if isinstance(push_message["to"], list)
+                else [push_message["to"]]
+            )
+        ]
+
+    def is_rate_limited(self, push_messages: list[dict]) -> bool:
+        return not self.rate_limited_tokens.isdisjoint(self.tokens(push_messages))
+
+    def push_tickets(self, push_messages: list[dict]) -> list[dict]:
+        push_tickets = []
+        for push_message in push_messages:
+            tokens = push_message["to"]
+            for token in tokens if isinstance(tokens, list) else [tokens]:
+                if token in self.unregistered_tokens:
+                    push_tickets.append(
+                        {
+                            "status": "error",
+                            "message": f"{token} is not a registered push token",
+                            "details": {"error": "DeviceNotRegistered"},
+                        }
+                    )
+                else:
+                    push_tickets.append({"status": "ok", "id": f"ticket-{token}"})
+        return push_tickets
+
+    def push_receipts(self, ids: list[str]) -> dict[str, dict]:
+        return {id: {"status": "ok"} for id in ids}
+
+    def handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                with server.lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+                status = 200
+                headers = {}
+
+                try:
+                    length = int(self.headers["Content-Length"])
+                    request_data = json.loads(self.rfile.read(length))
+                    time.sleep(server.delay)
+
+                    if self.path.endswith("/push/send") and server.is_rate_limited(
+                        request_data
+                    ):
+                        status = 429
+                        headers["Retry-After"] = server.retry_after
+                        response_data = {
+                            "errors": [
+                                {
+                                    "code": "TOO_MANY_REQUESTS",
+                                    "message": "Too many requests",
+                                }
+                            ]
+                        }
+                    elif self.path.endswith("/push/send"):
+                        with server.lock:
+                            server.send_requests.append(request_data)
+                        response_data = {"data": server.push_tickets(request_data)}
+                    elif self.path.endswith("/push/getReceipts"):
+                        with server.lock:
+                            server.receipt_requests.append(request_data["ids"])
+                        response_data = {
+                            "data": server.push_receipts(request_data["ids"])
+                        }
+                    else:
+                        self.send_error(404)
+                        return
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+                body = json.dumps(response_data).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
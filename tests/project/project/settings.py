@@ -54,6 +54,16 @@ DATABASES = {
     }
 }
 
+if "POSTGRES_HOST" in environ:
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.postgresql",
+        "HOST": environ["POSTGRES_HOST"],
+        "PORT": environ.get("POSTGRES_PORT", "5432"),
+        "NAME": environ.get("POSTGRES_DB", "expo_notifications"),
+        "USER": environ.get("POSTGRES_USER", "postgres"),
+        "PASSWORD": environ.get("POSTGRES_PASSWORD", ""),
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+import pytest
+
+from expo_notifications.batching import MessageBatcher
+from expo_notifications.models import Message
+from tests.factories import DeviceFactory, MessageFactory
+
+
+@pytest.fixture
+def mock_send_messages_delay(mocker):
+    path = "expo_notifications.tasks.send_messages_task.send_messages.delay"
+    return mocker.patch(path)
+
+
+@pytest.fixture
+def mock_timer(mocker):
+    return mocker.patch("expo_notifications.batching.threading.Timer")
+
+
+@pytest.fixture
+def batcher(mocker, settings):
+    settings.EXPO_NOTIFICATIONS_SEND_BATCH_WINDOW = timedelta(milliseconds=50)
+    settings.EXPO_NOTIFICATIONS_SEND_BATCH_SIZE = 3
+    batcher = MessageBatcher()
+    mocker.patch("expo_notifications.dispatch.batcher", batcher)
+    return batcher
+
+
+def test_add_buffers_message_pks_until_the_window_has_passed(
+    batcher, mock_timer, mock_send_messages_delay
+):
+    batcher.add([1])
+    batcher.add([2])
+
+    assert not mock_send_messages_delay.called
+    assert mock_timer.call_count == 1
+    assert mock_timer.call_args.args == (0.05, batcher.flush)
+    mock_timer.return_value.start.assert_called_once()
+
+    batcher.flush()
+
+    mock_send_messages_delay.assert_called_once_with([1, 2])
+
+
+def test_add_enqueues_full_batches_right_away(
+    batcher, mock_timer, mock_send_messages_delay
+):
+    batcher.add([1, 2])
+    batcher.add([3, 4])
+
+    mock_send_messages_delay.assert_called_once_with([1, 2, 3, 4])
+    mock_timer.return_value.cancel.assert_called_once()
+    assert batcher.message_pks == []
+
+
+def test_add_enqueues_a_task_per_shard(
+    batcher, mock_timer, mock_send_messages_delay, settings
+):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_SHARD_SIZE = 2
+
+    batcher.add([1, 2, 3, 4, 5])
+
+    assert [call.args for call in mock_send_messages_delay.call_args_list] == [
+        ([1, 2],),
+        ([3, 4],),
+        ([5],),
+    ]
+
+
+def test_flush_enqueues_nothing_without_message_pks(batcher, mock_send_messages_delay):
+    batcher.flush()
+
+    assert not mock_send_messages_delay.called
+
+
+def test_add_starts_a_new_window_after_a_flush(
+    batcher, mock_timer, mock_send_messages_delay
+):
+    batcher.add([1])
+    batcher.flush()
+    batcher.add([2])
+
+    assert mock_timer.call_count == 2
+
+
+def test_window_flushes_the_batch(batcher, mock_send_messages_delay, settings):
+    settings.EXPO_NOTIFICATIONS_SEND_BATCH_WINDOW = timedelta(milliseconds=1)
+
+    batcher.add([1])
+    batcher.timer.join()
+
+    mock_send_messages_delay.assert_called_once_with([1])
+
+
+@pytest.mark.django_db
+def test_send_batches_messages_after_commit(
+    batcher,
+    mock_timer,
+    mock_send_messages_delay,
+    mock_send_messages_delay_on_commit,
+    django_capture_on_commit_callbacks,
+):
+    device = DeviceFactory()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        message1 = Message.objects.send(device=device)
+        message2 = Message.objects.send(device=device)
+
+        assert batcher.message_pks == []
+
+    assert batcher.message_pks == [message1.pk, message2.pk]
+    assert not mock_send_messages_delay.called
+    assert not mock_send_messages_delay_on_commit.called
+
+    message3 = MessageFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        message3.send()
+
+    mock_send_messages_delay.assert_called_once_with(
+        [message1.pk, message2.pk, message3.pk]
+    )
@@ -0,0 +1,25 @@
+import pytest
+
+from tests.factories import CampaignFactory
+
+
+@pytest.mark.django_db
+def test_str():
+    campaign = CampaignFactory()
+    assert str(campaign) == f"Campaign #{campaign.pk}"
+
+
+@pytest.mark.django_db
+def test_build_push_message_uses_the_given_push_token():
+    campaign = CampaignFactory()
+    push_message = campaign.build_push_message("ExponentPushToken[123]")
+    assert push_message.to == "ExponentPushToken[123]"
+
+
+@pytest.mark.django_db
+def test_build_push_message_passes_payload_through():
+    campaign = CampaignFactory(title="Test Title", body="Test Body", data={"a": "b"})
+    push_message = campaign.build_push_message("ExponentPushToken[123]")
+    assert push_message.title == "Test Title"
+    assert push_message.body == "Test Body"
+    assert push_message.data == {"a": "b"}
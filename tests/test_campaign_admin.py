@@ -0,0 +1,37 @@
+import pytest
+from bs4 import BeautifulSoup
+from django.urls import reverse
+
+from tests.factories import CampaignFactory, MessageFactory
+
+CHANGELIST_URL = reverse("admin:expo_notifications_campaign_changelist")
+
+
+@pytest.mark.django_db
+def test_changelist_renders_correctly(admin_client):
+    campaign1 = CampaignFactory()
+    campaign2 = CampaignFactory()
+    MessageFactory.create_batch(3, campaign=campaign2)
+
+    response = admin_client.get(CHANGELIST_URL)
+    assert response.status_code == 200
+
+    soup = BeautifulSoup(response.content, "html.parser")
+    str_a_tags = soup.select(".field-__str__ a")
+    messages_link_tags = soup.select(".field-messages_link")
+
+    str_td1 = str_a_tags[0]
+    assert str_td1
+    assert str_td1.text == str(campaign2)
+
+    str_td2 = str_a_tags[1]
+    assert str_td2
+    assert str_td2.text == str(campaign1)
+
+    messages_link_td1 = messages_link_tags[0]
+    assert messages_link_td1
+    assert messages_link_td1.text == "3"
+
+    messages_link_td2 = messages_link_tags[1]
+    assert messages_link_td2
+    assert messages_link_td2.text == "0"
@@ -0,0 +1,103 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from expo_notifications.models import Campaign, Device, Message
+from tests.factories import DeviceFactory
+
+
+@pytest.mark.django_db
+def test_send_creates_campaign():
+    devices = DeviceFactory.create_batch(2)
+
+    campaign = Campaign.objects.send(devices, title="Hello, World!")
+    assert Campaign.objects.get() == campaign
+    assert campaign.title == "Hello, World!"
+
+
+@pytest.mark.django_db
+def test_send_creates_a_payload_free_message_per_device():
+    devices = DeviceFactory.create_batch(3)
+
+    campaign = Campaign.objects.send(devices, title="Hello, World!")
+    assert campaign.messages.count() == 3
+
+    for device in devices:
+        message = campaign.messages.get(device=device)
+        assert message.title == ""
+        assert message.to_push_message().title == "Hello, World!"
+
+
+@pytest.mark.django_db
+def test_send_accepts_device_querysets():
+    device1 = DeviceFactory(is_active=True)
+    DeviceFactory(is_active=False)
+
+    campaign = Campaign.objects.send(Device.objects.active, title="Hello, World!")
+    assert campaign.messages.get().device == device1
+
+
+@pytest.mark.django_db
+def test_send_schedules_send_messages_tasks_per_shard(
+    mock_send_messages_delay_on_commit, settings
+):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_SHARD_SIZE = 2
+    devices = DeviceFactory.create_batch(3)
+
+    campaign = Campaign.objects.send(devices, title="Hello, World!")
+    message_pks = list(campaign.messages.order_by("pk").values_list("pk", flat=True))
+
+    assert [
+        call.args for call in mock_send_messages_delay_on_commit.call_args_list
+    ] == [
+        (message_pks[0:2],),
+        (message_pks[2:3],),
+    ]
+
+
+@pytest.mark.django_db
+def test_send_queues_messages_without_updating_them():
+    devices = DeviceFactory.create_batch(3)
+
+    with CaptureQueriesContext(connection) as context:
+        campaign = Campaign.objects.send(devices, title="Hello, World!")
+
+    assert set(campaign.messages.values_list("status", flat=True)) == {
+        Message.STATUS_QUEUED
+    }
+    assert not any(
+        query["sql"].startswith('UPDATE "expo_notifications_message"')
+        for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db
+def test_send_routes_messages_through_the_priority_lane_of_the_campaign(
+    settings, mocker
+):
+    settings.EXPO_NOTIFICATIONS_PRIORITY_LANES = {"high": {"queue": "urgent"}}
+    mock_apply_async_on_commit = mocker.patch(
+        "expo_notifications.tasks.send_messages_task"
+        ".send_messages.apply_async_on_commit"
+    )
+    devices = DeviceFactory.create_batch(2)
+
+    campaign = Campaign.objects.send(devices, title="Hello!", priority="high")
+    message_pks = list(campaign.messages.order_by("pk").values_list("pk", flat=True))
+
+    mock_apply_async_on_commit.assert_called_once_with(
+        args=(message_pks, "high"), queue="urgent"
+    )
+
+
+@pytest.mark.django_db
+def test_send_rolls_back_when_sending_fails(mock_send_messages_delay_on_commit):
+    devices = DeviceFactory.create_batch(2)
+
+    mock_send_messages_delay_on_commit.side_effect = Exception("Something went wrong")
+
+    with pytest.raises(Exception, match="Something went wrong"):
+        Campaign.objects.send(devices, title="Hello, World!")
+
+    assert Campaign.objects.count() == 0
+    assert Message.objects.count() == 0
@@ -1,5 +1,9 @@
+import logging
+
 import pytest
 from celery.exceptions import Retry
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from exponent_server_sdk import (
     PushClient,
     PushReceipt,
@@ -7,6 +11,7 @@ from exponent_server_sdk import (
 )
 from requests.exceptions import ConnectionError, HTTPError
 
+from expo_notifications.models import PushError, Receipt
 from expo_notifications.tasks import check_receipts
 from tests.factories import TicketFactory
 
@@ -26,6 +31,11 @@ def ticket2():
     return TicketFactory(external_id="test-id-2")
 
 
+@pytest.fixture
+def ticket3():
+    return TicketFactory(external_id="test-id-3")
+
+
 @pytest.mark.django_db
 def test_retries_on_push_server_errors(mock_check_receipts_multiple, ticket1, ticket2):
     mock_check_receipts_multiple.side_effect = PushServerError(
@@ -201,11 +211,15 @@ def test_stores_push_ticket_error_message(
 
     receipt1 = ticket1.receipts.get()
     assert not receipt1.is_success
-    assert receipt1.error_message == "test-error-message"
+    # The message of failed receipts is only stored on their error
+    assert receipt1.error_message == ""
+    assert receipt1.error.message == "test-error-message"
+    assert receipt1.get_error_message() == "test-error-message"
 
     receipt2 = ticket2.receipts.get()
     assert receipt2.is_success
     assert receipt2.error_message == ""
+    assert receipt2.get_error_message() == ""
 
 
 @pytest.mark.parametrize(
@@ -232,6 +246,8 @@ def test_stores_push_receipt_check_date(
 
     receipt1 = ticket1.receipts.get()
     assert receipt1.date_checked == now
+    ticket1.refresh_from_db()
+    assert ticket1.date_checked == now
 
 
 @pytest.mark.django_db
@@ -252,9 +268,13 @@ def test_can_handle_external_ids_omitted_from_response_due_to_being_unknown_to_e
 
     check_receipts([ticket1.pk, ticket2.pk])
     assert ticket1.receipts.count() == 0
+    ticket1.refresh_from_db()
+    assert ticket1.date_checked is None
 
     receipt2 = ticket2.receipts.get()
     assert receipt2.is_success
+    ticket2.refresh_from_db()
+    assert ticket2.date_checked is not None
 
 
 @pytest.mark.django_db
@@ -291,3 +311,130 @@ def test_tickets_can_be_checked_multiple_times(mock_check_receipts_multiple, tic
 
     receipt2 = ticket1.receipts.all()[1]
     assert receipt2.is_success
+
+
+@pytest.mark.django_db
+def test_reports_how_many_devices_were_deactivated(
+    mock_check_receipts_multiple, caplog, ticket1, ticket2
+):
+    mock_check_receipts_multiple.return_value = [
+        PushReceipt(
+            id=ticket1.external_id,
+            status=PushReceipt.ERROR_STATUS,
+            message="",
+            details={"error": PushReceipt.ERROR_DEVICE_NOT_REGISTERED},
+        ),
+        PushReceipt(
+            id=ticket2.external_id,
+            status=PushReceipt.ERROR_STATUS,
+            message="",
+            details={"error": PushReceipt.ERROR_DEVICE_NOT_REGISTERED},
+        ),
+    ]
+
+    with caplog.at_level(logging.INFO):
+        check_receipts([ticket1.pk, ticket2.pk])
+
+    assert "Deactivated 2 unregistered devices" in caplog.messages
+
+
+@pytest.mark.django_db
+def test_query_count_does_not_grow_with_the_number_of_tickets(
+    mock_check_receipts_multiple,
+):
+    mock_check_receipts_multiple.side_effect = lambda push_tickets: [
+        PushReceipt(
+            id=push_ticket.id,
+            status=PushReceipt.ERROR_STATUS,
+            message="",
+            details={"error": PushReceipt.ERROR_DEVICE_NOT_REGISTERED},
+        )
+        for push_ticket in push_tickets
+    ]
+
+    def count_queries(ticket_count):
+        tickets = TicketFactory.create_batch(ticket_count)
+
+        with CaptureQueriesContext(connection) as context:
+            check_receipts([ticket.pk for ticket in tickets])
+
+        return len(context.captured_queries)
+
+    assert count_queries(1) == count_queries(50)
+
+
+@pytest.mark.django_db
+def test_stores_receipts_on_tickets_with_the_ticket_receipt_storage(
+    settings, mock_check_receipts_multiple, ticket1, ticket2, ticket3, now
+):
+    settings.EXPO_NOTIFICATIONS_RECEIPT_STORAGE = "ticket"
+    mock_check_receipts_multiple.return_value = [
+        PushReceipt(
+            id=ticket1.external_id,
+            status=PushReceipt.SUCCESS_STATUS,
+            message="",
+            details=None,
+        ),
+        PushReceipt(
+            id=ticket2.external_id,
+            status=PushReceipt.ERROR_STATUS,
+            message="test-message",
+            details=None,
+        ),
+    ]
+
+    with CaptureQueriesContext(connection) as context:
+        check_receipts([ticket1.pk, ticket2.pk, ticket3.pk])
+
+    statements = [query["sql"] for query in context.captured_queries]
+    assert not any('INTO "expo_notifications_receipt"' in sql for sql in statements)
+    assert [sql.split()[0] for sql in statements].count("UPDATE") == 1
+    assert not Receipt.objects.exists()
+
+    for ticket in [ticket1, ticket2, ticket3]:
+        ticket.refresh_from_db()
+
+    assert ticket1.receipt_is_success is True
+    assert ticket1.receipt_error_message == ""
+    assert ticket1.date_checked == now
+    assert ticket2.receipt_is_success is False
+    assert ticket2.receipt_error_message == ""
+    assert ticket2.get_receipt_error_message() == "test-message"
+    assert ticket2.receipt.get_error_message() == "test-message"
+    assert ticket2.date_checked == now
+    assert ticket3.receipt_is_success is None
+    assert ticket3.date_checked is None
+
+
+@pytest.mark.parametrize("receipt_storage", ["table", "ticket"])
+@pytest.mark.django_db
+def test_stores_push_receipt_errors(
+    settings, mock_check_receipts_multiple, ticket1, ticket2, receipt_storage
+):
+    settings.EXPO_NOTIFICATIONS_RECEIPT_STORAGE = receipt_storage
+    mock_check_receipts_multiple.return_value = [
+        PushReceipt(
+            id=ticket1.external_id,
+            status=PushReceipt.ERROR_STATUS,
+            message="The message is too big",
+            details={"error": "MessageTooBig"},
+        ),
+        PushReceipt(
+            id=ticket2.external_id,
+            status=PushReceipt.SUCCESS_STATUS,
+            message="",
+            details=None,
+        ),
+    ]
+
+    check_receipts([ticket1.pk, ticket2.pk])
+
+    ticket1.refresh_from_db()
+    ticket2.refresh_from_db()
+    receipt1 = ticket1.receipt
+    receipt2 = ticket2.receipt
+    assert receipt1.error_code == PushError.CODE_MESSAGE_TOO_BIG
+    assert receipt1.error.message == "The message is too big"
+    assert receipt1.error.details == {"error": "MessageTooBig"}
+    assert receipt2.error_code is None
+    assert receipt2.error is None
@@ -0,0 +1,136 @@
+import pytest
+from exponent_server_sdk import PushMessage, PushServerError, PushTicket
+from requests.exceptions import HTTPError
+
+from expo_notifications.tasks.client import PushClient
+from expo_notifications.tasks.session import session
+
+
+@pytest.fixture
+def push_client():
+    return PushClient(session=session)
+
+
+@pytest.fixture
+def mock_post(mocker, push_client):
+    return mocker.patch.object(push_client.session, "post")
+
+
+def test_publish_multiple_returns_a_ticket_per_push_message(
+    fake_expo_server, push_client
+):
+    push_tickets = push_client.publish_multiple(
+        [
+            PushMessage(to="ExponentPushToken[1]", title="Hello"),
+            PushMessage(to="ExponentPushToken[2]", title="World"),
+        ]
+    )
+
+    assert fake_expo_server.send_requests == [
+        [
+            {"to": "ExponentPushToken[1]", "title": "Hello"},
+            {"to": "ExponentPushToken[2]", "title": "World"},
+        ]
+    ]
+    assert [push_ticket.id for push_ticket in push_tickets] == [
+        "ticket-ExponentPushToken[1]",
+        "ticket-ExponentPushToken[2]",
+    ]
+    assert [push_ticket.push_message.to for push_ticket in push_tickets] == [
+        "ExponentPushToken[1]",
+        "ExponentPushToken[2]",
+    ]
+
+
+def test_publish_multiple_returns_a_ticket_per_recipient(fake_expo_server, push_client):
+    fake_expo_server.unregistered_tokens = {"ExponentPushToken[2]"}
+
+    push_tickets = push_client.publish_multiple(
+        [
+            PushMessage(
+                to=["ExponentPushToken[1]", "ExponentPushToken[2]"], title="Hello"
+            ),
+            PushMessage(to="ExponentPushToken[3]", title="World"),
+        ]
+    )
+
+    assert fake_expo_server.send_requests == [
+        [
+            {"to": ["ExponentPushToken[1]", "ExponentPushToken[2]"], "title": "Hello"},
+            {"to": "ExponentPushToken[3]", "title": "World"},
+        ]
+    ]
+    assert [push_ticket.push_message for push_ticket in push_tickets] == [
+        PushMessage(to="ExponentPushToken[1]", title="Hello"),
+        PushMessage(to="ExponentPushToken[2]", title="Hello"),
+        PushMessage(to="ExponentPushToken[3]", title="World"),
+    ]
+    assert [push_ticket.status for push_ticket in push_tickets] == [
+        PushTicket.SUCCESS_STATUS,
+        PushTicket.ERROR_STATUS,
+        PushTicket.SUCCESS_STATUS,
+    ]
+
+
+def test_publish_multiple_passes_force_fcm_v1_through(mock_post):
+    mock_post.return_value.json.return_value = {"data": [{"status": "ok"}]}
+
+    push_client = PushClient(session=session, force_fcm_v1=True)
+    push_client.publish_multiple([PushMessage(to="ExponentPushToken[1]")])
+
+    assert mock_post.call_args.args[0].endswith("/push/send?useFcmV1=true")
+
+
+def test_publish_multiple_rejects_invalid_push_tokens(push_client):
+    with pytest.raises(ValueError, match="Invalid push token"):
+        push_client.publish_multiple(
+            [PushMessage(to=["ExponentPushToken[1]", "invalid-token"])]
+        )
+
+
+def test_publish_multiple_raises_http_errors_of_non_json_responses(
+    push_client, mock_post
+):
+    mock_post.return_value.json.side_effect = ValueError()
+    mock_post.return_value.raise_for_status.side_effect = HTTPError()
+
+    with pytest.raises(HTTPError):
+        push_client.publish_multiple([PushMessage(to="ExponentPushToken[1]")])
+
+
+def test_publish_multiple_raises_push_server_errors_for_non_json_responses(
+    push_client, mock_post
+):
+    mock_post.return_value.json.side_effect = ValueError()
+
+    with pytest.raises(PushServerError, match="Invalid server response"):
+        push_client.publish_multiple([PushMessage(to="ExponentPushToken[1]")])
+
+
+def test_publish_multiple_raises_push_server_errors_for_request_errors(
+    push_client, mock_post
+):
+    mock_post.return_value.json.return_value = {"errors": [{"code": "API_ERROR"}]}
+
+    with pytest.raises(PushServerError, match="Request failed"):
+        push_client.publish_multiple([PushMessage(to="ExponentPushToken[1]")])
+
+
+def test_publish_multiple_raises_push_server_errors_for_responses_without_data(
+    push_client, mock_post
+):
+    mock_post.return_value.json.return_value = {}
+
+    with pytest.raises(PushServerError, match="Invalid server response"):
+        push_client.publish_multiple([PushMessage(to="ExponentPushToken[1]")])
+
+
+def test_publish_multiple_raises_push_server_errors_for_mismatched_responses(
+    push_client, mock_post
+):
+    mock_post.return_value.json.return_value = {"data": [{"status": "ok"}]}
+
+    with pytest.raises(PushServerError, match="Mismatched response length"):
+        push_client.publish_multiple(
+            [PushMessage(to=["ExponentPushToken[1]", "ExponentPushToken[2]"])]
+        )
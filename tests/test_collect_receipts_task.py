@@ -0,0 +1,116 @@
+import logging
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from exponent_server_sdk import PushClient, PushReceipt
+from requests.exceptions import ConnectionError
+
+from expo_notifications.models import Receipt, Ticket
+from expo_notifications.tasks import collect_receipts
+from tests.factories import TicketFactory
+
+
+def pending_ticket(**kwargs):
+    return TicketFactory(
+        is_success=True,
+        date_received=timezone.now() - timedelta(hours=1),
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+def test_checks_pending_receipts_in_batches(settings, fake_expo_server):
+    settings.EXPO_NOTIFICATIONS_CHECKING_TASK_SHARD_SIZE = 2
+    tickets = [pending_ticket() for _ in range(5)]
+    TicketFactory(is_success=True, date_received=timezone.now())
+
+    collect_receipts()
+
+    assert [len(ids) for ids in fake_expo_server.receipt_requests] == [2, 2, 1]
+    assert {
+        external_id for ids in fake_expo_server.receipt_requests for external_id in ids
+    } == {ticket.external_id for ticket in tickets}
+    assert Receipt.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_does_not_check_receipts_again(fake_expo_server):
+    pending_ticket()
+
+    collect_receipts()
+    collect_receipts()
+
+    assert len(fake_expo_server.receipt_requests) == 1
+
+
+@pytest.mark.django_db
+def test_skips_receipts_claimed_by_another_run(fake_expo_server):
+    claimed_ticket = pending_ticket()
+    ticket = pending_ticket()
+    Ticket.objects.filter(pk=claimed_ticket.pk).claim_receipts(limit=1)
+
+    collect_receipts()
+
+    assert fake_expo_server.receipt_requests == [[ticket.external_id]]
+    assert list(Receipt.objects.values_list("ticket", flat=True)) == [ticket.pk]
+
+
+@pytest.mark.django_db
+def test_stops_collecting_when_checking_fails(settings, mocker, caplog):
+    settings.EXPO_NOTIFICATIONS_CHECKING_TASK_SHARD_SIZE = 2
+    mock_check_receipts_multiple = mocker.patch.object(
+        PushClient, "check_receipts_multiple", side_effect=ConnectionError()
+    )
+    for _ in range(3):
+        pending_ticket()
+
+    with caplog.at_level(logging.WARNING):
+        collect_receipts()
+
+    assert mock_check_receipts_multiple.call_count == 1
+    assert "Failed to check 2 receipts, they will be collected again" in (
+        caplog.messages
+    )
+    assert not Receipt.objects.exists()
+    assert Ticket.objects.all().receipt_pending().count() == 3
+
+
+@pytest.mark.django_db
+def test_releases_claimed_receipts_when_checking_raises(mocker):
+    mocker.patch.object(
+        PushClient, "check_receipts_multiple", side_effect=RuntimeError()
+    )
+    pending_ticket()
+
+    with pytest.raises(RuntimeError):
+        collect_receipts()
+
+    assert Ticket.objects.all().receipt_pending().count() == 1
+
+
+@pytest.mark.django_db
+def test_collects_receipts_which_are_not_ready_yet_again(settings, mocker):
+    settings.EXPO_NOTIFICATIONS_CHECKING_TASK_SHARD_SIZE = 2
+    tickets = [pending_ticket() for _ in range(3)]
+    ready_ticket = tickets[1]
+    mock_check_receipts_multiple = mocker.patch.object(
+        PushClient,
+        "check_receipts_multiple",
+        side_effect=lambda push_tickets: [
+            PushReceipt(
+                id=push_ticket.id,
+                status=PushReceipt.SUCCESS_STATUS,
+                message="",
+                details=None,
+            )
+            for push_ticket in push_tickets
+            if push_ticket.id == ready_ticket.external_id
+        ],
+    )
+
+    collect_receipts()
+
+    assert mock_check_receipts_multiple.call_count == 2
+    assert list(Receipt.objects.values_list("ticket", flat=True)) == [ready_ticket.pk]
+    assert set(Ticket.objects.all().receipt_pending()) == {tickets[0], tickets[2]}
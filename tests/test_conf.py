@@ -43,6 +43,126 @@ def test_sending_task_retry_delay_default(settings):
     assert expo_notifications_settings.sending_task_retry_delay == timedelta(seconds=30)
 
 
+def test_sending_task_shard_size(settings):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_SHARD_SIZE = 500
+    assert expo_notifications_settings.sending_task_shard_size == 500
+
+
+def test_sending_task_shard_size_default(settings):
+    del settings.EXPO_NOTIFICATIONS_SENDING_TASK_SHARD_SIZE
+    assert expo_notifications_settings.sending_task_shard_size == 1000
+
+
+def test_claim_timeout(settings):
+    settings.EXPO_NOTIFICATIONS_CLAIM_TIMEOUT = timedelta(minutes=5)
+    assert expo_notifications_settings.claim_timeout == timedelta(minutes=5)
+
+
+def test_claim_timeout_default(settings):
+    del settings.EXPO_NOTIFICATIONS_CLAIM_TIMEOUT
+    assert expo_notifications_settings.claim_timeout == timedelta(minutes=10)
+
+
+def test_delivery_mode(settings):
+    settings.EXPO_NOTIFICATIONS_DELIVERY_MODE = "outbox"
+    assert expo_notifications_settings.delivery_mode == "outbox"
+
+
+def test_delivery_mode_default(settings):
+    del settings.EXPO_NOTIFICATIONS_DELIVERY_MODE
+    assert expo_notifications_settings.delivery_mode == "task"
+
+
+def test_send_batch_window(settings):
+    settings.EXPO_NOTIFICATIONS_SEND_BATCH_WINDOW = timedelta(milliseconds=50)
+    assert expo_notifications_settings.send_batch_window == timedelta(milliseconds=50)
+
+
+def test_send_batch_window_default(settings):
+    del settings.EXPO_NOTIFICATIONS_SEND_BATCH_WINDOW
+    assert expo_notifications_settings.send_batch_window is None
+
+
+def test_send_batch_size(settings):
+    settings.EXPO_NOTIFICATIONS_SEND_BATCH_SIZE = 50
+    assert expo_notifications_settings.send_batch_size == 50
+
+
+def test_send_batch_size_default(settings):
+    del settings.EXPO_NOTIFICATIONS_SEND_BATCH_SIZE
+    assert expo_notifications_settings.send_batch_size == 100
+
+
+def test_priority_lanes(settings):
+    settings.EXPO_NOTIFICATIONS_PRIORITY_LANES = {"high": {"queue": "urgent"}}
+    assert expo_notifications_settings.priority_lanes == {"high": {"queue": "urgent"}}
+
+
+def test_priority_lanes_default(settings):
+    del settings.EXPO_NOTIFICATIONS_PRIORITY_LANES
+    assert expo_notifications_settings.priority_lanes == {}
+
+
+def test_send_concurrency(settings):
+    settings.EXPO_NOTIFICATIONS_SEND_CONCURRENCY = 4
+    assert expo_notifications_settings.send_concurrency == 4
+
+
+def test_send_concurrency_default(settings):
+    del settings.EXPO_NOTIFICATIONS_SEND_CONCURRENCY
+    assert expo_notifications_settings.send_concurrency == 1
+
+
+def test_send_rate_limit(settings):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 600
+    assert expo_notifications_settings.send_rate_limit == 600
+
+
+def test_send_rate_limit_default(settings):
+    del settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT
+    assert expo_notifications_settings.send_rate_limit is None
+
+
+def test_sending_engine(settings):
+    settings.EXPO_NOTIFICATIONS_SENDING_ENGINE = "asyncio"
+    assert expo_notifications_settings.sending_engine == "asyncio"
+
+
+def test_sending_engine_default(settings):
+    del settings.EXPO_NOTIFICATIONS_SENDING_ENGINE
+    assert expo_notifications_settings.sending_engine == "sync"
+
+
+def test_coalesce_push_messages(settings):
+    settings.EXPO_NOTIFICATIONS_COALESCE_PUSH_MESSAGES = True
+    assert expo_notifications_settings.coalesce_push_messages is True
+
+
+def test_coalesce_push_messages_default(settings):
+    del settings.EXPO_NOTIFICATIONS_COALESCE_PUSH_MESSAGES
+    assert expo_notifications_settings.coalesce_push_messages is False
+
+
+def test_receipt_check_mode(settings):
+    settings.EXPO_NOTIFICATIONS_RECEIPT_CHECK_MODE = "collector"
+    assert expo_notifications_settings.receipt_check_mode == "collector"
+
+
+def test_receipt_check_mode_default(settings):
+    del settings.EXPO_NOTIFICATIONS_RECEIPT_CHECK_MODE
+    assert expo_notifications_settings.receipt_check_mode == "task"
+
+
+def test_receipt_storage(settings):
+    settings.EXPO_NOTIFICATIONS_RECEIPT_STORAGE = "ticket"
+    assert expo_notifications_settings.receipt_storage == "ticket"
+
+
+def test_receipt_storage_default(settings):
+    del settings.EXPO_NOTIFICATIONS_RECEIPT_STORAGE
+    assert expo_notifications_settings.receipt_storage == "table"
+
+
 def test_checking_task_max_retries(settings):
     settings.EXPO_NOTIFICATIONS_CHECKING_TASK_MAX_RETRIES = 6
     assert expo_notifications_settings.checking_task_max_retries == 6
@@ -61,3 +181,53 @@ def test_checking_task_retry_delay(settings):
 def test_checking_task_retry_delay_default(settings):
     del settings.EXPO_NOTIFICATIONS_CHECKING_TASK_RETRY_DELAY
     assert expo_notifications_settings.checking_task_retry_delay == timedelta(minutes=1)
+
+
+def test_checking_task_shard_size(settings):
+    settings.EXPO_NOTIFICATIONS_CHECKING_TASK_SHARD_SIZE = 500
+    assert expo_notifications_settings.checking_task_shard_size == 500
+
+
+def test_checking_task_shard_size_default(settings):
+    del settings.EXPO_NOTIFICATIONS_CHECKING_TASK_SHARD_SIZE
+    assert expo_notifications_settings.checking_task_shard_size == 1000
+
+
+def test_message_retention(settings):
+    settings.EXPO_NOTIFICATIONS_MESSAGE_RETENTION = timedelta(days=90)
+    assert expo_notifications_settings.message_retention == timedelta(days=90)
+
+
+def test_message_retention_default(settings):
+    del settings.EXPO_NOTIFICATIONS_MESSAGE_RETENTION
+    assert expo_notifications_settings.message_retention is None
+
+
+def test_ticket_retention(settings):
+    settings.EXPO_NOTIFICATIONS_TICKET_RETENTION = timedelta(days=30)
+    assert expo_notifications_settings.ticket_retention == timedelta(days=30)
+
+
+def test_ticket_retention_default(settings):
+    del settings.EXPO_NOTIFICATIONS_TICKET_RETENTION
+    assert expo_notifications_settings.ticket_retention is None
+
+
+def test_receipt_retention(settings):
+    settings.EXPO_NOTIFICATIONS_RECEIPT_RETENTION = timedelta(days=7)
+    assert expo_notifications_settings.receipt_retention == timedelta(days=7)
+
+
+def test_receipt_retention_default(settings):
+    del settings.EXPO_NOTIFICATIONS_RECEIPT_RETENTION
+    assert expo_notifications_settings.receipt_retention is None
+
+
+def test_pruning_batch_size(settings):
+    settings.EXPO_NOTIFICATIONS_PRUNING_BATCH_SIZE = 500
+    assert expo_notifications_settings.pruning_batch_size == 500
+
+
+def test_pruning_batch_size_default(settings):
+    del settings.EXPO_NOTIFICATIONS_PRUNING_BATCH_SIZE
+    assert expo_notifications_settings.pruning_batch_size == 1000
@@ -24,3 +24,22 @@ def test_queryset_active_returns_only_active_devices():
 
     assert not Device.objects.all().active.filter(pk=device1.pk).exists()
     assert Device.objects.all().active.filter(pk=device2.pk).exists()
+
+
+@pytest.mark.django_db
+def test_queryset_deactivate_deactivates_devices_and_returns_their_count():
+    device1 = DeviceFactory(is_active=True)
+    device2 = DeviceFactory(is_active=True)
+    device3 = DeviceFactory(is_active=True)
+
+    count = Device.objects.filter(pk__in=[device1.pk, device2.pk]).deactivate()
+    assert count == 2
+
+    device1.refresh_from_db()
+    assert not device1.is_active
+
+    device2.refresh_from_db()
+    assert not device2.is_active
+
+    device3.refresh_from_db()
+    assert device3.is_active
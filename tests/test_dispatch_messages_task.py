@@ -0,0 +1,182 @@
+import logging
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from exponent_server_sdk import PushClient, PushTicket
+from requests import Response
+from requests.exceptions import ConnectionError, HTTPError
+
+from expo_notifications.models import Message
+from expo_notifications.tasks import dispatch_messages
+from tests.factories import MessageFactory
+
+
+@pytest.fixture(autouse=True)
+def mock_check_receipts_apply_async(mocker):
+    path = "expo_notifications.tasks.check_receipts_task.check_receipts.apply_async"
+    return mocker.patch(path)
+
+
+@pytest.mark.django_db
+def test_dispatches_queued_messages_in_batches(settings, fake_expo_server):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_SHARD_SIZE = 2
+    messages = MessageFactory.create_batch(5, device__is_active=True)
+
+    dispatch_messages()
+
+    assert [len(request) for request in fake_expo_server.send_requests] == [2, 2, 1]
+
+    for message in messages:
+        message.refresh_from_db()
+        assert message.status == Message.STATUS_SENT
+        assert message.tickets.get().external_id == (
+            f"ticket-{message.device.push_token}"
+        )
+
+
+@pytest.mark.django_db
+def test_dispatches_only_queued_messages_of_active_devices(fake_expo_server):
+    MessageFactory(device__is_active=False)
+    MessageFactory(device__is_active=True, status=Message.STATUS_DRAFT)
+    MessageFactory(device__is_active=True, status=Message.STATUS_SENT)
+    MessageFactory(
+        device__is_active=True,
+        status=Message.STATUS_SENDING,
+        claimed_at=timezone.now(),
+    )
+    message = MessageFactory(device__is_active=True)
+
+    dispatch_messages()
+
+    [push_messages] = fake_expo_server.send_requests
+    assert [push_message["to"] for push_message in push_messages] == [
+        message.device.push_token
+    ]
+
+
+@pytest.mark.django_db
+def test_does_nothing_without_queued_messages(fake_expo_server):
+    dispatch_messages()
+
+    assert fake_expo_server.send_requests == []
+
+
+@pytest.mark.django_db
+def test_stops_dispatching_when_sending_fails(settings, fake_expo_server, caplog):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_SHARD_SIZE = 2
+    messages = MessageFactory.create_batch(5, device__is_active=True)
+    fake_expo_server.rate_limited_tokens = {messages[2].device.push_token}
+
+    with caplog.at_level(logging.WARNING):
+        dispatch_messages()
+
+    assert len(fake_expo_server.send_requests) == 1
+    assert "Failed to send 2 messages, they will be dispatched again" in caplog.text
+
+    statuses = [Message.objects.get(pk=message.pk).status for message in messages]
+    assert statuses == [
+        Message.STATUS_SENT,
+        Message.STATUS_SENT,
+        Message.STATUS_QUEUED,
+        Message.STATUS_QUEUED,
+        Message.STATUS_QUEUED,
+    ]
+
+
+@pytest.mark.django_db
+def test_keeps_dispatching_when_a_batch_fails_to_send(settings, mocker, caplog):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_SHARD_SIZE = 2
+    messages = MessageFactory.create_batch(5, device__is_active=True)
+    response = Response()
+    response.status_code = 503
+
+    def publish_multiple(push_messages):
+        if push_messages[0].to == messages[0].device.push_token:
+            raise HTTPError(response=response)
+        return [
+            PushTicket(push_message, PushTicket.SUCCESS_STATUS, "", None, "ticket")
+            for push_message in push_messages
+        ]
+
+    mocker.patch.object(PushClient, "publish_multiple", side_effect=publish_multiple)
+
+    with caplog.at_level(logging.WARNING):
+        dispatch_messages()
+
+    assert "Failed to send 2 messages, they will be dispatched again" in caplog.text
+
+    statuses = [Message.objects.get(pk=message.pk).status for message in messages]
+    assert statuses == [
+        Message.STATUS_QUEUED,
+        Message.STATUS_QUEUED,
+        Message.STATUS_SENT,
+        Message.STATUS_SENT,
+        Message.STATUS_SENT,
+    ]
+
+
+@pytest.mark.django_db
+def test_backs_off_from_messages_which_failed_to_send(settings, mocker):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_RETRY_DELAY = timedelta(seconds=30)
+    message = MessageFactory(device__is_active=True)
+    publish_multiple = mocker.patch.object(
+        PushClient, "publish_multiple", side_effect=ConnectionError
+    )
+
+    for _ in range(7):
+        dispatch_messages()
+
+    assert publish_multiple.call_count == 1
+    message.refresh_from_db()
+    assert message.status == Message.STATUS_QUEUED
+    assert message.attempts == 1
+
+    mocker.patch(
+        "django.utils.timezone.now",
+        return_value=timezone.now() + timedelta(seconds=31),
+    )
+    dispatch_messages()
+
+    assert publish_multiple.call_count == 2
+
+
+@pytest.mark.django_db
+def test_does_not_dispatch_messages_before_they_are_due(fake_expo_server):
+    MessageFactory(device__is_active=True, send_at=timezone.now() + timedelta(hours=1))
+
+    dispatch_messages()
+
+    assert fake_expo_server.send_requests == []
+
+
+@pytest.mark.django_db
+def test_fails_messages_to_inactive_devices(caplog, fake_expo_server):
+    message = MessageFactory(device__is_active=False)
+
+    with caplog.at_level(logging.INFO):
+        dispatch_messages()
+
+    assert fake_expo_server.send_requests == []
+    assert "Skipped 1 messages to inactive devices" in caplog.messages
+    message.refresh_from_db()
+    assert message.status == Message.STATUS_FAILED
+
+
+@pytest.mark.django_db
+def test_skips_expired_messages(caplog, fake_expo_server):
+    expired_message = MessageFactory(
+        device__is_active=True, expiration=timezone.now() - timedelta(seconds=1)
+    )
+    message = MessageFactory(device__is_active=True)
+
+    with caplog.at_level(logging.INFO):
+        dispatch_messages()
+
+    [push_messages] = fake_expo_server.send_requests
+    assert [push_message["to"] for push_message in push_messages] == [
+        message.device.push_token
+    ]
+    assert "Skipped 1 expired messages" in caplog.messages
+    expired_message.refresh_from_db()
+    assert expired_message.status == Message.STATUS_EXPIRED
@@ -0,0 +1,15 @@
+import logging
+
+from expo_notifications.tasks import maintain_partitions
+
+
+def test_logs_the_created_and_dropped_partitions(mocker, caplog):
+    mocker.patch(
+        "expo_notifications.tasks.maintain_partitions_task.maintain",
+        return_value=(["partition1", "partition2"], ["partition3"]),
+    )
+
+    with caplog.at_level(logging.INFO):
+        maintain_partitions()
+
+    assert "Created 2 and dropped 1 partitions" in caplog.messages
@@ -1,9 +1,10 @@
 from datetime import timedelta
 
 import pytest
+from django.utils import timezone
 
 from expo_notifications.models import Message
-from tests.factories import MessageFactory
+from tests.factories import CampaignFactory, MessageFactory
 
 
 @pytest.mark.django_db
@@ -12,6 +13,12 @@ def test_str():
     assert str(message) == f"Message #{message.pk}"
 
 
+@pytest.mark.django_db
+def test_is_a_draft_until_sent():
+    message = MessageFactory(status=Message._meta.get_field("status").default)
+    assert message.status == Message.STATUS_DRAFT
+
+
 @pytest.mark.django_db
 def test_to_push_message_sets_device_push_token_as_to():
     message = MessageFactory(device__push_token="ExponentPushToken[123]")
@@ -197,3 +204,42 @@ def test_send_schedules_a_send_messages_task(mock_send_messages_delay_on_commit)
     message.send()
     assert mock_send_messages_delay_on_commit.call_count == 1
     assert mock_send_messages_delay_on_commit.call_args.args == ([message.pk],)
+
+
+@pytest.mark.django_db
+def test_to_push_message_uses_the_campaign_payload():
+    campaign = CampaignFactory()
+    message = MessageFactory(
+        campaign=campaign, device__push_token="ExponentPushToken[1]"
+    )
+    push_message = message.to_push_message()
+    assert push_message == campaign.build_push_message("ExponentPushToken[1]")
+
+
+@pytest.mark.django_db
+def test_messages_are_queued_by_default():
+    message = MessageFactory()
+    assert message.status == Message.STATUS_QUEUED
+
+
+@pytest.mark.django_db
+def test_send_requeues_the_message(mock_send_messages_delay_on_commit):
+    message = MessageFactory(status=Message.STATUS_FAILED)
+    message.send()
+    message.refresh_from_db()
+    assert message.status == Message.STATUS_QUEUED
+
+
+@pytest.mark.parametrize(
+    ("send_at", "is_due"),
+    [
+        (None, True),
+        (timedelta(hours=-1), True),
+        (timedelta(hours=1), False),
+    ],
+)
+def test_is_due(send_at, is_due):
+    if send_at is not None:
+        send_at = timezone.now() + send_at
+    message = MessageFactory.build(send_at=send_at)
+    assert message.is_due is is_due
@@ -1,7 +1,11 @@
+from datetime import timedelta
+
 import pytest
+from django.db.models import QuerySet
+from django.utils import timezone
 
 from expo_notifications.models import Message
-from tests.factories import DeviceFactory, MessageFactory
+from tests.factories import CampaignFactory, DeviceFactory, MessageFactory
 
 
 @pytest.mark.django_db
@@ -19,6 +23,27 @@ def test_send_creates_message():
     assert message.to_push_message() == message.to_push_message()
 
 
+@pytest.mark.django_db
+def test_send_queues_the_message():
+    message = Message.objects.send(device=DeviceFactory(), title="Hello")
+
+    message.refresh_from_db()
+    assert message.status == Message.STATUS_QUEUED
+
+
+@pytest.mark.django_db
+def test_bulk_send_queues_the_messages():
+    device = DeviceFactory()
+
+    messages = Message.objects.bulk_send(
+        MessageFactory.build_batch(2, device=device, status=Message.STATUS_DRAFT)
+    )
+
+    for message in messages:
+        message.refresh_from_db()
+        assert message.status == Message.STATUS_QUEUED
+
+
 @pytest.mark.django_db
 def test_send_schedules_a_send_messages_task(mock_send_messages_delay_on_commit):
     device = DeviceFactory()
@@ -139,3 +164,495 @@ def test_queryset_send_schedules_a_send_messages_task(
     assert mock_send_messages_delay_on_commit.call_args.args == (
         [message1.pk, message2.pk],
     )
+
+
+@pytest.mark.django_db
+def test_bulk_send_schedules_a_send_messages_task_per_shard(
+    mock_send_messages_delay_on_commit, settings
+):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_SHARD_SIZE = 2
+    device = DeviceFactory()
+
+    messages = Message.objects.bulk_send(MessageFactory.build_batch(5, device=device))
+    message_pks = [message.pk for message in messages]
+
+    assert mock_send_messages_delay_on_commit.call_count == 3
+    assert [
+        call.args for call in mock_send_messages_delay_on_commit.call_args_list
+    ] == [
+        (message_pks[0:2],),
+        (message_pks[2:4],),
+        (message_pks[4:5],),
+    ]
+
+
+@pytest.mark.django_db
+def test_queryset_send_schedules_a_send_messages_task_per_shard(
+    mock_send_messages_delay_on_commit, settings
+):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_SHARD_SIZE = 2
+
+    messages = MessageFactory.create_batch(3)
+    message_pks = [message.pk for message in messages]
+
+    Message.objects.order_by("pk").send()
+
+    assert mock_send_messages_delay_on_commit.call_count == 2
+    assert [
+        call.args for call in mock_send_messages_delay_on_commit.call_args_list
+    ] == [
+        (message_pks[0:2],),
+        (message_pks[2:3],),
+    ]
+
+
+@pytest.mark.django_db
+def test_queryset_send_streams_message_pks(mocker, settings):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_SHARD_SIZE = 2
+    iterator_spy = mocker.spy(QuerySet, "iterator")
+
+    MessageFactory.create_batch(3)
+    Message.objects.all().send()
+
+    assert iterator_spy.call_args.kwargs == {"chunk_size": 2}
+
+
+@pytest.mark.django_db
+def test_queryset_send_requeues_messages_which_are_not_being_sent():
+    sent_message = MessageFactory(status=Message.STATUS_SENT)
+    failed_message = MessageFactory(status=Message.STATUS_FAILED)
+    sending_message = MessageFactory(
+        status=Message.STATUS_SENDING, claimed_at=timezone.now()
+    )
+
+    Message.objects.all().send()
+
+    sent_message.refresh_from_db()
+    assert sent_message.status == Message.STATUS_QUEUED
+
+    failed_message.refresh_from_db()
+    assert failed_message.status == Message.STATUS_QUEUED
+
+    sending_message.refresh_from_db()
+    assert sending_message.status == Message.STATUS_SENDING
+
+
+@pytest.mark.django_db
+def test_queryset_claim_marks_queued_messages_as_sending():
+    queued_message = MessageFactory()
+    sent_message = MessageFactory(status=Message.STATUS_SENT)
+
+    claimed_message_pks = Message.objects.all().claim()
+
+    assert claimed_message_pks == [queued_message.pk]
+
+    queued_message.refresh_from_db()
+    assert queued_message.status == Message.STATUS_SENDING
+
+    sent_message.refresh_from_db()
+    assert sent_message.status == Message.STATUS_SENT
+
+
+@pytest.mark.django_db
+def test_queryset_send_requeues_messages_whose_claim_expired(settings):
+    settings.EXPO_NOTIFICATIONS_CLAIM_TIMEOUT = timedelta(minutes=10)
+    message = MessageFactory(
+        status=Message.STATUS_SENDING,
+        claimed_at=timezone.now() - timedelta(minutes=11),
+    )
+
+    Message.objects.all().send()
+
+    message.refresh_from_db()
+    assert message.status == Message.STATUS_QUEUED
+    assert message.claimed_at is None
+
+
+@pytest.mark.django_db
+def test_queryset_claim_records_when_messages_were_claimed(now):
+    message = MessageFactory()
+
+    Message.objects.all().claim()
+
+    message.refresh_from_db()
+    assert message.claimed_at == now
+
+
+@pytest.mark.django_db
+def test_queryset_claim_reclaims_messages_whose_claim_expired(settings):
+    settings.EXPO_NOTIFICATIONS_CLAIM_TIMEOUT = timedelta(minutes=10)
+    MessageFactory(
+        status=Message.STATUS_SENDING,
+        claimed_at=timezone.now() - timedelta(minutes=9),
+    )
+    message = MessageFactory(
+        status=Message.STATUS_SENDING,
+        claimed_at=timezone.now() - timedelta(minutes=11),
+    )
+
+    assert Message.objects.all().claim() == [message.pk]
+
+
+@pytest.mark.django_db
+def test_queryset_release_queues_claimed_messages_again():
+    claimed_message = MessageFactory()
+    sent_message = MessageFactory(status=Message.STATUS_SENT)
+    Message.objects.all().claim()
+
+    assert Message.objects.all().release() == 1
+
+    claimed_message.refresh_from_db()
+    assert claimed_message.status == Message.STATUS_QUEUED
+    assert claimed_message.claimed_at is None
+
+    sent_message.refresh_from_db()
+    assert sent_message.status == Message.STATUS_SENT
+
+
+@pytest.mark.django_db
+def test_queryset_release_backs_off_exponentially(settings, now):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_RETRY_DELAY = timedelta(seconds=30)
+    messages = [MessageFactory(attempts=attempts) for attempts in range(3)]
+    Message.objects.all().claim()
+
+    Message.objects.all().release()
+
+    next_attempts = [
+        Message.objects.get(pk=message.pk).next_attempt_at for message in messages
+    ]
+    assert next_attempts == [
+        now + timedelta(seconds=30),
+        now + timedelta(seconds=60),
+        now + timedelta(seconds=120),
+    ]
+
+
+@pytest.mark.django_db
+def test_queryset_ready_filters_messages_whose_next_attempt_is_due():
+    now = timezone.now()
+    ready_messages = [
+        MessageFactory(next_attempt_at=None),
+        MessageFactory(next_attempt_at=now - timedelta(seconds=1)),
+    ]
+    MessageFactory(next_attempt_at=now + timedelta(minutes=1))
+
+    assert set(Message.objects.all().ready()) == set(ready_messages)
+
+
+@pytest.mark.django_db
+def test_queryset_send_resets_the_next_attempt():
+    message = MessageFactory(
+        status=Message.STATUS_FAILED,
+        next_attempt_at=timezone.now() + timedelta(minutes=1),
+    )
+
+    Message.objects.all().send()
+
+    message.refresh_from_db()
+    assert message.next_attempt_at is None
+
+
+@pytest.mark.django_db
+def test_queryset_lease_returns_queued_messages_with_their_priorities(settings, now):
+    settings.EXPO_NOTIFICATIONS_CLAIM_TIMEOUT = timedelta(minutes=10)
+    message = MessageFactory(priority="high")
+    campaign_message = MessageFactory(campaign=CampaignFactory(priority="low"))
+    MessageFactory(status=Message.STATUS_SENT)
+
+    assert Message.objects.all().lease(limit=10) == [
+        (message.pk, "high"),
+        (campaign_message.pk, "low"),
+    ]
+
+    message.refresh_from_db()
+    assert message.status == Message.STATUS_QUEUED
+    assert message.next_attempt_at == now + timedelta(minutes=10)
+
+
+@pytest.mark.django_db
+def test_queryset_lease_leases_messages_only_once():
+    message = MessageFactory(priority="high")
+
+    assert Message.objects.all().lease(limit=10) == [(message.pk, "high")]
+    assert Message.objects.all().lease(limit=10) == []
+
+
+@pytest.mark.django_db
+def test_queryset_send_queues_drafts():
+    message = MessageFactory(status=Message.STATUS_DRAFT, attempts=3)
+
+    Message.objects.all().send()
+
+    message.refresh_from_db()
+    assert message.status == Message.STATUS_QUEUED
+    assert message.attempts == 0
+
+
+@pytest.mark.django_db
+def test_queryset_claim_skips_drafts():
+    MessageFactory(status=Message.STATUS_DRAFT)
+
+    assert Message.objects.all().claim() == []
+
+
+@pytest.mark.django_db
+def test_queryset_claim_counts_attempts():
+    message = MessageFactory()
+
+    Message.objects.all().claim()
+    Message.objects.all().release()
+    Message.objects.all().claim()
+
+    message.refresh_from_db()
+    assert message.attempts == 2
+
+
+@pytest.mark.django_db
+def test_queryset_release_fails_messages_after_too_many_attempts(settings):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_MAX_RETRIES = 1
+    message = MessageFactory(attempts=1)
+    retried_message = MessageFactory()
+    Message.objects.all().claim()
+
+    assert Message.objects.all().release() == 1
+
+    message.refresh_from_db()
+    assert message.status == Message.STATUS_FAILED
+    assert message.claimed_at is None
+
+    retried_message.refresh_from_db()
+    assert retried_message.status == Message.STATUS_QUEUED
+
+
+@pytest.mark.django_db
+def test_queryset_claim_fails_messages_of_expired_claims_after_too_many_attempts(
+    settings,
+):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_MAX_RETRIES = 1
+    message = MessageFactory(
+        status=Message.STATUS_SENDING,
+        claimed_at=timezone.now() - timedelta(hours=1),
+        attempts=2,
+    )
+
+    assert Message.objects.all().claim() == []
+
+    message.refresh_from_db()
+    assert message.status == Message.STATUS_FAILED
+
+
+@pytest.mark.django_db
+def test_queryset_claim_claims_messages_only_once():
+    message = MessageFactory()
+
+    assert Message.objects.all().claim() == [message.pk]
+    assert Message.objects.all().claim() == []
+
+
+@pytest.mark.django_db
+def test_send_schedules_no_send_messages_task_in_outbox_mode(
+    mock_send_messages_delay_on_commit, settings
+):
+    settings.EXPO_NOTIFICATIONS_DELIVERY_MODE = "outbox"
+    device = DeviceFactory()
+
+    message = Message.objects.send(device=device, title="Hello")
+    Message.objects.bulk_send(MessageFactory.build_batch(2, device=device))
+    Message.objects.all().send()
+
+    assert not mock_send_messages_delay_on_commit.called
+    message.refresh_from_db()
+    assert message.status == Message.STATUS_QUEUED
+
+
+@pytest.mark.django_db
+def test_queryset_claim_claims_at_most_limit_messages_in_order():
+    messages = MessageFactory.create_batch(3)
+
+    claimed_message_pks = Message.objects.all().claim(limit=2)
+
+    assert claimed_message_pks == [messages[0].pk, messages[1].pk]
+
+
+@pytest.fixture
+def mock_send_messages_apply_async_on_commit(mocker):
+    path = (
+        "expo_notifications.tasks.send_messages_task"
+        ".send_messages.apply_async_on_commit"
+    )
+    return mocker.patch(path)
+
+
+@pytest.mark.django_db
+def test_queryset_send_routes_messages_by_priority(
+    mock_send_messages_delay_on_commit,
+    mock_send_messages_apply_async_on_commit,
+    settings,
+):
+    settings.EXPO_NOTIFICATIONS_PRIORITY_LANES = {
+        "high": {"queue": "urgent", "shard_size": 2},
+    }
+    high_messages = MessageFactory.create_batch(2, priority=Message.PRIORITY_HIGH)
+    normal_message = MessageFactory(priority=Message.PRIORITY_NORMAL)
+    blank_message = MessageFactory(priority=None)
+    campaign_message = MessageFactory(
+        priority=None, campaign=CampaignFactory(priority=Message.PRIORITY_HIGH)
+    )
+
+    Message.objects.order_by("pk").send()
+
+    assert [
+        call.kwargs for call in mock_send_messages_apply_async_on_commit.call_args_list
+    ] == [
+        {
+            "args": ([high_messages[0].pk, high_messages[1].pk], "high"),
+            "queue": "urgent",
+        },
+        {"args": ([campaign_message.pk], "high"), "queue": "urgent"},
+    ]
+    mock_send_messages_delay_on_commit.assert_called_once_with(
+        [normal_message.pk, blank_message.pk]
+    )
+
+
+@pytest.mark.django_db
+def test_send_routes_messages_by_priority(
+    mock_send_messages_delay_on_commit,
+    mock_send_messages_apply_async_on_commit,
+    settings,
+):
+    settings.EXPO_NOTIFICATIONS_PRIORITY_LANES = {"high": {}}
+    device = DeviceFactory()
+
+    message = Message.objects.send(device=device, priority=Message.PRIORITY_HIGH)
+
+    mock_send_messages_apply_async_on_commit.assert_called_once_with(
+        args=([message.pk], "high")
+    )
+    assert not mock_send_messages_delay_on_commit.called
+
+
+@pytest.mark.django_db
+def test_bulk_send_routes_messages_by_priority(
+    mock_send_messages_delay_on_commit,
+    mock_send_messages_apply_async_on_commit,
+    settings,
+):
+    settings.EXPO_NOTIFICATIONS_PRIORITY_LANES = {"high": {"queue": "urgent"}}
+    device = DeviceFactory()
+
+    messages = Message.objects.bulk_send(
+        [
+            Message(device=device, priority=Message.PRIORITY_HIGH),
+            Message(device=device, priority=Message.PRIORITY_NORMAL),
+            Message(device=device, priority=Message.PRIORITY_HIGH),
+        ]
+    )
+
+    mock_send_messages_apply_async_on_commit.assert_called_once_with(
+        args=([messages[0].pk, messages[2].pk], "high"), queue="urgent"
+    )
+    mock_send_messages_delay_on_commit.assert_called_once_with([messages[1].pk])
+
+
+@pytest.mark.django_db
+def test_send_schedules_no_send_messages_task_for_scheduled_messages(
+    mock_send_messages_delay_on_commit,
+):
+    device = DeviceFactory()
+
+    Message.objects.send(device=device, send_at=timezone.now() + timedelta(hours=1))
+
+    assert not mock_send_messages_delay_on_commit.called
+
+
+@pytest.mark.django_db
+def test_bulk_send_schedules_send_messages_tasks_only_for_due_messages(
+    mock_send_messages_delay_on_commit,
+):
+    device = DeviceFactory()
+    now = timezone.now()
+
+    messages = Message.objects.bulk_send(
+        [
+            Message(device=device, send_at=now + timedelta(hours=1)),
+            Message(device=device, send_at=now - timedelta(hours=1)),
+            Message(device=device),
+        ]
+    )
+
+    mock_send_messages_delay_on_commit.assert_called_once_with(
+        [messages[1].pk, messages[2].pk]
+    )
+
+
+@pytest.mark.django_db
+def test_queryset_send_schedules_send_messages_tasks_only_for_due_messages(
+    mock_send_messages_delay_on_commit,
+):
+    MessageFactory(send_at=timezone.now() + timedelta(hours=1))
+    message = MessageFactory(send_at=None)
+
+    Message.objects.all().send()
+
+    mock_send_messages_delay_on_commit.assert_called_once_with([message.pk])
+
+
+@pytest.mark.django_db
+def test_queryset_expired_filters_messages_by_their_payload_expiration():
+    past = timezone.now() - timedelta(hours=1)
+    future = timezone.now() + timedelta(hours=1)
+    expired_messages = [
+        MessageFactory(expiration=past),
+        MessageFactory(campaign=CampaignFactory(expiration=past), expiration=future),
+    ]
+    unexpired_messages = [
+        MessageFactory(expiration=future),
+        MessageFactory(expiration=None),
+        MessageFactory(campaign=CampaignFactory(expiration=future), expiration=past),
+        MessageFactory(campaign=CampaignFactory(expiration=None), expiration=past),
+    ]
+
+    assert set(Message.objects.all().expired()) == set(expired_messages)
+    assert set(Message.objects.all().unexpired()) == set(unexpired_messages)
+
+
+@pytest.mark.django_db
+def test_queryset_expire_marks_queued_expired_messages_as_expired():
+    past = timezone.now() - timedelta(hours=1)
+    expired_message = MessageFactory(expiration=past)
+    sent_message = MessageFactory(expiration=past, status=Message.STATUS_SENT)
+    unexpired_message = MessageFactory()
+
+    assert Message.objects.all().expire() == 1
+
+    expired_message.refresh_from_db()
+    assert expired_message.status == Message.STATUS_EXPIRED
+    sent_message.refresh_from_db()
+    assert sent_message.status == Message.STATUS_SENT
+    unexpired_message.refresh_from_db()
+    assert unexpired_message.status == Message.STATUS_QUEUED
+
+
+@pytest.mark.django_db
+def test_queryset_fail_inactive_marks_queued_messages_to_inactive_devices_as_failed():
+    inactive_message = MessageFactory(device__is_active=False)
+    sent_message = MessageFactory(device__is_active=False, status=Message.STATUS_SENT)
+    active_message = MessageFactory(device__is_active=True)
+
+    assert Message.objects.all().fail_inactive() == 1
+
+    inactive_message.refresh_from_db()
+    assert inactive_message.status == Message.STATUS_FAILED
+    sent_message.refresh_from_db()
+    assert sent_message.status == Message.STATUS_SENT
+    active_message.refresh_from_db()
+    assert active_message.status == Message.STATUS_QUEUED
+
+
+@pytest.mark.django_db
+def test_queryset_claim_skips_expired_messages():
+    MessageFactory(expiration=timezone.now() - timedelta(hours=1))
+    message = MessageFactory()
+
+    assert Message.objects.all().claim() == [message.pk]
@@ -0,0 +1,212 @@
+from datetime import timedelta
+from io import StringIO
+from os import environ
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.utils import timezone
+
+from expo_notifications.models import Message, Receipt, Ticket, UnifiedReceipt
+from expo_notifications.partitioning import (
+    PREMADE_PARTITIONS,
+    get_partitions,
+    is_partitioned,
+    maintain_partitions,
+    start_of_day,
+)
+from expo_notifications.pruning import prune
+from tests.factories import MessageFactory, ReceiptFactory, TicketFactory
+
+# Set the POSTGRES_HOST and POSTGRES_PARTITIONING environment variables to run
+# these tests against a partitioned PostgreSQL database.
+partitioned = pytest.mark.skipif(
+    "POSTGRES_PARTITIONING" not in environ,
+    reason="requires partitioned PostgreSQL tables",
+)
+
+
+def test_is_partitioned_only_on_postgresql(mocker):
+    assert not is_partitioned(mocker.Mock(vendor="sqlite"), "table")
+
+
+def test_command_requires_postgresql(mocker):
+    mocker.patch(
+        "expo_notifications.management.commands.partition_expo_notifications"
+        ".connection",
+        vendor="sqlite",
+    )
+
+    with pytest.raises(CommandError, match="Partitioning requires PostgreSQL."):
+        call_command("partition_expo_notifications")
+
+
+def test_start_of_day():
+    now = timezone.now()
+    assert start_of_day(now) == now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+@pytest.mark.django_db
+def test_maintain_partitions_does_nothing_for_tables_which_are_not_partitioned(
+    mocker,
+):
+    mocker.patch("expo_notifications.partitioning.is_partitioned", return_value=False)
+    assert maintain_partitions() == ([], [])
+
+
+@pytest.mark.django_db
+def test_prune_leaves_partitioned_tables_to_the_maintenance(settings, mocker):
+    mocker.patch("expo_notifications.pruning.is_partitioned", return_value=True)
+    settings.EXPO_NOTIFICATIONS_MESSAGE_RETENTION = timedelta(days=30)
+    settings.EXPO_NOTIFICATIONS_TICKET_RETENTION = timedelta(days=30)
+    settings.EXPO_NOTIFICATIONS_RECEIPT_RETENTION = timedelta(days=30)
+    old = timezone.now() - timedelta(days=31)
+    ReceiptFactory(date_checked=old, ticket__date_received=old)
+    TicketFactory(date_received=old)
+    MessageFactory(date_created=old, status=Message.STATUS_SENT)
+
+    deleted = prune().deleted
+
+    assert deleted == {"expo_notifications.Message": 1}
+    assert Ticket.objects.count() == 2
+    assert Receipt.objects.count() == 1
+
+
+@partitioned
+@pytest.mark.django_db
+def test_tables_are_partitioned():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid"
+        )
+        assert {table for [table] in cursor.fetchall()} >= {
+            Ticket._meta.db_table,
+            Receipt._meta.db_table,
+        }
+
+
+@partitioned
+@pytest.mark.django_db
+def test_rows_are_stored_in_the_partitions_of_their_day():
+    tomorrow = timezone.now() + timedelta(days=1)
+    ticket = TicketFactory(date_received=tomorrow)
+    receipt = ReceiptFactory(ticket=ticket, date_checked=tomorrow)
+
+    assert Ticket.objects.get(pk=ticket.pk) == ticket
+    assert Receipt.objects.get(ticket=ticket) == receipt
+
+
+@partitioned
+@pytest.mark.django_db
+def test_unified_receipts_include_the_rows_of_all_partitions():
+    tomorrow = timezone.now() + timedelta(days=1)
+    ticket = TicketFactory(
+        date_received=tomorrow, receipt_is_success=True, date_checked=tomorrow
+    )
+    ReceiptFactory(ticket=ticket, date_checked=tomorrow)
+
+    assert UnifiedReceipt.objects.filter(ticket=ticket).count() == 2
+
+
+@partitioned
+@pytest.mark.django_db
+def test_command_skips_tables_which_are_already_partitioned():
+    stdout = StringIO()
+
+    call_command("partition_expo_notifications", stdout=stdout)
+
+    assert stdout.getvalue() == "All tables are already partitioned.\n"
+
+
+@partitioned
+@pytest.mark.django_db
+def test_rows_of_days_without_a_partition_are_stored_in_the_default_partition():
+    later = timezone.now() + timedelta(days=PREMADE_PARTITIONS + 3)
+    ticket = TicketFactory(date_received=later)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT id FROM expo_notifications_ticket_default WHERE id = %s",
+            [ticket.pk],
+        )
+        assert cursor.fetchall() == [(ticket.pk,)]
+
+
+@partitioned
+@pytest.mark.django_db
+def test_maintain_partitions_moves_rows_out_of_the_default_partition(mocker):
+    later = timezone.now() + timedelta(days=PREMADE_PARTITIONS + 3)
+    ticket = TicketFactory(date_received=later)
+    mocker.patch("django.utils.timezone.now", return_value=later)
+
+    maintain_partitions()
+
+    assert Ticket.objects.get(pk=ticket.pk) == ticket
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM expo_notifications_ticket_default")
+        assert cursor.fetchone() == (0,)
+        cursor.execute(
+            f"SELECT id FROM expo_notifications_ticket_p{later:%Y%m%d} WHERE id = %s",
+            [ticket.pk],
+        )
+        assert cursor.fetchall() == [(ticket.pk,)]
+
+
+@partitioned
+@pytest.mark.django_db
+def test_maintain_partitions_creates_partitions_ahead_of_time(mocker):
+    now = timezone.now() + timedelta(days=3)
+    mocker.patch("django.utils.timezone.now", return_value=now)
+
+    created, dropped = maintain_partitions()
+
+    assert len(created) == 2 * 3
+    assert dropped == []
+    assert maintain_partitions() == ([], [])
+
+    with connection.cursor() as cursor:
+        upper_bounds = [
+            bound for _, bound in get_partitions(cursor, "expo_notifications_ticket")
+        ]
+    assert max(upper_bounds) == start_of_day(now) + timedelta(
+        days=PREMADE_PARTITIONS + 1
+    )
+
+
+@partitioned
+@pytest.mark.django_db
+def test_maintain_partitions_drops_partitions_older_than_the_retention(
+    settings, mocker
+):
+    settings.EXPO_NOTIFICATIONS_TICKET_RETENTION = timedelta(days=1)
+    ticket = TicketFactory(date_received=timezone.now())
+    with connection.cursor() as cursor:
+        # Tables with pending foreign key checks can't be dropped
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+    now = timezone.now() + timedelta(days=3)
+    mocker.patch("django.utils.timezone.now", return_value=now)
+
+    _, dropped = maintain_partitions()
+
+    assert "expo_notifications_ticket_legacy" in dropped
+    assert not Ticket.objects.filter(pk=ticket.pk).exists()
+
+
+@partitioned
+@pytest.mark.django_db
+def test_maintain_partitions_deletes_old_rows_of_the_default_partition(
+    settings, mocker
+):
+    settings.EXPO_NOTIFICATIONS_TICKET_RETENTION = timedelta(days=1)
+    now = timezone.now() + timedelta(days=3)
+    mocker.patch("django.utils.timezone.now", return_value=now)
+    maintain_partitions()
+    # Without the legacy partition, old rows are stored in the default partition
+    old_ticket = TicketFactory(date_received=now - timedelta(days=30))
+    with connection.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+    maintain_partitions()
+
+    assert not Ticket.objects.filter(pk=old_ticket.pk).exists()
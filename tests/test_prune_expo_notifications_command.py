@@ -0,0 +1,25 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from expo_notifications.models import Receipt
+from tests.factories import ReceiptFactory
+
+
+@pytest.mark.django_db
+def test_prunes_and_reports_the_deleted_rows(settings, mocker):
+    # Partitioned tables are pruned by dropping partitions instead
+    mocker.patch("expo_notifications.pruning.is_partitioned", return_value=False)
+    settings.EXPO_NOTIFICATIONS_RECEIPT_RETENTION = timedelta(days=30)
+    ReceiptFactory(date_checked=timezone.now() - timedelta(days=31))
+    stdout = StringIO()
+
+    call_command("prune_expo_notifications", stdout=stdout)
+
+    assert not Receipt.objects.exists()
+    assert stdout.getvalue().startswith(
+        "Deleted 0 messages, 0 tickets and 1 receipts in "
+    )
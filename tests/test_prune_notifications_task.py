@@ -0,0 +1,25 @@
+import logging
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from expo_notifications.models import Receipt
+from expo_notifications.tasks import prune_notifications
+from tests.factories import ReceiptFactory
+
+
+@pytest.mark.django_db
+def test_prunes_and_logs_the_deleted_rows(settings, mocker, caplog):
+    # Partitioned tables are pruned by dropping partitions instead
+    mocker.patch("expo_notifications.pruning.is_partitioned", return_value=False)
+    settings.EXPO_NOTIFICATIONS_RECEIPT_RETENTION = timedelta(days=30)
+    ReceiptFactory(date_checked=timezone.now() - timedelta(days=31))
+
+    with caplog.at_level(logging.INFO):
+        prune_notifications()
+
+    assert not Receipt.objects.exists()
+    assert caplog.messages[-1].startswith(
+        "Deleted 0 messages, 0 tickets and 1 receipts in "
+    )
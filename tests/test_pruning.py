@@ -0,0 +1,124 @@
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from expo_notifications.models import Message, Receipt, Ticket
+from expo_notifications.pruning import PruningResult, prune, prune_queryset
+from tests.factories import MessageFactory, ReceiptFactory, TicketFactory
+
+
+@pytest.fixture(autouse=True)
+def row_pruning(mocker):
+    # Partitioned tables are pruned by dropping partitions instead
+    mocker.patch("expo_notifications.pruning.is_partitioned", return_value=False)
+
+
+@pytest.fixture
+def old():
+    return timezone.now() - timedelta(days=31)
+
+
+@pytest.fixture
+def recent():
+    return timezone.now() - timedelta(days=29)
+
+
+@pytest.mark.django_db
+def test_prune_keeps_everything_by_default(old):
+    ReceiptFactory(
+        date_checked=old,
+        ticket__date_received=old,
+        ticket__message__date_created=old,
+        ticket__message__status=Message.STATUS_SENT,
+    )
+
+    assert sum(prune().deleted.values()) == 0
+    assert Receipt.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_prune_deletes_receipts_older_than_their_retention(settings, old, recent):
+    settings.EXPO_NOTIFICATIONS_RECEIPT_RETENTION = timedelta(days=30)
+    ReceiptFactory(date_checked=old)
+    recent_receipt = ReceiptFactory(date_checked=recent)
+
+    assert prune().deleted == Counter({"expo_notifications.Receipt": 1})
+    assert list(Receipt.objects.all()) == [recent_receipt]
+    assert Ticket.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_prune_deletes_tickets_older_than_their_retention(settings, old, recent):
+    settings.EXPO_NOTIFICATIONS_TICKET_RETENTION = timedelta(days=30)
+    ReceiptFactory(ticket__date_received=old)
+    recent_ticket = TicketFactory(date_received=recent)
+
+    assert prune().deleted == Counter(
+        {"expo_notifications.Ticket": 1, "expo_notifications.Receipt": 1}
+    )
+    assert list(Ticket.objects.all()) == [recent_ticket]
+    assert Message.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_prune_deletes_messages_older_than_their_retention(settings, old, recent):
+    settings.EXPO_NOTIFICATIONS_MESSAGE_RETENTION = timedelta(days=30)
+    TicketFactory(message__date_created=old, message__status=Message.STATUS_SENT)
+    MessageFactory(date_created=old, status=Message.STATUS_EXPIRED)
+    draft_message = MessageFactory(date_created=old, status=Message.STATUS_DRAFT)
+    queued_message = MessageFactory(date_created=old, status=Message.STATUS_QUEUED)
+    sending_message = MessageFactory(date_created=old, status=Message.STATUS_SENDING)
+    recent_message = MessageFactory(date_created=recent, status=Message.STATUS_SENT)
+
+    assert prune().deleted == Counter(
+        {"expo_notifications.Message": 2, "expo_notifications.Ticket": 1}
+    )
+    assert set(Message.objects.all()) == {
+        draft_message,
+        queued_message,
+        sending_message,
+        recent_message,
+    }
+
+
+@pytest.mark.django_db
+def test_prune_queryset_deletes_in_batches(settings):
+    settings.EXPO_NOTIFICATIONS_PRUNING_BATCH_SIZE = 2
+    ReceiptFactory.create_batch(5)
+
+    with CaptureQueriesContext(connection) as context:
+        deleted = prune_queryset(Receipt.objects.order_by("date_checked"))
+
+    delete_queries = [
+        query for query in context.captured_queries if query["sql"].startswith("DELETE")
+    ]
+    assert len(delete_queries) == 3
+    assert deleted == Counter({"expo_notifications.Receipt": 5})
+    assert not Receipt.objects.exists()
+
+
+def test_pruning_result_reports_the_deleted_rows_per_second():
+    result = PruningResult(
+        Counter(
+            {
+                "expo_notifications.Message": 10,
+                "expo_notifications.Ticket": 20,
+                "expo_notifications.Receipt": 30,
+            }
+        ),
+        seconds=2,
+    )
+
+    assert str(result) == (
+        "Deleted 10 messages, 20 tickets and 30 receipts in 2.00 seconds (30 rows/s)"
+    )
+
+
+def test_pruning_result_reports_no_rate_without_elapsed_time():
+    assert str(PruningResult(Counter(), seconds=0)) == (
+        "Deleted 0 messages, 0 tickets and 0 receipts in 0.00 seconds (0 rows/s)"
+    )
@@ -0,0 +1,59 @@
+import pytest
+
+from expo_notifications.models import PushError
+from tests.factories import PushErrorFactory
+
+
+@pytest.mark.django_db
+def test_str():
+    push_error = PushErrorFactory()
+    assert str(push_error) == f"Push error #{push_error.pk}"
+
+
+@pytest.mark.parametrize(
+    ("details", "code"),
+    [
+        ({"error": "DeviceNotRegistered"}, PushError.CODE_DEVICE_NOT_REGISTERED),
+        ({"error": "MessageTooBig"}, PushError.CODE_MESSAGE_TOO_BIG),
+        ({"error": "SomethingNew"}, PushError.CODE_UNKNOWN),
+        ({}, PushError.CODE_UNKNOWN),
+        (None, PushError.CODE_UNKNOWN),
+    ],
+)
+def test_get_code(details, code):
+    assert PushError.get_code(details) == code
+
+
+def test_build_removes_the_push_token():
+    push_error = PushError.build(
+        '"ExponentPushToken[1]" is not a registered push notification recipient',
+        {"error": "DeviceNotRegistered", "expoPushToken": "ExponentPushToken[1]"},
+        "ExponentPushToken[1]",
+    )
+
+    assert push_error.message == (
+        '"<push token>" is not a registered push notification recipient'
+    )
+    assert push_error.details == {"error": "DeviceNotRegistered"}
+
+
+def test_build_identifies_errors_by_their_message_and_details():
+    push_error1 = PushError.build(
+        "ExponentPushToken[1] is not registered",
+        {"error": "DeviceNotRegistered", "expoPushToken": "ExponentPushToken[1]"},
+        "ExponentPushToken[1]",
+    )
+    push_error2 = PushError.build(
+        "ExponentPushToken[2] is not registered",
+        {"error": "DeviceNotRegistered", "expoPushToken": "ExponentPushToken[2]"},
+        "ExponentPushToken[2]",
+    )
+    push_error3 = PushError.build(
+        "ExponentPushToken[3] is not registered",
+        None,
+        "ExponentPushToken[3]",
+    )
+
+    assert push_error1.digest == push_error2.digest
+    assert push_error1.digest != push_error3.digest
+    assert push_error3.details is None
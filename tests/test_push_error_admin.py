@@ -0,0 +1,21 @@
+import pytest
+from bs4 import BeautifulSoup
+from django.urls import reverse
+
+from tests.factories import PushErrorFactory
+
+CHANGELIST_URL = reverse("admin:expo_notifications_pusherror_changelist")
+
+
+@pytest.mark.django_db
+def test_changelist_renders_correctly(admin_client):
+    push_error1 = PushErrorFactory()
+    push_error2 = PushErrorFactory()
+
+    response = admin_client.get(CHANGELIST_URL)
+    assert response.status_code == 200
+
+    soup = BeautifulSoup(response.content, "html.parser")
+    str_a_tags = soup.select(".field-__str__ a")
+
+    assert [tag.text for tag in str_a_tags] == [str(push_error2), str(push_error1)]
@@ -0,0 +1,38 @@
+import pytest
+
+from expo_notifications.models import PushError
+
+
+@pytest.mark.django_db
+def test_bulk_get_or_create_stores_each_push_error_once():
+    push_errors = [
+        PushError.build("test-message", {"error": "MessageTooBig"}, "token1"),
+        PushError.build("test-message", {"error": "MessageTooBig"}, "token2"),
+        PushError.build("other-message", None, "token3"),
+    ]
+
+    stored_push_errors = PushError.objects.bulk_get_or_create(push_errors)
+
+    assert PushError.objects.count() == 2
+    assert stored_push_errors[0].pk == stored_push_errors[1].pk
+    assert stored_push_errors[2].message == "other-message"
+
+
+@pytest.mark.django_db
+def test_bulk_get_or_create_returns_previously_stored_push_errors():
+    [stored_push_error] = PushError.objects.bulk_get_or_create(
+        [PushError.build("test-message", None, "token1")]
+    )
+
+    assert PushError.objects.bulk_get_or_create(
+        [PushError.build("test-message", None, "token2")]
+    ) == [stored_push_error]
+    assert PushError.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_bulk_get_or_create_does_not_query_without_push_errors(
+    django_assert_num_queries,
+):
+    with django_assert_num_queries(0):
+        assert PushError.objects.bulk_get_or_create([]) == []
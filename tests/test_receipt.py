@@ -1,9 +1,23 @@
 import pytest
 
-from tests.factories import ReceiptFactory
+from tests.factories import PushErrorFactory, ReceiptFactory
 
 
 @pytest.mark.django_db
 def test_str():
     receipt = ReceiptFactory()
     assert str(receipt) == f"Receipt #{receipt.pk}"
+
+
+@pytest.mark.django_db
+def test_get_error_message_reads_the_message_of_the_error():
+    receipt = ReceiptFactory(
+        error_message="", error=PushErrorFactory(message="test-message")
+    )
+    assert receipt.get_error_message() == "test-message"
+
+
+@pytest.mark.django_db
+def test_get_error_message_falls_back_to_the_stored_message():
+    receipt = ReceiptFactory(error_message="test-message", error=None)
+    assert receipt.get_error_message() == "test-message"
@@ -1,16 +1,23 @@
+import logging
 from datetime import timedelta
 
+import httpx
 import pytest
 from celery.exceptions import Retry
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from exponent_server_sdk import (
     PushClient,
     PushServerError,
     PushTicket,
 )
+from requests import Response
 from requests.exceptions import ConnectionError, HTTPError
 
+from expo_notifications.models import Message, PushError, Ticket
 from expo_notifications.tasks import send_messages
-from tests.factories import MessageFactory
+from tests.factories import CampaignFactory, MessageFactory
 
 
 @pytest.fixture
@@ -226,7 +233,7 @@ def test_stores_push_ticket_error_message(mock_publish_multiple, message1, messa
         PushTicket(
             push_message="test-push-message",
             status=PushTicket.ERROR_STATUS,
-            message="",
+            message="test-failure-message",
             details=None,
             id="",
         ),
@@ -237,10 +244,14 @@ def test_stores_push_ticket_error_message(mock_publish_multiple, message1, messa
     ticket1 = message1.tickets.get()
     assert ticket1.is_success
     assert ticket1.error_message == "test-error-message"
+    assert ticket1.get_error_message() == "test-error-message"
 
     ticket2 = message2.tickets.get()
     assert not ticket2.is_success
+    # The message of failed tickets is only stored on their error
     assert ticket2.error_message == ""
+    assert ticket2.error.message == "test-failure-message"
+    assert ticket2.get_error_message() == "test-failure-message"
 
 
 @pytest.mark.parametrize(
@@ -366,6 +377,7 @@ def test_messages_can_be_sent_multiple_times(mock_publish_multiple, message1):
     send_messages([message1.pk])
     assert message1.tickets.count() == 1
 
+    message1.send()
     send_messages([message1.pk])
     assert message1.tickets.count() == 2
 
@@ -374,3 +386,620 @@ def test_messages_can_be_sent_multiple_times(mock_publish_multiple, message1):
 
     ticket2 = message1.tickets.all()[1]
     assert ticket2.external_id == "test-ticket2-id"
+
+
+@pytest.mark.django_db
+def test_query_count_does_not_grow_with_the_number_of_messages(mock_publish_multiple):
+    mock_publish_multiple.side_effect = lambda push_messages: [
+        PushTicket(
+            push_message=push_message,
+            status=PushTicket.SUCCESS_STATUS,
+            message="",
+            details=None,
+            id=f"test-ticket-{index}-id",
+        )
+        for index, push_message in enumerate(push_messages)
+    ]
+
+    def count_queries(message_count):
+        messages = MessageFactory.create_batch(message_count, device__is_active=True)
+
+        with CaptureQueriesContext(connection) as context:
+            send_messages([message.pk for message in messages])
+
+        return len(context.captured_queries)
+
+    assert count_queries(1) == count_queries(50)
+
+
+@pytest.mark.django_db
+def test_reports_how_many_devices_were_deactivated(
+    mock_publish_multiple, caplog, message1, message2, message3
+):
+    mock_publish_multiple.return_value = [
+        PushTicket(
+            push_message="test-push-message",
+            status=PushTicket.ERROR_STATUS,
+            message="test-message",
+            details={"error": PushTicket.ERROR_DEVICE_NOT_REGISTERED},
+            id="",
+        ),
+        PushTicket(
+            push_message="test-push-message",
+            status=PushTicket.SUCCESS_STATUS,
+            message="",
+            details=None,
+            id="test-ticket2-id",
+        ),
+        PushTicket(
+            push_message="test-push-message",
+            status=PushTicket.ERROR_STATUS,
+            message="test-message",
+            details={"error": PushTicket.ERROR_DEVICE_NOT_REGISTERED},
+            id="",
+        ),
+    ]
+
+    with caplog.at_level(logging.INFO):
+        send_messages([message1.pk, message2.pk, message3.pk])
+
+    assert "Deactivated 2 unregistered devices" in caplog.messages
+
+    message1.device.refresh_from_db()
+    assert not message1.device.is_active
+
+    message2.device.refresh_from_db()
+    assert message2.device.is_active
+
+    message3.device.refresh_from_db()
+    assert not message3.device.is_active
+
+
+@pytest.mark.django_db
+def test_publishes_chunks_one_after_another_by_default(fake_expo_server):
+    fake_expo_server.delay = 0.1
+    messages = MessageFactory.create_batch(250, device__is_active=True)
+
+    send_messages([message.pk for message in messages])
+
+    assert len(fake_expo_server.send_requests) == 3
+    assert fake_expo_server.max_in_flight == 1
+
+
+@pytest.mark.django_db
+def test_publishes_chunks_in_parallel(settings, fake_expo_server):
+    settings.EXPO_NOTIFICATIONS_SEND_CONCURRENCY = 3
+    fake_expo_server.delay = 0.2
+    messages = MessageFactory.create_batch(250, device__is_active=True)
+
+    send_messages([message.pk for message in messages])
+
+    assert len(fake_expo_server.send_requests) == 3
+    assert fake_expo_server.max_in_flight == 3
+
+    for message in messages:
+        ticket = message.tickets.get()
+        assert ticket.external_id == f"ticket-{message.device.push_token}"
+
+
+@pytest.mark.django_db
+def test_sends_campaign_payloads(mock_publish_multiple):
+    campaign = CampaignFactory()
+    message1 = MessageFactory(campaign=campaign, device__is_active=True)
+    message2 = MessageFactory(campaign=campaign, device__is_active=True)
+
+    send_messages([message1.pk, message2.pk])
+
+    assert mock_publish_multiple.call_args.args == (
+        [
+            campaign.build_push_message(message1.device.push_token),
+            campaign.build_push_message(message2.device.push_token),
+        ],
+    )
+
+
+@pytest.mark.django_db
+def test_coalesces_messages_with_identical_payloads(settings, fake_expo_server):
+    settings.EXPO_NOTIFICATIONS_COALESCE_PUSH_MESSAGES = True
+
+    campaign = CampaignFactory()
+    message1 = MessageFactory(campaign=campaign, device__is_active=True)
+    message2 = MessageFactory(device__is_active=True)
+    message3 = MessageFactory(campaign=campaign, device__is_active=True)
+    fake_expo_server.unregistered_tokens = {message3.device.push_token}
+
+    send_messages([message1.pk, message2.pk, message3.pk])
+
+    [push_messages] = fake_expo_server.send_requests
+    assert [push_message["to"] for push_message in push_messages] == [
+        [message1.device.push_token, message3.device.push_token],
+        message2.device.push_token,
+    ]
+
+    ticket1 = message1.tickets.get()
+    assert ticket1.is_success
+    assert ticket1.external_id == f"ticket-{message1.device.push_token}"
+
+    ticket2 = message2.tickets.get()
+    assert ticket2.is_success
+    assert ticket2.external_id == f"ticket-{message2.device.push_token}"
+
+    ticket3 = message3.tickets.get()
+    assert not ticket3.is_success
+
+    message3.device.refresh_from_db()
+    assert not message3.device.is_active
+
+
+@pytest.mark.django_db
+def test_does_not_coalesce_messages_by_default(mock_publish_multiple):
+    campaign = CampaignFactory()
+    message1 = MessageFactory(campaign=campaign, device__is_active=True)
+    message2 = MessageFactory(campaign=campaign, device__is_active=True)
+
+    send_messages([message1.pk, message2.pk])
+
+    assert mock_publish_multiple.call_args.args == (
+        [message1.to_push_message(), message2.to_push_message()],
+    )
+
+
+@pytest.mark.django_db
+def test_publishes_chunks_with_the_asyncio_engine(settings, fake_expo_server):
+    settings.EXPO_NOTIFICATIONS_SENDING_ENGINE = "asyncio"
+    settings.EXPO_NOTIFICATIONS_SEND_CONCURRENCY = 3
+    fake_expo_server.delay = 0.2
+    messages = MessageFactory.create_batch(250, device__is_active=True)
+    fake_expo_server.unregistered_tokens = {messages[0].device.push_token}
+
+    send_messages([message.pk for message in messages])
+
+    assert len(fake_expo_server.send_requests) == 3
+    assert fake_expo_server.max_in_flight == 3
+
+    for message in messages[1:]:
+        ticket = message.tickets.get()
+        assert ticket.is_success
+        assert ticket.external_id == f"ticket-{message.device.push_token}"
+
+    assert not messages[0].tickets.get().is_success
+    messages[0].device.refresh_from_db()
+    assert not messages[0].device.is_active
+
+
+@pytest.mark.django_db
+def test_asyncio_engine_retries_on_connection_errors(
+    settings, mocker, message1, message2
+):
+    settings.EXPO_NOTIFICATIONS_SENDING_ENGINE = "asyncio"
+    mocker.patch.object(
+        httpx.AsyncClient, "post", side_effect=httpx.ConnectError("refused")
+    )
+
+    with pytest.raises(Retry):
+        send_messages([message1.pk, message2.pk])
+
+    assert not Ticket.objects.exists()
+
+
+@pytest.mark.django_db
+def test_asyncio_engine_retries_on_http_errors(settings, mocker, message1, message2):
+    settings.EXPO_NOTIFICATIONS_SENDING_ENGINE = "asyncio"
+    request = httpx.Request("POST", "https://exp.host/--/api/v2/push/send")
+    response = httpx.Response(500, json={"data": []}, request=request)
+    mocker.patch.object(httpx.AsyncClient, "post", return_value=response)
+
+    with pytest.raises(Retry):
+        send_messages([message1.pk, message2.pk])
+
+    assert not Ticket.objects.exists()
+
+
+@pytest.mark.django_db
+def test_retries_after_the_delay_requested_by_expo(
+    mocker, mock_publish_multiple, message1, message2
+):
+    response = Response()
+    response.status_code = 429
+    response.headers["Retry-After"] = "30"
+    mock_publish_multiple.side_effect = PushServerError(
+        "Request failed", response, errors=[{"code": "TOO_MANY_REQUESTS"}]
+    )
+    mocker.patch("expo_notifications.tasks.throttle.random.uniform", return_value=7)
+    mock_retry = mocker.patch.object(send_messages, "retry", side_effect=Retry)
+
+    with pytest.raises(Retry):
+        send_messages([message1.pk, message2.pk])
+
+    mock_retry.assert_called_once_with(
+        args=[[message1.pk, message2.pk], None], kwargs={}, countdown=37
+    )
+
+
+@pytest.mark.django_db
+def test_throttles_pushes_per_chunk(settings, mocker, fake_expo_server):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 600
+    mock_throttle = mocker.patch("expo_notifications.tasks.send_messages_task.throttle")
+    messages = MessageFactory.create_batch(150, device__is_active=True)
+
+    send_messages([message.pk for message in messages])
+
+    assert [call.args for call in mock_throttle.call_args_list] == [(100,), (50,)]
+
+
+@pytest.mark.parametrize("engine", ["sync", "asyncio"])
+@pytest.mark.django_db
+def test_retries_only_the_messages_of_failed_chunks(
+    settings, mocker, fake_expo_server, engine
+):
+    settings.EXPO_NOTIFICATIONS_SENDING_ENGINE = engine
+    settings.EXPO_NOTIFICATIONS_SEND_CONCURRENCY = 3
+    messages = MessageFactory.create_batch(250, device__is_active=True)
+    fake_expo_server.rate_limited_tokens = {messages[150].device.push_token}
+    mock_retry = mocker.patch.object(send_messages, "retry", side_effect=Retry)
+
+    with pytest.raises(Retry):
+        send_messages([message.pk for message in messages])
+
+    assert len(fake_expo_server.send_requests) == 2
+    assert Ticket.objects.count() == 150
+
+    for message in messages[:100] + messages[200:]:
+        ticket = message.tickets.get()
+        assert ticket.external_id == f"ticket-{message.device.push_token}"
+
+    [call] = mock_retry.call_args_list
+    assert call.kwargs["args"] == [
+        [message.pk for message in messages[100:200]],
+        None,
+    ]
+    assert call.kwargs["kwargs"] == {}
+    assert 1 <= call.kwargs["countdown"] <= 2
+
+
+@pytest.mark.parametrize("engine", ["sync", "asyncio"])
+@pytest.mark.django_db
+def test_stops_publishing_chunks_when_throttled(
+    settings, mocker, fake_expo_server, engine
+):
+    settings.EXPO_NOTIFICATIONS_SENDING_ENGINE = engine
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 600
+    messages = MessageFactory.create_batch(250, device__is_active=True)
+    fake_expo_server.rate_limited_tokens = {messages[100].device.push_token}
+    mock_block = mocker.patch("expo_notifications.tasks.throttle.block")
+    mock_retry = mocker.patch.object(send_messages, "retry", side_effect=Retry)
+
+    with pytest.raises(Retry):
+        send_messages([message.pk for message in messages])
+
+    assert len(fake_expo_server.send_requests) == 1
+    assert Ticket.objects.count() == 100
+    mock_block.assert_any_call(1)
+
+    [call] = mock_retry.call_args_list
+    assert call.kwargs["args"] == [[message.pk for message in messages[100:]], None]
+
+
+@pytest.mark.django_db
+def test_keeps_publishing_chunks_after_other_push_server_errors(
+    mocker, mock_publish_multiple
+):
+    messages = MessageFactory.create_batch(250, device__is_active=True)
+    invalid_token = messages[0].device.push_token
+
+    def publish_multiple(push_messages):
+        if push_messages[0].to == invalid_token:
+            raise PushServerError("Invalid server response", None)
+        return [
+            PushTicket(push_message, PushTicket.SUCCESS_STATUS, "", None, "ticket")
+            for push_message in push_messages
+        ]
+
+    mock_publish_multiple.side_effect = publish_multiple
+    mock_block = mocker.patch("expo_notifications.tasks.throttle.block")
+    mock_retry = mocker.patch.object(send_messages, "retry", side_effect=Retry)
+
+    with pytest.raises(Retry):
+        send_messages([message.pk for message in messages])
+
+    assert mock_publish_multiple.call_count == 3
+    assert Ticket.objects.count() == 150
+    assert not mock_block.called
+
+    [call] = mock_retry.call_args_list
+    assert call.kwargs["args"] == [[message.pk for message in messages[:100]], None]
+
+
+@pytest.mark.django_db
+def test_schedules_receipt_checks_before_retrying_failed_chunks(
+    mocker, mock_check_receipts_apply_async, fake_expo_server
+):
+    messages = MessageFactory.create_batch(150, device__is_active=True)
+    fake_expo_server.rate_limited_tokens = {messages[100].device.push_token}
+    mocker.patch.object(send_messages, "retry", side_effect=Retry)
+
+    with pytest.raises(Retry):
+        send_messages([message.pk for message in messages])
+
+    [call] = mock_check_receipts_apply_async.call_args_list
+    assert call.kwargs["kwargs"]["ticket_pks"] == list(
+        Ticket.objects.order_by("pk").values_list("pk", flat=True)
+    )
+
+
+@pytest.mark.django_db
+def test_does_not_resend_messages_when_redelivered(mock_publish_multiple, message1):
+    mock_publish_multiple.return_value = [
+        PushTicket(
+            push_message="test-push-message",
+            status=PushTicket.SUCCESS_STATUS,
+            message="",
+            details=None,
+            id="test-ticket1-id",
+        ),
+    ]
+
+    send_messages([message1.pk])
+    send_messages([message1.pk])
+
+    assert mock_publish_multiple.call_count == 1
+    assert message1.tickets.count() == 1
+
+
+@pytest.mark.parametrize("status", [Message.STATUS_SENT, Message.STATUS_FAILED])
+@pytest.mark.django_db
+def test_sends_only_queued_messages(mock_publish_multiple, message1, status):
+    message1.status = status
+    message1.save()
+
+    send_messages([message1.pk])
+
+    assert not mock_publish_multiple.called
+    assert not message1.tickets.exists()
+
+
+@pytest.mark.django_db
+def test_retries_messages_claimed_by_another_task_once_the_claim_expired(
+    settings, mocker, mock_publish_multiple, message1, message2
+):
+    settings.EXPO_NOTIFICATIONS_CLAIM_TIMEOUT = timedelta(minutes=10)
+    mock_publish_multiple.return_value = [
+        PushTicket(
+            push_message=message2.to_push_message(),
+            status=PushTicket.SUCCESS_STATUS,
+            message="",
+            details=None,
+            id="",
+        )
+    ]
+    # Claimed by a task whose worker died before this task was redelivered
+    message1.status = Message.STATUS_SENDING
+    message1.claimed_at = timezone.now()
+    message1.save()
+    mock_retry = mocker.patch.object(send_messages, "retry", side_effect=Retry)
+
+    with pytest.raises(Retry):
+        send_messages([message1.pk, message2.pk])
+
+    mock_publish_multiple.assert_called_once_with([message2.to_push_message()])
+    mock_retry.assert_called_once_with(
+        args=[[message1.pk], None], kwargs={}, countdown=600
+    )
+
+
+@pytest.mark.django_db
+def test_releases_claimed_messages_when_sending_raises(mock_publish_multiple, message1):
+    mock_publish_multiple.side_effect = RuntimeError
+
+    with pytest.raises(RuntimeError):
+        send_messages([message1.pk])
+
+    message1.refresh_from_db()
+    assert message1.status == Message.STATUS_QUEUED
+    assert message1.claimed_at is None
+
+
+@pytest.mark.parametrize("engine", ["sync", "asyncio"])
+@pytest.mark.django_db
+def test_stores_failed_tickets_for_invalid_push_tokens(
+    settings, fake_expo_server, engine
+):
+    settings.EXPO_NOTIFICATIONS_SENDING_ENGINE = engine
+    invalid_message = MessageFactory(
+        device__is_active=True, device__push_token="not-an-expo-token"
+    )
+    valid_message = MessageFactory(device__is_active=True)
+
+    send_messages([invalid_message.pk, valid_message.pk])
+
+    [push_messages] = fake_expo_server.send_requests
+    assert [push_message["to"] for push_message in push_messages] == [
+        valid_message.device.push_token
+    ]
+
+    ticket = invalid_message.tickets.get()
+    assert not ticket.is_success
+    assert ticket.get_error_message() == "Invalid push token"
+    assert ticket.error_code == PushError.CODE_UNKNOWN
+
+    invalid_message.refresh_from_db()
+    assert invalid_message.status == Message.STATUS_FAILED
+    valid_message.refresh_from_db()
+    assert valid_message.status == Message.STATUS_SENT
+
+
+@pytest.mark.django_db
+def test_sends_nothing_if_all_push_tokens_are_invalid(mock_publish_multiple):
+    message = MessageFactory(
+        device__is_active=True, device__push_token="not-an-expo-token"
+    )
+
+    send_messages([message.pk])
+
+    assert not mock_publish_multiple.called
+    assert not message.tickets.get().is_success
+
+
+@pytest.mark.django_db
+def test_updates_the_status_of_sent_messages(mock_publish_multiple, message1, message2):
+    mock_publish_multiple.return_value = [
+        PushTicket(
+            push_message="test-push-message",
+            status=PushTicket.SUCCESS_STATUS,
+            message="",
+            details=None,
+            id="test-ticket1-id",
+        ),
+        PushTicket(
+            push_message="test-push-message",
+            status=PushTicket.ERROR_STATUS,
+            message="test-message",
+            details=None,
+            id="",
+        ),
+    ]
+
+    send_messages([message1.pk, message2.pk])
+
+    message1.refresh_from_db()
+    assert message1.status == Message.STATUS_SENT
+
+    message2.refresh_from_db()
+    assert message2.status == Message.STATUS_FAILED
+
+
+@pytest.mark.django_db
+def test_requeues_the_messages_of_failed_chunks(mock_publish_multiple, message1):
+    mock_publish_multiple.side_effect = ConnectionError()
+
+    with pytest.raises(Retry):
+        send_messages([message1.pk])
+
+    message1.refresh_from_db()
+    assert message1.status == Message.STATUS_QUEUED
+
+
+@pytest.mark.django_db
+def test_publishes_chunks_with_the_concurrency_of_the_priority_lane(
+    settings, fake_expo_server
+):
+    settings.EXPO_NOTIFICATIONS_PRIORITY_LANES = {"high": {"concurrency": 3}}
+    fake_expo_server.delay = 0.2
+    messages = MessageFactory.create_batch(250, device__is_active=True)
+
+    send_messages([message.pk for message in messages], "high")
+
+    assert len(fake_expo_server.send_requests) == 3
+    assert fake_expo_server.max_in_flight == 3
+
+
+@pytest.mark.django_db
+def test_does_not_send_messages_before_they_are_due(mock_publish_multiple, message1):
+    message1.send_at = timezone.now() + timedelta(hours=1)
+    message1.save()
+
+    send_messages([message1.pk])
+
+    assert not mock_publish_multiple.called
+    message1.refresh_from_db()
+    assert message1.status == Message.STATUS_QUEUED
+
+
+@pytest.mark.django_db
+def test_skips_expired_messages(mock_publish_multiple, caplog, message1, message2):
+    message1.expiration = timezone.now() - timedelta(seconds=1)
+    message1.save()
+    mock_publish_multiple.return_value = [
+        PushTicket(
+            push_message=message2.to_push_message(),
+            status=PushTicket.SUCCESS_STATUS,
+            message="",
+            details=None,
+            id="",
+        )
+    ]
+
+    with caplog.at_level(logging.INFO):
+        send_messages([message1.pk, message2.pk])
+
+    mock_publish_multiple.assert_called_once_with([message2.to_push_message()])
+    assert "Skipped 1 expired messages" in caplog.messages
+    message1.refresh_from_db()
+    assert message1.status == Message.STATUS_EXPIRED
+    assert not message1.tickets.exists()
+
+
+@pytest.mark.django_db
+def test_fails_messages_to_inactive_devices(
+    mock_publish_multiple, caplog, message1, message2
+):
+    message1.device.is_active = False
+    message1.device.save()
+    mock_publish_multiple.return_value = [
+        PushTicket(
+            push_message=message2.to_push_message(),
+            status=PushTicket.SUCCESS_STATUS,
+            message="",
+            details=None,
+            id="",
+        )
+    ]
+
+    with caplog.at_level(logging.INFO):
+        send_messages([message1.pk, message2.pk])
+
+    mock_publish_multiple.assert_called_once_with([message2.to_push_message()])
+    assert "Skipped 1 messages to inactive devices" in caplog.messages
+    message1.refresh_from_db()
+    assert message1.status == Message.STATUS_FAILED
+    assert not message1.tickets.exists()
+
+
+@pytest.mark.django_db
+def test_schedules_no_check_receipts_task_when_receipts_are_collected(
+    settings, mock_check_receipts_apply_async, fake_expo_server, message1
+):
+    settings.EXPO_NOTIFICATIONS_RECEIPT_CHECK_MODE = "collector"
+
+    send_messages([message1.pk])
+
+    assert message1.tickets.get().is_success
+    assert not mock_check_receipts_apply_async.called
+
+
+@pytest.mark.django_db
+def test_stores_push_ticket_errors(mock_publish_multiple, message1, message2, message3):
+    mock_publish_multiple.return_value = [
+        PushTicket(
+            push_message="test-push-message",
+            status=PushTicket.ERROR_STATUS,
+            message=f"{message.device.push_token} is not registered",
+            details={
+                "error": "DeviceNotRegistered",
+                "expoPushToken": message.device.push_token,
+            },
+            id="",
+        )
+        for message in [message1, message2]
+    ] + [
+        PushTicket(
+            push_message="test-push-message",
+            status=PushTicket.SUCCESS_STATUS,
+            message="",
+            details=None,
+            id="test-ticket3-id",
+        ),
+    ]
+
+    send_messages([message1.pk, message2.pk, message3.pk])
+
+    ticket1 = message1.tickets.get()
+    ticket2 = message2.tickets.get()
+    ticket3 = message3.tickets.get()
+    assert ticket1.error_code == PushError.CODE_DEVICE_NOT_REGISTERED
+    assert ticket2.error_code == PushError.CODE_DEVICE_NOT_REGISTERED
+    assert ticket1.error == ticket2.error
+    assert ticket1.error.message == "<push token> is not registered"
+    assert ticket1.error.details == {"error": "DeviceNotRegistered"}
+    assert ticket3.error_code is None
+    assert ticket3.error is None
@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from expo_notifications.models import Message
+from expo_notifications.tasks import send_messages, send_scheduled_messages
+from tests.factories import CampaignFactory, MessageFactory
+
+
+@pytest.fixture
+def mock_send_messages_apply_async_on_commit(mocker):
+    return mocker.patch(
+        "expo_notifications.tasks.send_messages_task"
+        ".send_messages.apply_async_on_commit"
+    )
+
+
+@pytest.mark.django_db
+def test_enqueues_due_messages_in_batches_ordered_by_send_at(
+    settings, mock_send_messages_delay_on_commit
+):
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_SHARD_SIZE = 2
+    now = timezone.now()
+    messages = [MessageFactory(send_at=now - timedelta(minutes=i)) for i in range(3)]
+
+    send_scheduled_messages()
+
+    assert [
+        call.args for call in mock_send_messages_delay_on_commit.call_args_list
+    ] == [([messages[2].pk, messages[1].pk],), ([messages[0].pk],)]
+
+
+@pytest.mark.django_db
+def test_enqueues_only_due_queued_messages(mock_send_messages_delay_on_commit):
+    now = timezone.now()
+    MessageFactory(send_at=now + timedelta(minutes=1))
+    MessageFactory(send_at=None)
+    MessageFactory(send_at=now, status=Message.STATUS_SENT)
+    MessageFactory(send_at=now, status=Message.STATUS_DRAFT)
+    message = MessageFactory(send_at=now)
+
+    send_scheduled_messages()
+
+    mock_send_messages_delay_on_commit.assert_called_once_with([message.pk])
+
+
+@pytest.mark.django_db
+def test_enqueues_messages_through_their_priority_lanes(
+    settings,
+    mock_send_messages_delay_on_commit,
+    mock_send_messages_apply_async_on_commit,
+):
+    settings.EXPO_NOTIFICATIONS_PRIORITY_LANES = {"high": {"queue": "urgent"}}
+    now = timezone.now()
+    high_message = MessageFactory(send_at=now, priority="high")
+    campaign_message = MessageFactory(
+        send_at=now, campaign=CampaignFactory(priority="high")
+    )
+    default_message = MessageFactory(send_at=now, priority="normal")
+
+    send_scheduled_messages()
+
+    mock_send_messages_apply_async_on_commit.assert_called_once_with(
+        args=([high_message.pk, campaign_message.pk], "high"), queue="urgent"
+    )
+    mock_send_messages_delay_on_commit.assert_called_once_with([default_message.pk])
+
+
+@pytest.mark.django_db
+def test_does_not_enqueue_messages_again_until_the_claim_timeout(
+    settings, mocker, mock_send_messages_delay_on_commit
+):
+    settings.EXPO_NOTIFICATIONS_CLAIM_TIMEOUT = timedelta(minutes=10)
+    message = MessageFactory(send_at=timezone.now())
+
+    send_scheduled_messages()
+    send_scheduled_messages()
+
+    assert mock_send_messages_delay_on_commit.call_count == 1
+
+    # The sending task was lost, so the message is handed off again
+    mocker.patch(
+        "django.utils.timezone.now",
+        return_value=timezone.now() + timedelta(minutes=11),
+    )
+    send_scheduled_messages()
+
+    assert mock_send_messages_delay_on_commit.call_count == 2
+    assert mock_send_messages_delay_on_commit.call_args.args == ([message.pk],)
+
+
+@pytest.mark.django_db
+def test_leaves_due_messages_to_the_dispatcher_in_the_outbox_delivery_mode(
+    settings, mock_send_messages_delay_on_commit
+):
+    settings.EXPO_NOTIFICATIONS_DELIVERY_MODE = "outbox"
+    message = MessageFactory(send_at=timezone.now())
+
+    send_scheduled_messages()
+
+    assert not mock_send_messages_delay_on_commit.called
+    message.refresh_from_db()
+    assert message.next_attempt_at is None
+
+
+@pytest.mark.django_db
+def test_sends_scheduled_messages_through_sending_tasks(
+    mocker, mock_send_messages_delay_on_commit, fake_expo_server
+):
+    mocker.patch(
+        "expo_notifications.tasks.check_receipts_task.check_receipts.apply_async"
+    )
+    message = MessageFactory(device__is_active=True, send_at=timezone.now())
+
+    send_scheduled_messages()
+
+    [(message_pks,)] = [
+        call.args for call in mock_send_messages_delay_on_commit.call_args_list
+    ]
+    send_messages(message_pks)
+
+    message.refresh_from_db()
+    assert message.status == Message.STATUS_SENT
@@ -24,3 +24,12 @@ def test_session_authorization_uses_the_configured_token(settings):
     from expo_notifications.tasks.session import session
 
     assert session.headers["Authorization"] == "Bearer test-token"
+
+
+def test_session_pool_fits_the_concurrency_of_priority_lanes(settings):
+    settings.EXPO_NOTIFICATIONS_SEND_CONCURRENCY = 12
+    settings.EXPO_NOTIFICATIONS_PRIORITY_LANES = {"high": {"concurrency": 20}}
+
+    from expo_notifications.tasks.session import session
+
+    assert session.get_adapter("https://exp.host")._pool_maxsize == 20
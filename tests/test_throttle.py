@@ -0,0 +1,213 @@
+import asyncio
+from datetime import timedelta
+from email.utils import formatdate
+
+import pytest
+from django.core.cache import cache
+from exponent_server_sdk import PushServerError
+from requests import Response
+from requests.exceptions import ConnectionError, HTTPError
+
+from expo_notifications.tasks.throttle import (
+    BLOCKED_UNTIL_KEY,
+    athrottle,
+    block,
+    get_retry_after,
+    get_retry_countdown,
+    handle_throttling,
+    reserve,
+    throttle,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def mock_time(mocker):
+    mock_time = mocker.patch("expo_notifications.tasks.throttle.time.time")
+    mock_time.return_value = 1000.25
+    return mock_time
+
+
+def rate_limited_response(retry_after: str | None = None) -> Response:
+    response = Response()
+    response.status_code = 429
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return response
+
+
+def test_reserve_allows_pushes_up_to_the_rate_limit(settings, mock_time):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 150
+
+    assert reserve(100) == 0
+    assert reserve(50) == 0
+    assert reserve(1) == 0.75
+
+
+def test_reserve_allows_pushes_again_in_the_next_window(settings, mock_time):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 100
+
+    assert reserve(100) == 0
+    assert reserve(100) > 0
+
+    mock_time.return_value = 1001.0
+    assert reserve(100) == 0
+
+
+def test_reserve_does_not_count_rejected_pushes(settings, mock_time):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 150
+
+    assert reserve(100) == 0
+    assert reserve(100) == 0.75
+    assert reserve(50) == 0
+    assert reserve(1) == 0.75
+
+
+def test_reserve_counts_reservations_above_the_limit_as_a_whole_window(
+    settings, mock_time
+):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 10
+
+    assert reserve(100) == 0
+    assert reserve(1) > 0
+
+    mock_time.return_value = 1001.0
+    assert reserve(1) == 0
+    assert reserve(100) > 0
+
+
+def test_reserve_waits_while_blocked(settings, mock_time):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 100
+
+    block(5)
+
+    assert reserve(1) == 5
+
+    mock_time.return_value = 1005.25
+    assert reserve(1) == 0
+
+
+def test_throttle_does_nothing_without_a_rate_limit(settings, mocker):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = None
+    mock_reserve = mocker.patch("expo_notifications.tasks.throttle.reserve")
+
+    throttle(100)
+    asyncio.run(athrottle(100))
+
+    mock_reserve.assert_not_called()
+
+
+def test_throttle_sleeps_until_pushes_may_be_sent(settings, mocker):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 100
+    mocker.patch(
+        "expo_notifications.tasks.throttle.reserve", side_effect=[0.5, 0.25, 0]
+    )
+    mock_sleep = mocker.patch("expo_notifications.tasks.throttle.time.sleep")
+
+    throttle(100)
+
+    assert [call.args for call in mock_sleep.call_args_list] == [(0.5,), (0.25,)]
+
+
+def test_athrottle_sleeps_until_pushes_may_be_sent(settings, mocker):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 100
+    mocker.patch(
+        "expo_notifications.tasks.throttle.reserve", side_effect=[0.5, 0.25, 0]
+    )
+    mock_sleep = mocker.patch(
+        "expo_notifications.tasks.throttle.asyncio.sleep", new=mocker.AsyncMock()
+    )
+
+    asyncio.run(athrottle(100))
+
+    assert [call.args for call in mock_sleep.call_args_list] == [(0.5,), (0.25,)]
+
+
+def test_handle_throttling_blocks_for_the_time_requested_by_expo(settings, mock_time):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 100
+    error = HTTPError(response=rate_limited_response("30"))
+
+    assert handle_throttling(error)
+    assert reserve(1) == 30
+
+
+def test_handle_throttling_blocks_for_the_retry_delay_on_too_many_requests_errors(
+    settings, mock_time
+):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 100
+    settings.EXPO_NOTIFICATIONS_SENDING_TASK_RETRY_DELAY = timedelta(seconds=10)
+    error = PushServerError(
+        "Request failed", Response(), errors=[{"code": "TOO_MANY_REQUESTS"}]
+    )
+
+    assert handle_throttling(error)
+    assert reserve(1) == 10
+
+
+def test_handle_throttling_ignores_other_errors(settings, mock_time):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 100
+    response = rate_limited_response("30")
+    response.status_code = 503
+
+    assert not handle_throttling(HTTPError(response=response))
+    assert not handle_throttling(PushServerError("Invalid server response", None))
+    assert not handle_throttling(
+        PushServerError("Request failed", response, errors=[{"code": "API_ERROR"}])
+    )
+    assert not handle_throttling(ConnectionError())
+    assert not handle_throttling(None)
+    assert reserve(1) == 0
+
+
+def test_get_retry_after_parses_seconds():
+    assert get_retry_after(rate_limited_response("30")) == 30
+
+
+def test_get_retry_after_parses_http_dates(mock_time):
+    assert get_retry_after(rate_limited_response(formatdate(1030))) == 29.75
+
+
+def test_get_retry_after_ignores_invalid_values():
+    assert get_retry_after(rate_limited_response("soon")) is None
+
+
+def test_get_retry_after_ignores_missing_values():
+    assert get_retry_after(rate_limited_response()) is None
+
+
+def test_get_retry_after_ignores_other_status_codes():
+    response = rate_limited_response("30")
+    response.status_code = 503
+
+    assert get_retry_after(response) is None
+
+
+def test_get_retry_after_ignores_missing_responses():
+    assert get_retry_after(None) is None
+
+
+def test_get_retry_countdown_adds_jitter_to_retry_after(settings, mocker):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = None
+    mocker.patch("expo_notifications.tasks.throttle.random.uniform", return_value=7)
+    error = HTTPError(response=rate_limited_response("30"))
+
+    assert get_retry_countdown(error) == 37
+    assert cache.get(BLOCKED_UNTIL_KEY) is None
+
+
+def test_get_retry_countdown_blocks_all_workers_when_throttling(settings, mock_time):
+    settings.EXPO_NOTIFICATIONS_SEND_RATE_LIMIT = 100
+    error = HTTPError(response=rate_limited_response("30"))
+
+    assert 30 <= get_retry_countdown(error) <= 60
+    assert reserve(1) == 30
+
+
+def test_get_retry_countdown_is_none_without_retry_after():
+    assert get_retry_countdown(HTTPError()) is None
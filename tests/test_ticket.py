@@ -1,7 +1,10 @@
+from datetime import timedelta
+
 import pytest
+from django.utils import timezone
 from exponent_server_sdk import PushTicket
 
-from tests.factories import TicketFactory
+from tests.factories import PushErrorFactory, ReceiptFactory, TicketFactory
 
 
 @pytest.mark.django_db
@@ -42,6 +45,44 @@ def test_to_push_ticket_passes_error_message_through():
     assert push_ticket.message == ticket.error_message
 
 
+@pytest.mark.django_db
+def test_to_push_ticket_reads_the_message_of_the_error():
+    ticket = TicketFactory(
+        error_message="", error=PushErrorFactory(message="something went wrong")
+    )
+    push_ticket = ticket.to_push_ticket()
+    assert push_ticket.message == "something went wrong"
+
+
+@pytest.mark.django_db
+def test_get_error_message_reads_the_message_of_the_error():
+    ticket = TicketFactory(
+        error_message="", error=PushErrorFactory(message="test-message")
+    )
+    assert ticket.get_error_message() == "test-message"
+
+
+@pytest.mark.django_db
+def test_get_error_message_falls_back_to_the_stored_message():
+    ticket = TicketFactory(error_message="test-message", error=None)
+    assert ticket.get_error_message() == "test-message"
+
+
+@pytest.mark.django_db
+def test_get_receipt_error_message_reads_the_message_of_the_error():
+    ticket = TicketFactory(
+        receipt_error_message="",
+        receipt_error=PushErrorFactory(message="test-message"),
+    )
+    assert ticket.get_receipt_error_message() == "test-message"
+
+
+@pytest.mark.django_db
+def test_get_receipt_error_message_falls_back_to_the_stored_message():
+    ticket = TicketFactory(receipt_error_message="test-message", receipt_error=None)
+    assert ticket.get_receipt_error_message() == "test-message"
+
+
 @pytest.mark.django_db
 def test_to_push_ticket_leaves_details_blank():
     ticket = TicketFactory()
@@ -64,3 +105,35 @@ def test_check_receipt_schedules_a_check_receipts_task(
     ticket.check_receipt()
     assert mock_check_receipts_delay_on_commit.call_count == 1
     assert mock_check_receipts_delay_on_commit.call_args.args == ([ticket.pk],)
+
+
+@pytest.mark.django_db
+def test_receipt_is_none_for_unchecked_tickets():
+    ticket = TicketFactory()
+    assert ticket.receipt is None
+
+
+@pytest.mark.django_db
+def test_receipt_returns_the_latest_stored_receipt():
+    ticket = TicketFactory()
+    ReceiptFactory(ticket=ticket, date_checked=timezone.now() - timedelta(hours=1))
+    latest_receipt = ReceiptFactory(ticket=ticket, date_checked=timezone.now())
+
+    assert ticket.receipt == latest_receipt
+
+
+@pytest.mark.django_db
+def test_receipt_returns_the_receipt_stored_on_the_ticket():
+    ticket = TicketFactory(
+        receipt_is_success=False,
+        receipt_error_message="test-message",
+        date_checked=timezone.now(),
+    )
+
+    receipt = ticket.receipt
+
+    assert receipt.pk is None
+    assert receipt.ticket == ticket
+    assert receipt.is_success is False
+    assert receipt.error_message == "test-message"
+    assert receipt.date_checked == ticket.date_checked
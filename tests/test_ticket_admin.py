@@ -3,6 +3,7 @@ from bs4 import BeautifulSoup
 from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
 from django.contrib.messages import get_messages
 from django.urls import reverse
+from django.utils import timezone
 
 from tests.factories import ReceiptFactory, TicketFactory
 
@@ -44,6 +45,17 @@ def test_changelist_renders_correctly(admin_client):
     assert receipt_link_td2.text == "0"
 
 
+@pytest.mark.django_db
+def test_changelist_counts_receipts_stored_on_tickets(admin_client):
+    TicketFactory(receipt_is_success=True, date_checked=timezone.now())
+
+    response = admin_client.get(CHANGELIST_URL)
+
+    soup = BeautifulSoup(response.content, "html.parser")
+    [receipt_link_td] = soup.select(".field-receipts_link")
+    assert receipt_link_td.text == "1"
+
+
 @pytest.mark.django_db
 def test_check_tickets_action_schedules_a_check_tickets_task(
     admin_client, mock_check_receipts_delay_on_commit
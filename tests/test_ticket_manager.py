@@ -1,4 +1,8 @@
+from datetime import timedelta
+
 import pytest
+from django.db.models import QuerySet
+from django.utils import timezone
 
 from expo_notifications.models import Ticket
 from tests.factories import TicketFactory
@@ -16,6 +20,98 @@ def test_queryset_check_receipts_schedules_a_check_receipts_task(
     Ticket.objects.all().check_receipts()
 
     assert mock_check_receipts_delay_on_commit.call_count == 1
-    assert mock_check_receipts_delay_on_commit.call_args.args == (
-        [ticket1.pk, ticket2.pk],
+    [ticket_pks] = mock_check_receipts_delay_on_commit.call_args.args
+    assert sorted(ticket_pks) == [ticket1.pk, ticket2.pk]
+
+
+@pytest.mark.django_db
+def test_queryset_check_receipts_schedules_no_check_receipts_task_for_empty_querysets(
+    mock_check_receipts_delay_on_commit,
+):
+    Ticket.objects.none().check_receipts()
+    assert not mock_check_receipts_delay_on_commit.called
+
+
+@pytest.mark.django_db
+def test_queryset_check_receipts_streams_ticket_pks_into_shards(
+    mock_check_receipts_delay_on_commit, mocker, settings
+):
+    settings.EXPO_NOTIFICATIONS_CHECKING_TASK_SHARD_SIZE = 2
+    iterator_spy = mocker.spy(QuerySet, "iterator")
+
+    tickets = TicketFactory.create_batch(3)
+    ticket_pks = [ticket.pk for ticket in tickets]
+
+    Ticket.objects.order_by("pk").check_receipts()
+
+    assert iterator_spy.call_args.kwargs == {"chunk_size": 2}
+    assert [
+        call.args for call in mock_check_receipts_delay_on_commit.call_args_list
+    ] == [
+        (ticket_pks[0:2],),
+        (ticket_pks[2:3],),
+    ]
+
+
+@pytest.mark.django_db
+def test_queryset_receipt_pending_filters_successful_tickets_awaiting_a_receipt(
+    settings,
+):
+    settings.EXPO_NOTIFICATIONS_RECEIPT_CHECK_DELAY = timedelta(minutes=30)
+    now = timezone.now()
+    pending_ticket = TicketFactory(
+        is_success=True, date_received=now - timedelta(minutes=31)
+    )
+    TicketFactory(is_success=True, date_received=now - timedelta(minutes=29))
+    TicketFactory(is_success=True, date_received=now - timedelta(days=2))
+    TicketFactory(is_success=False, date_received=now - timedelta(minutes=31))
+    TicketFactory(
+        is_success=True, date_received=now - timedelta(minutes=31), external_id=""
     )
+    TicketFactory(
+        is_success=True, date_received=now - timedelta(minutes=31), date_checked=now
+    )
+
+    assert list(Ticket.objects.all().receipt_pending()) == [pending_ticket]
+
+
+@pytest.mark.django_db
+def test_queryset_claim_receipts_marks_pending_receipts_as_checked(now):
+    pending_ticket = TicketFactory(
+        is_success=True, date_received=now - timedelta(hours=1)
+    )
+    TicketFactory(is_success=False, date_received=now - timedelta(hours=1))
+
+    assert Ticket.objects.all().claim_receipts(limit=10) == [pending_ticket.pk]
+
+    pending_ticket.refresh_from_db()
+    assert pending_ticket.date_checked == now
+
+
+@pytest.mark.django_db
+def test_queryset_claim_receipts_claims_at_most_limit_receipts_only_once():
+    tickets = [
+        TicketFactory(
+            is_success=True, date_received=timezone.now() - timedelta(hours=1)
+        )
+        for _ in range(3)
+    ]
+
+    assert Ticket.objects.all().claim_receipts(limit=2) == [
+        tickets[0].pk,
+        tickets[1].pk,
+    ]
+    assert Ticket.objects.all().claim_receipts(limit=2) == [tickets[2].pk]
+    assert Ticket.objects.all().claim_receipts(limit=2) == []
+
+
+@pytest.mark.django_db
+def test_queryset_release_receipts_makes_receipts_pending_again():
+    ticket = TicketFactory(
+        is_success=True, date_received=timezone.now() - timedelta(hours=1)
+    )
+    Ticket.objects.all().claim_receipts(limit=10)
+
+    Ticket.objects.all().release_receipts()
+
+    assert list(Ticket.objects.all().receipt_pending()) == [ticket]
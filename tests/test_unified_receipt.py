@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from expo_notifications.models import PushError, UnifiedReceipt
+from tests.factories import PushErrorFactory, ReceiptFactory, TicketFactory
+
+
+@pytest.mark.django_db
+def test_str():
+    receipt = ReceiptFactory()
+    assert str(UnifiedReceipt.objects.get()) == f"Receipt receipt-{receipt.pk}"
+
+
+@pytest.mark.django_db
+def test_includes_receipts_of_both_storages():
+    now = timezone.now()
+    push_error = PushErrorFactory()
+    receipt = ReceiptFactory(
+        is_success=False,
+        error_message="",
+        error_code=PushError.CODE_MESSAGE_TOO_BIG,
+        error=push_error,
+        date_checked=now - timedelta(minutes=1),
+    )
+    ticket = TicketFactory(
+        receipt_is_success=False,
+        receipt_error_message="",
+        receipt_error_code=PushError.CODE_DEVICE_NOT_REGISTERED,
+        receipt_error=push_error,
+        date_checked=now,
+    )
+    TicketFactory(receipt_is_success=None)
+
+    assert list(
+        UnifiedReceipt.objects.order_by("date_checked").values(
+            "id",
+            "ticket",
+            "is_success",
+            "error_message",
+            "error_code",
+            "error",
+            "date_checked",
+        )
+    ) == [
+        {
+            "id": f"receipt-{receipt.pk}",
+            "ticket": receipt.ticket_id,
+            "is_success": False,
+            "error_message": "",
+            "error_code": PushError.CODE_MESSAGE_TOO_BIG,
+            "error": push_error.pk,
+            "date_checked": receipt.date_checked,
+        },
+        {
+            "id": f"ticket-{ticket.pk}",
+            "ticket": ticket.pk,
+            "is_success": False,
+            "error_message": "",
+            "error_code": PushError.CODE_DEVICE_NOT_REGISTERED,
+            "error": push_error.pk,
+            "date_checked": ticket.date_checked,
+        },
+    ]
+
+
+@pytest.mark.django_db
+def test_get_error_message_reads_the_message_of_the_error():
+    push_error = PushErrorFactory(message="test-message")
+    ReceiptFactory(is_success=False, error_message="", error=push_error)
+    TicketFactory(receipt_is_success=True, date_checked=timezone.now())
+
+    assert [
+        receipt.get_error_message()
+        for receipt in UnifiedReceipt.objects.select_related("error").order_by("id")
+    ] == ["test-message", ""]
+
+
+@pytest.mark.django_db
+def test_can_be_queried_across_tickets():
+    tickets = TicketFactory.create_batch(
+        3, receipt_is_success=False, date_checked=timezone.now()
+    )
+    ReceiptFactory.create_batch(2, ticket=tickets[0], is_success=False)
+    ReceiptFactory(ticket=tickets[1], is_success=True)
+
+    with CaptureQueriesContext(connection) as context:
+        failed_count = UnifiedReceipt.objects.filter(
+            ticket__in=tickets, is_success=False
+        ).count()
+
+    assert failed_count == 5
+    assert len(context.captured_queries) == 1
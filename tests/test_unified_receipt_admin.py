@@ -0,0 +1,33 @@
+import pytest
+from bs4 import BeautifulSoup
+from django.urls import reverse
+from django.utils import timezone
+
+from tests.factories import ReceiptFactory, TicketFactory
+
+CHANGELIST_URL = reverse("admin:expo_notifications_unifiedreceipt_changelist")
+
+
+@pytest.mark.django_db
+def test_changelist_renders_receipts_of_both_storages(admin_client):
+    receipt = ReceiptFactory(date_checked=timezone.now())
+    ticket = TicketFactory(receipt_is_success=True, date_checked=timezone.now())
+
+    response = admin_client.get(CHANGELIST_URL)
+    assert response.status_code == 200
+
+    soup = BeautifulSoup(response.content, "html.parser")
+    assert [td.text for td in soup.select(".field-__str__")] == [
+        f"Receipt ticket-{ticket.pk}",
+        f"Receipt receipt-{receipt.pk}",
+    ]
+    assert [td.text for td in soup.select(".field-ticket_link")] == [
+        str(ticket),
+        str(receipt.ticket),
+    ]
+
+
+@pytest.mark.django_db
+def test_receipts_can_not_be_added(admin_client):
+    url = reverse("admin:expo_notifications_unifiedreceipt_add")
+    assert admin_client.get(url).status_code == 403